@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional
+import httpx
+from .http_client import upstream_max_connections
+from .pacer import AdaptivePacer, parse_retry_after
+logger = logging.getLogger(__name__)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+MAX_UPSTREAM_RETRIES = 3
+RETRY_BASE_DELAY_SECONDS = 0.5
+RETRY_MAX_DELAY_SECONDS = 20.0
+DECREASE_FACTOR = 0.7
+LATENCY_DECREASE_FACTOR = 0.9
+LATENCY_TOLERANCE = 2.0
+BASELINE_RISE_WEIGHT = 0.02
+MIN_DECREASE_INTERVAL_SECONDS = 1.0
+
+
+class _Slot:
+
+    def __init__(self):
+        self.status_code: Optional[int] = None
+
+    def observe(self, status_code: int) ->None:
+        self.status_code = status_code
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit for one upstream. The limit grows by about one
+    slot per limit's worth of healthy responses, and shrinks multiplicatively
+    on 429/5xx/transport errors (at most once per second) or gently when
+    latency rises well above the observed baseline. Callers over the limit
+    wait in arrival order instead of failing.
+    """
+
+    def __init__(self, name: str, max_limit: int, min_limit: int=1,
+        initial_limit: Optional[int]=None):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max(min_limit, max_limit)
+        self.limit = float(initial_limit if initial_limit is not None else
+            max(min_limit, self.max_limit // 2))
+        self.in_flight = 0
+        self.baseline_latency: Optional[float] = None
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def _has_room(self) ->bool:
+        return self.in_flight < max(self.min_limit, int(self.limit))
+
+    async def acquire(self) ->None:
+        if self._has_room() and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                self.in_flight -= 1
+                self._wake()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def release(self) ->None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) ->None:
+        while self._waiters and self._has_room():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _decrease(self, factor: float, reason: str) ->None:
+        now = time.monotonic()
+        if now - self._last_decrease < MIN_DECREASE_INTERVAL_SECONDS:
+            return
+        self._last_decrease = now
+        self.decreases += 1
+        self.limit = max(float(self.min_limit), self.limit * factor)
+        logger.info(
+            f'{self.name} concurrency limit reduced to {self.limit:.1f} ({reason})'
+            )
+
+    def record(self, latency: float, status_code: Optional[int]) ->None:
+        """Feeds one completed request (status None = transport error) into the limit."""
+        if status_code is None or status_code in RETRYABLE_STATUS_CODES:
+            self._decrease(DECREASE_FACTOR, f'status {status_code}' if
+                status_code else 'transport error')
+            self._wake()
+            return
+        if self.baseline_latency is None or latency < self.baseline_latency:
+            self.baseline_latency = latency
+        else:
+            self.baseline_latency += (latency - self.baseline_latency
+                ) * BASELINE_RISE_WEIGHT
+        if latency > self.baseline_latency * LATENCY_TOLERANCE:
+            self._decrease(LATENCY_DECREASE_FACTOR,
+                f'latency {latency:.2f}s vs baseline {self.baseline_latency:.2f}s'
+                )
+        elif self.limit < self.max_limit:
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit
+                )
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self) ->AsyncIterator[_Slot]:
+        """Holds one slot for a request; call observe(status) on the yielded slot."""
+        await self.acquire()
+        slot = _Slot()
+        started = time.monotonic()
+        try:
+            yield slot
+        except httpx.TransportError:
+            self.record(time.monotonic() - started, None)
+            raise
+        else:
+            if slot.status_code is not None:
+                self.record(time.monotonic() - started, slot.status_code)
+        finally:
+            self.release()
+
+    def stats(self) ->Dict[str, Any]:
+        return {'limit': round(self.limit, 2), 'in_flight': self.in_flight,
+            'waiting': len(self._waiters), 'decreases': self.decreases}
+
+
+_limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+
+
+def get_concurrency_limiter(upstream: str) ->AdaptiveConcurrencyLimiter:
+    """One limiter per upstream, capped at that upstream's connection pool size."""
+    limiter = _limiters.get(upstream)
+    if limiter is None:
+        limiter = AdaptiveConcurrencyLimiter(upstream,
+            upstream_max_connections(upstream))
+        _limiters[upstream] = limiter
+    return limiter
+
+
+def concurrency_stats() ->Dict[str, Dict[str, Any]]:
+    return {name: limiter.stats() for name, limiter in _limiters.items()}
+
+
+def retry_delay(attempt: int, headers: Optional[httpx.Headers]=None
+    ) ->float:
+    """Full-jitter exponential backoff; a numeric Retry-After wins when present."""
+    if headers is not None:
+        retry_after = parse_retry_after(headers)
+        if retry_after is not None:
+            return min(RETRY_MAX_DELAY_SECONDS, retry_after
+                ) + random.uniform(0, RETRY_BASE_DELAY_SECONDS)
+    return random.uniform(0, min(RETRY_MAX_DELAY_SECONDS,
+        RETRY_BASE_DELAY_SECONDS * 2 ** attempt))
+
+
+async def send_with_retries(upstream: str, send: Callable[[], Awaitable[
+    httpx.Response]], label: str, retries: int=MAX_UPSTREAM_RETRIES, pacer:
+    Optional[AdaptivePacer]=None) ->httpx.Response:
+    """
+    Sends a request through the upstream's concurrency limiter, retrying
+    429/5xx responses and transport errors with jittered backoff. The slot
+    is released while backing off. Returns the last response; re-raises the
+    last transport error.
+    """
+    limiter = get_concurrency_limiter(upstream)
+    attempt = 0
+    while True:
+        if pacer:
+            await pacer.wait()
+        try:
+            async with limiter.slot() as slot:
+                response = await send()
+                slot.observe(response.status_code)
+        except httpx.TransportError as e:
+            if attempt >= retries:
+                raise
+            delay = retry_delay(attempt)
+            logger.info(
+                f'{label}: {type(e).__name__}, retrying in {delay:.1f}s ({attempt + 1}/{retries})'
+                )
+        else:
+            if pacer:
+                pacer.on_response(response.status_code, response.headers)
+            if (response.status_code not in RETRYABLE_STATUS_CODES or
+                attempt >= retries):
+                return response
+            delay = retry_delay(attempt, response.headers)
+            logger.info(
+                f'{label}: status {response.status_code}, retrying in {delay:.1f}s ({attempt + 1}/{retries})'
+                )
+        attempt += 1
+        await asyncio.sleep(delay)
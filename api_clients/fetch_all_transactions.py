@@ -1,28 +1,36 @@
 import logging
 import asyncio
 import functools
-import requests
+import httpx
 import json
 import base64
 import time
-from typing import Optional, List, Dict, Any, Tuple, Set
-from telegram import Bot
-from telegram.ext import ContextTypes
+from typing import Optional, List, Dict, Any, Tuple, Callable, Awaitable
+from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.constants import ParseMode
 from telegram.error import BadRequest
-from config import WALLET_API_KEY, WALLET_API_BASE_URL
+from config import WALLET_API_KEY, WALLET_API_BASE_URL, SCAN_PARTITIONS, UNIQUE_EXACT_LIMIT, SCAN_CHECKPOINT_PAGES, SCAN_CHECKPOINT_MAX_AGE_SECONDS
 from formatters.address import format_address
+from utils.tx_index import get_tx_index, run_in_index, tx_row_from_item
+from utils.address_set import UniqueAddressCounter
+from utils.scan_analytics import ScanAnalytics, load_scan_analytics
+from utils.priority_rate_limiter import LANE_PROGRESS
+from .http_client import get_http_client, UPSTREAM_WALLET
+from .pacer import AdaptivePacer
+from .concurrency import send_with_retries
+from .json_extract import extract_page, TX_ITEM_FIELDS
 logger = logging.getLogger(__name__)
 WALLET_API_CHAIN_ID = 'monad-test-v2'
 PAGE_SIZE = 100
 PROGRESS_UPDATE_INTERVAL_PAGES = 10
 PROGRESS_UPDATE_INTERVAL_SECONDS = 30
-GLOBAL_SCAN_ACTIVE_KEY = 'global_scan_active'
-SCAN_ACTIVE_USER_KEY_TPL = 'scan_active_{user_id}'
+HISTORY_START_MS = 1739923200000
+CALLBACK_SCAN_BREAKDOWN = 'scanbreak_'
 
 
-async def _fetch_tx_page(url: str, api_key: str) ->Tuple[Optional[List[Dict
-    [str, Any]]], Optional[str]]:
+async def _fetch_tx_page(url: str, api_key: str, pacer: Optional[
+    AdaptivePacer]=None) ->Tuple[Optional[List[Dict[str, Any]]], Optional[str]
+    ]:
     if not api_key:
         return None, 'API Key missing'
     auth_string = f'{api_key}:'
@@ -34,20 +42,20 @@ async def _fetch_tx_page(url: str, api_key: str) ->Tuple[Optional[List[Dict
     headers = {'accept': 'application/json', 'X-Env': 'testnet',
         'Authorization': f'Basic {encoded_auth}'}
     try:
-        loop = asyncio.get_running_loop()
-        func_call = functools.partial(requests.get, url, headers=headers,
-            timeout=30)
-        response = await loop.run_in_executor(None, func_call)
+        client = get_http_client(UPSTREAM_WALLET)
+        response = await send_with_retries(UPSTREAM_WALLET, lambda : client
+            .get(url, headers=headers, timeout=30), 'Tx page', pacer=pacer)
         response.raise_for_status()
-        data = response.json()
-        if isinstance(data, dict):
-            tx_list = data.get('data', [])
-            next_url = data.get('links', {}).get('next')
-            return tx_list, next_url
+        tx_list, top = extract_page(response.content, TX_ITEM_FIELDS, (
+            'links.next',))
+        if tx_list is not None:
+            return tx_list, top.get('links.next')
         else:
-            logger.error(f'Tx page unexpected format (expected dict): {data}')
+            logger.error(
+                f'Tx page unexpected format (expected data list): {response.content[:200]!r}'
+                )
             return None, 'Unexpected API response format (expected dict)'
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f'Tx page fetch error: {e}')
         status_code = 'N/A'
         error_detail = ''
@@ -76,99 +84,282 @@ async def _fetch_tx_page(url: str, api_key: str) ->Tuple[Optional[List[Dict
         return None, 'Unexpected Error during page fetch'
 
 
-async def fetch_all_transaction_targets(user_id: int, address: str, context:
-    ContextTypes.DEFAULT_TYPE, chat_id: int, status_message_id: int) ->None:
+def _build_partition_urls(address: str, partitions: int, since_ms:
+    Optional[int]=None, now_ms: Optional[int]=None) ->List[str]:
+    """
+    Splits the wallet history into mined_at windows that can be paged
+    independently. The first window is open towards the past (or starts at
+    since_ms for a delta scan) and the last towards the future, so no
+    transaction in range falls outside every window.
+    """
+    endpoint_tmpl = f'/wallets/{address}/transactions'
+    base_url = WALLET_API_BASE_URL.rstrip('/') + endpoint_tmpl
+    base_params = {'filter[chain_ids]': WALLET_API_CHAIN_ID, 'page[size]':
+        PAGE_SIZE}
+    partitions = max(1, partitions)
+    if since_ms is not None:
+        base_params['filter[min_mined_at]'] = since_ms
+    start_ms = since_ms if since_ms is not None else HISTORY_START_MS
+    if now_ms is None:
+        now_ms = int(time.time() * 1000)
+    step = (now_ms - start_ms) // partitions
+    if partitions == 1 or step <= 0:
+        return [str(httpx.URL(base_url, params=base_params))]
+    urls = []
+    for i in range(partitions):
+        params = dict(base_params)
+        if i > 0:
+            params['filter[min_mined_at]'] = start_ms + i * step
+        if i < partitions - 1:
+            params['filter[max_mined_at]'] = start_ms + (i + 1) * step - 1
+        urls.append(str(httpx.URL(base_url, params=params)))
+    return urls
+
+
+async def _scan_partition(start_url: str, api_key: str, pacer:
+    AdaptivePacer, on_page: Callable[[List[Dict[str, Any]], Optional[str]],
+    Awaitable[None]]) ->Optional[str]:
+    """
+    Walks one cursor chain, keeping the next page request in flight while
+    the current page and its next-page cursor are handed to on_page.
+    Returns an error message or None.
+    """
+    fetch_task: Optional[asyncio.Task] = asyncio.create_task(_fetch_tx_page
+        (start_url, api_key, pacer))
+    try:
+        while fetch_task is not None:
+            tx_list_page, next_page_url = await fetch_task
+            fetch_task = None
+            if tx_list_page is None:
+                return next_page_url or 'Unknown API error.'
+            if not tx_list_page:
+                return None
+            if next_page_url:
+                fetch_task = asyncio.create_task(_fetch_tx_page(
+                    next_page_url, api_key, pacer))
+            await on_page(tx_list_page, next_page_url)
+        return None
+    finally:
+        if fetch_task is not None and not fetch_task.done():
+            fetch_task.cancel()
+
+
+async def _edit_status(bot: Bot, status_targets: List[Tuple[int, int]],
+    text: str, parse_mode: Optional[str]=None, reply_markup: Optional[
+    InlineKeyboardMarkup]=None) ->None:
+    """
+    Edits every subscriber's status message on the progress lane, where a
+    newer edit replaces a still-queued older one; failures are logged, not raised.
+    """
+    for chat_id, message_id in list(status_targets):
+        try:
+            await bot.edit_message_text(text, chat_id=chat_id, message_id=
+                message_id, parse_mode=parse_mode, reply_markup=reply_markup,
+                rate_limit_args=LANE_PROGRESS)
+        except BadRequest as e:
+            if 'Message is not modified' not in str(e):
+                logger.error(f'Failed status edit (BadRequest): {e}')
+        except Exception as e:
+            logger.error(f'Failed status edit (Other Error): {e}')
+
+
+def _unique_text(counter: UniqueAddressCounter) ->str:
+    return f'~{len(counter)}' if counter.approximate else str(len(counter))
+
+
+def _load_scan_state(tx_index, address: str, checkpoint: Optional[Dict[str,
+    Any]]) ->Tuple[UniqueAddressCounter, ScanAnalytics]:
+    """
+    Counterparties and analytics covering exactly the wallet's indexed rows:
+    the checkpoint's (or last completed scan's) blobs while they still match
+    the index, else rebuilt from the rows. Blocking; run via run_in_index.
+    """
+    if checkpoint is not None:
+        counter_blob = checkpoint['counterparties']
+        analytics_blob = checkpoint['analytics']
+    else:
+        counter_blob = tx_index.get_counterparties(address)
+        analytics_blob = tx_index.get_analytics(address)
+    analytics = ScanAnalytics.from_bytes(analytics_blob)
+    indexed = tx_index.row_count(address)
+    if analytics.txns == indexed and (counter_blob or not indexed):
+        return UniqueAddressCounter.from_bytes(counter_blob,
+            UNIQUE_EXACT_LIMIT), analytics
+    counterparties = UniqueAddressCounter(UNIQUE_EXACT_LIMIT)
+    analytics = load_scan_analytics(tx_index, address, b'', counterparties)
+    return counterparties, analytics
+
+
+async def fetch_all_transaction_targets(address: str, bot: Bot,
+    status_targets: List[Tuple[int, int]], pacer: Optional[AdaptivePacer]=
+    None, on_page_done: Optional[Callable[[], None]]=None,
+    checkpoint_meta: Optional[Callable[[], Dict[str, Any]]]=None) ->bool:
+    """
+    Scans the wallet's transactions and reports progress to every
+    (chat_id, message_id) in status_targets, which may grow while the scan
+    runs. Returns True when the scan completed.
+
+    Each page's rows are indexed together with a checkpoint of every
+    partition's cursor, and the aggregate state is saved with it every
+    SCAN_CHECKPOINT_PAGES pages and when the scan stops early, so a later
+    call (or a restarted bot) resumes where this one left off.
+    checkpoint_meta supplies extra JSON stored with the checkpoint.
+    """
     if not WALLET_API_KEY:
         logger.error('Wallet API Key missing for tx scan.')
-        return
-    interacted_addresses: Set[str] = set()
-    total_txns_processed: int = 0
-    page_num: int = 1
+        return False
+    new_txns_indexed: int = 0
     last_update_time: float = time.monotonic()
-    bot: Bot = context.bot
     scan_failed = False
-    user_scan_key = SCAN_ACTIVE_USER_KEY_TPL.format(user_id=user_id)
-    endpoint_tmpl = f'/wallets/{address}/transactions'
-    params = {'filter[chain_ids]': WALLET_API_CHAIN_ID, 'page[size]': PAGE_SIZE
-        }
+    scan_completed = False
+    if pacer is None:
+        pacer = AdaptivePacer()
+    tx_index = get_tx_index()
+    index_lock = asyncio.Lock()
     try:
-        initial_req = requests.Request('GET', WALLET_API_BASE_URL.rstrip(
-            '/') + endpoint_tmpl, params=params).prepare()
-        current_url: Optional[str] = initial_req.url
+        checkpoint = await run_in_index(tx_index.get_checkpoint, address)
+        if checkpoint is not None and time.time() - (checkpoint[
+            'updated_at'] or 0) > SCAN_CHECKPOINT_MAX_AGE_SECONDS:
+            logger.info(f'Discarding stale scan checkpoint for {address}')
+            await run_in_index(tx_index.delete_checkpoint, address)
+            checkpoint = None
+        if checkpoint is not None:
+            since_ms = checkpoint['since_ms']
+            cursors: List[Optional[str]] = checkpoint['cursors']
+            pages_done: int = checkpoint['pages_done']
+            total_txns_processed: int = checkpoint['txns_processed']
+        else:
+            wallet_row = await run_in_index(tx_index.get_wallet, address)
+            since_ms = wallet_row['high_water_ms'] if wallet_row else None
+            cursors = _build_partition_urls(address, SCAN_PARTITIONS, since_ms)
+            pages_done = 0
+            total_txns_processed = 0
+        interacted_addresses, analytics = await run_in_index(
+            _load_scan_state, tx_index, address, checkpoint)
     except Exception as url_err:
         logger.error(f'Failed to prepare initial URL: {url_err}')
-        await bot.edit_message_text('Error preparing scan.', chat_id=
-            chat_id, message_id=status_message_id)
+        await _edit_status(bot, status_targets, 'Error preparing scan.')
         raise
-    logger.info(
-        f'Starting full transaction scan for {address} (User: {user_id})')
+    resumed_at_page = pages_done
+
+    def checkpoint_state(with_blobs: bool) ->Dict[str, Any]:
+        state = {'since_ms': since_ms, 'cursors': cursors, 'pages_done':
+            pages_done, 'txns_processed': total_txns_processed, 'meta': 
+            checkpoint_meta() if checkpoint_meta else None}
+        if with_blobs:
+            state['counterparties'] = interacted_addresses.to_bytes()
+            state['analytics'] = analytics.to_bytes()
+        return state
+
+    async def process_page(partition: int, tx_list_page: List[Dict[str,
+        Any]], next_page_url: Optional[str]) ->None:
+        nonlocal total_txns_processed, pages_done, last_update_time, new_txns_indexed
+        page_processed_count = 0
+        index_rows = []
+        for tx in tx_list_page:
+            if isinstance(tx, dict) and tx.get('type') == 'transactions':
+                page_processed_count += 1
+                row = tx_row_from_item(tx)
+                if row:
+                    index_rows.append(row)
+        async with index_lock:
+            cursors[partition] = next_page_url
+            total_txns_processed += page_processed_count
+            pages_done += 1
+            new_hashes = await run_in_index(tx_index.add_transactions,
+                address, index_rows, checkpoint_state(False))
+            new_txns_indexed += len(new_hashes)
+            for tx_hash, sent_to, mined_at_ms, operation_type in index_rows:
+                if sent_to:
+                    interacted_addresses.add(sent_to)
+                if tx_hash in new_hashes:
+                    new_hashes.discard(tx_hash)
+                    analytics.add(sent_to, mined_at_ms, operation_type)
+            if pages_done % SCAN_CHECKPOINT_PAGES == 0:
+                await run_in_index(tx_index.save_checkpoint, address,
+                    checkpoint_state(True))
+        if on_page_done:
+            on_page_done()
+        logger.debug(
+            f'Page {pages_done}: Processed {page_processed_count} txns. Total unique: {len(interacted_addresses)}'
+            )
+        current_time = time.monotonic()
+        if (pages_done % PROGRESS_UPDATE_INTERVAL_PAGES == 0 or
+            current_time - last_update_time > PROGRESS_UPDATE_INTERVAL_SECONDS
+            ):
+            last_update_time = current_time
+            progress_text = f"""🔬 Scanning... (Page: {pages_done})
+Txns checked: ~{total_txns_processed}
+Unique found: {_unique_text(interacted_addresses)}"""
+            await _edit_status(bot, status_targets, progress_text)
+    scan_kind = 'delta' if since_ms is not None else 'full'
+    pending = [i for i, url in enumerate(cursors) if url]
+    if checkpoint is not None:
+        logger.info(
+            f'Resuming {scan_kind} transaction scan for {address} at page {pages_done} (partitions left: {len(pending)})'
+            )
+        await _edit_status(bot, status_targets,
+            f"""🔁 Resuming saved scan for {format_address(address)} (Page: {pages_done})
+Txns checked: ~{total_txns_processed}""")
+    else:
+        logger.info(
+            f'Starting {scan_kind} transaction scan for {address} (partitions: {len(pending)})'
+            )
+    partition_tasks = [asyncio.create_task(_scan_partition(cursors[i],
+        WALLET_API_KEY, pacer, functools.partial(process_page, i))) for i in
+        pending]
     try:
-        while current_url:
-            logger.debug(
-                f'Attempting to fetch tx page {page_num} for {address}')
-            tx_list_page, next_page_url = await _fetch_tx_page(current_url,
-                WALLET_API_KEY)
-            if tx_list_page is None:
-                error_msg = next_page_url or 'Unknown API error.'
+        for finished in asyncio.as_completed(partition_tasks):
+            error_msg = await finished
+            if error_msg:
                 logger.error(f'Stopping scan: {error_msg}')
-                await bot.edit_message_text(f'⚠️ Scan failed: {error_msg}',
-                    chat_id=chat_id, message_id=status_message_id)
+                await _edit_status(bot, status_targets,
+                    f"""⚠️ Scan failed: {error_msg}
+Progress is saved; run the command again to resume.""")
                 scan_failed = True
                 break
-            if not tx_list_page:
-                logger.info(
-                    f'Reached end of transaction history page {page_num}.')
-                break
-            page_processed_count = 0
-            for tx in tx_list_page:
-                if isinstance(tx, dict) and tx.get('type') == 'transactions':
-                    sent_to = tx.get('attributes', {}).get('sent_to')
-                    if sent_to:
-                        interacted_addresses.add(sent_to.lower())
-                    page_processed_count += 1
-            total_txns_processed += page_processed_count
-            logger.debug(
-                f'Page {page_num}: Processed {page_processed_count} txns. Total unique: {len(interacted_addresses)}'
-                )
-            current_time = time.monotonic()
-            if (page_num % PROGRESS_UPDATE_INTERVAL_PAGES == 0 or 
-                current_time - last_update_time >
-                PROGRESS_UPDATE_INTERVAL_SECONDS):
-                progress_text = f"""🔬 Scanning... (Page: {page_num})
-Txns checked: ~{total_txns_processed}
-Unique found: {len(interacted_addresses)}"""
-                try:
-                    await bot.edit_message_text(progress_text, chat_id=
-                        chat_id, message_id=status_message_id)
-                    last_update_time = current_time
-                    logger.debug('Progress update edit successful.')
-                except BadRequest as e:
-                    if 'Message is not modified' not in str(e):
-                        logger.error(f'Failed progress edit (BadRequest): {e}')
-                except Exception as e:
-                    logger.error(f'Failed progress edit (Other Error): {e}')
-            current_url = next_page_url
-            page_num += 1
-            if current_url:
-                await asyncio.sleep(0.6)
         if not scan_failed:
+            wallet_row = await run_in_index(tx_index.complete_scan, address,
+                interacted_addresses.to_bytes(), analytics.to_bytes(), len(
+                interacted_addresses))
+            scan_completed = True
             logger.info(
-                f'Scan completed successfully for {address}. Total unique: {len(interacted_addresses)}'
+                f"Scan completed successfully for {address}. Pages: {pages_done}, throttled: {pacer.throttled_count}, new indexed: {new_txns_indexed}, total unique: {wallet_row['unique_count']}"
                 )
             final_text = f"""✅ Scan Complete for {format_address(address)}!
 
-Total Transactions Processed: {total_txns_processed}
-Unique Addresses Interacted With: <b>{len(interacted_addresses)}</b>"""
-            await bot.edit_message_text(final_text, chat_id=chat_id,
-                message_id=status_message_id, parse_mode=ParseMode.HTML)
+Total Transactions Processed: {wallet_row['total_txns']}
+Unique Addresses Interacted With: <b>{_unique_text(interacted_addresses)}</b>"""
+            if interacted_addresses.approximate:
+                final_text += (
+                    f'\n(Approximate: over {UNIQUE_EXACT_LIMIT} distinct addresses)'
+                    )
+            if scan_kind == 'delta':
+                final_text += f'\n(New since last scan: {new_txns_indexed})'
+            keyboard = InlineKeyboardMarkup([[InlineKeyboardButton(
+                '📊 Breakdown', callback_data=
+                f'{CALLBACK_SCAN_BREAKDOWN}{address.lower()}')]])
+            await _edit_status(bot, status_targets, final_text, parse_mode=
+                ParseMode.HTML, reply_markup=keyboard)
+        return not scan_failed
     except Exception as loop_err:
         logger.exception(
             f'Error occurred inside transaction scan loop for {address}')
         scan_failed = True
-        try:
-            await bot.edit_message_text(
-                f'An internal error occurred during the scan loop.',
-                chat_id=chat_id, message_id=status_message_id)
-        except Exception:
-            pass
+        await _edit_status(bot, status_targets,
+            f'An internal error occurred during the scan loop.')
         raise
+    finally:
+        for task in partition_tasks:
+            if not task.done():
+                task.cancel()
+        if not scan_completed and pages_done > resumed_at_page:
+            try:
+                await run_in_index(tx_index.save_checkpoint, address,
+                    checkpoint_state(True))
+                logger.info(
+                    f'Saved scan checkpoint for {address} at page {pages_done}'
+                    )
+            except Exception as e:
+                logger.error(
+                    f'Failed to save scan checkpoint for {address}: {e}')
@@ -1,22 +1,26 @@
 import logging
 from web3 import Web3
-from web3.exceptions import InvalidAddress
-from .rpc_setup import w3
+from .rpc_client import RpcError, RpcUnavailableError
+from .rpc_setup import get_rpc_client
 logger = logging.getLogger(__name__)
 
 
-def fetch_native_balance(address: str) ->str:
-    if not w3:
+async def fetch_native_balance(address: str) ->str:
+    rpc_client = get_rpc_client()
+    if not rpc_client:
         return 'Error: RPC connection not available.'
+    if not Web3.is_address(address):
+        logger.warning(f'Invalid address format received: {address}')
+        return f'Error: Invalid address format provided.'
     try:
         checksum_address = Web3.to_checksum_address(address)
-        balance_wei = w3.eth.get_balance(checksum_address)
-        balance_native = w3.from_wei(balance_wei, 'ether')
+        balance_hex = await rpc_client.call('eth_getBalance', [
+            checksum_address, 'latest'])
+        balance_native = Web3.from_wei(int(balance_hex, 16), 'ether')
         balance_str = '{:f}'.format(balance_native.normalize())
         return f'Balance: {balance_str} MON'
-    except InvalidAddress:
-        logger.warning(f'Invalid address format received: {address}')
-        return f'Error: Invalid address format provided.'
-    except Exception as e:
+    except RpcUnavailableError:
+        return 'Error: RPC connection not available.'
+    except (RpcError, TypeError, ValueError) as e:
         logger.error(f'Error fetching balance via RPC for {address}: {e}')
         return f'An unexpected error occurred while fetching balance.'
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from typing import Optional, List, Dict, Any, Tuple, NamedTuple
+from config import ME_API_KEY, NETWORK
+from .me_helper import fetch_page_m_uncached
+from .response_cache import me_cache, ME_COLLECTION_METADATA_POLICY
+from .single_flight import make_call_key
+logger = logging.getLogger(__name__)
+COLLECTION_BATCH_SIZE = 20
+
+
+class CollectionPrice(NamedTuple):
+    floor_native: Optional[float]
+    floor_usd: Optional[float]
+    top_bid_native: Optional[float]
+    top_bid_usd: Optional[float]
+    currency: str
+
+
+def _amount(market: Optional[Dict[str, Any]], unit: str) ->Optional[float]:
+    value = (((market or {}).get('price') or {}).get('amount') or {}).get(unit
+        )
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def price_from_collection(collection: Dict[str, Any]) ->CollectionPrice:
+    floor_ask = collection.get('floorAsk')
+    top_bid = collection.get('topBid')
+    currency = (((floor_ask or {}).get('price') or {}).get('currency') or {}
+        ).get('symbol') or ''
+    return CollectionPrice(_amount(floor_ask, 'native'), _amount(floor_ask,
+        'usd'), _amount(top_bid, 'native'), _amount(top_bid, 'usd'), currency)
+
+
+def _price_key(collection_id: str) ->str:
+    return make_call_key('collection_price', (collection_id,), {})
+
+
+async def _fetch_batch(collection_ids: List[str]) ->Tuple[Optional[Dict[
+    str, CollectionPrice]], Optional[str]]:
+    endpoint_tmpl = f'/v3/rtp/{NETWORK}/collections/v7'
+    # Prices are cached per collection below, so the batch response itself is not.
+    items, error = await fetch_page_m_uncached(endpoint_tmpl=endpoint_tmpl,
+        params={'contract': collection_ids}, api_key=ME_API_KEY, lmt=len(
+        collection_ids))
+    if not isinstance(items, list):
+        return None, error or 'Error: Unexpected collections response.'
+    return {c['id'].lower(): price_from_collection(c) for c in items if
+        isinstance(c, dict) and c.get('id')}, None
+
+
+async def fetch_collection_prices(collection_ids: List[str]) ->Tuple[Dict[
+    str, CollectionPrice], Optional[str]]:
+    """
+    Floor and top bid per collection id (lower-cased keys), cached per
+    collection in the response cache under the collection metadata policy.
+    Fresh ids are answered from it; the rest are requested
+    COLLECTION_BATCH_SIZE at a time, all batches concurrently, and a stale
+    entry is used only if its batch fails. Returns whatever could be priced
+    and the last batch error, if any.
+    """
+    if not ME_API_KEY:
+        return {}, 'Error: NFT API Key not configured.'
+    prices: Dict[str, CollectionPrice] = {}
+    stale: Dict[str, CollectionPrice] = {}
+    missing: List[str] = []
+    for collection_id in dict.fromkeys(c.lower() for c in collection_ids):
+        price, state = me_cache.lookup(_price_key(collection_id))
+        if state == 'fresh':
+            prices[collection_id] = price
+            continue
+        if state == 'stale':
+            stale[collection_id] = price
+        missing.append(collection_id)
+    if not missing:
+        return prices, None
+    batches = [missing[i:i + COLLECTION_BATCH_SIZE] for i in range(0, len(
+        missing), COLLECTION_BATCH_SIZE)]
+    logger.info(
+        f'Fetching prices for {len(missing)} collections in {len(batches)} batches ({len(prices)} cached)'
+        )
+    results = await asyncio.gather(*(_fetch_batch(batch) for batch in batches))
+    error = None
+    for batch, (batch_prices, batch_error) in zip(batches, results):
+        if batch_prices is None:
+            error = batch_error
+            prices.update((c, stale[c]) for c in batch if c in stale)
+            continue
+        for collection_id, price in batch_prices.items():
+            prices[collection_id] = price
+            me_cache.put(_price_key(collection_id), price,
+                ME_COLLECTION_METADATA_POLICY)
+    return prices, error
@@ -1,12 +1,13 @@
 import logging
 from web3 import Web3
-from web3.exceptions import InvalidAddress
-from .rpc_setup import w3
+from .rpc_client import RpcError, RpcUnavailableError
+from .rpc_setup import get_rpc_client
 from typing import Optional, Tuple
 logger = logging.getLogger(__name__)
 
 
-def fetch_address_nonce(address: str) ->Tuple[Optional[int], Optional[str]]:
+async def fetch_address_nonce(address: str) ->Tuple[Optional[int], Optional
+    [str]]:
     """
     Fetches the nonce (outgoing transaction count) for a given address via RPC.
 
@@ -16,16 +17,21 @@ def fetch_address_nonce(address: str) ->Tuple[Optional[int], Optional[str]]:
     Returns:
         A tuple: (nonce_count or None, error_message or None)
     """
-    if not w3:
+    rpc_client = get_rpc_client()
+    if not rpc_client:
         return None, 'Error: RPC connection not available.'
+    if not Web3.is_address(address):
+        logger.warning(f'Invalid address format for nonce check: {address}')
+        return None, f'Error: Invalid address format provided.'
     try:
         checksum_address = Web3.to_checksum_address(address)
-        nonce = w3.eth.get_transaction_count(checksum_address)
+        nonce_hex = await rpc_client.call('eth_getTransactionCount', [
+            checksum_address, 'latest'])
+        nonce = int(nonce_hex, 16)
         logger.debug(f'Successfully fetched nonce {nonce} for {address}')
         return nonce, None
-    except InvalidAddress:
-        logger.warning(f'Invalid address format for nonce check: {address}')
-        return None, f'Error: Invalid address format provided.'
-    except Exception as e:
+    except RpcUnavailableError:
+        return None, 'Error: RPC connection not available.'
+    except (RpcError, TypeError, ValueError) as e:
         logger.error(f'Error fetching nonce via RPC for {address}: {e}')
         return None, f'An unexpected RPC error occurred while fetching nonce.'
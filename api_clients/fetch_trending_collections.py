@@ -1,15 +1,19 @@
 import logging
-import asyncio
-import functools
-import requests
+import httpx
 import json
 from typing import Optional, List, Dict, Any, Tuple
 from config import ME_API_KEY, NETWORK, ME_BASE_URL
+from .http_client import get_http_client, UPSTREAM_ME
+from .concurrency import send_with_retries
+from .single_flight import single_flight
+from .response_cache import cached, ME_TRENDING_POLICY
 logger = logging.getLogger(__name__)
 VALID_PERIODS = ['5m', '10m', '30m', '1h', '6h', '1d', '24h', '7d', '30d']
 VALID_SORT_BY = ['volume', 'sales']
 
 
+@cached('trending_collections', lambda *args, **kwargs: ME_TRENDING_POLICY)
+@single_flight('trending_collections')
 async def fetch_trending_collections(period: str='1d', limit: int=10,
     sort_by: str='volume') ->Tuple[Optional[List[Dict[str, Any]]], Optional
     [str]]:
@@ -37,10 +41,10 @@ async def fetch_trending_collections(period: str='1d', limit: int=10,
         f'Requesting Trending Collections: Period={period}, Sort={sort_by}, Limit={limit}'
         )
     try:
-        loop = asyncio.get_running_loop()
-        func_call = functools.partial(requests.get, url, headers=headers,
-            params=params, timeout=20)
-        response = await loop.run_in_executor(None, func_call)
+        client = get_http_client(UPSTREAM_ME)
+        response = await send_with_retries(UPSTREAM_ME, lambda : client.
+            get(url, headers=headers, params=params, timeout=20),
+            'ME trending collections', retries=0)
         response.raise_for_status()
         data = response.json()
         if isinstance(data, dict) and 'collections' in data:
@@ -57,10 +61,10 @@ async def fetch_trending_collections(period: str='1d', limit: int=10,
         else:
             logger.error(f'Unexpected API response format: {data}')
             return None, 'Error: Unexpected API response format.'
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         logger.error(f'API timeout: {url}')
         return None, 'Error: API request timed out.'
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f'API request error: {e}')
         error_detail = ''
         status_code = 'N/A'
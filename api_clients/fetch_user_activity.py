@@ -1,8 +1,4 @@
 import logging
-import asyncio
-import functools
-import requests
-import json
 from typing import Optional, List, Dict, Any, Tuple
 from .me_helper import _fetch_page_m
 from config import ME_API_KEY, NETWORK, ME_BASE_URL
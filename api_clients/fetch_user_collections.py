@@ -1,13 +1,18 @@
 import logging
-import asyncio
-import functools
-import requests
+import httpx
 import json
 from typing import Optional, List, Dict, Any, Tuple
 from config import ME_API_KEY, NETWORK, ME_BASE_URL
+from .http_client import get_http_client, UPSTREAM_ME
+from .concurrency import send_with_retries
+from .single_flight import single_flight
+from .response_cache import cached, ME_USER_COLLECTIONS_POLICY
 logger = logging.getLogger(__name__)
 
 
+@cached('user_collections', lambda *args, **kwargs:
+    ME_USER_COLLECTIONS_POLICY)
+@single_flight('user_collections')
 async def fetch_user_collections(user_address: str, offset: int=0, limit: int=5
     ) ->Tuple[Optional[List[Dict[str, Any]]], Optional[Any]]:
     """
@@ -25,10 +30,10 @@ async def fetch_user_collections(user_address: str, offset: int=0, limit: int=5
     url = ME_BASE_URL + endpoint_tmpl
     logger.info(f'Requesting User Collections: Offset={offset}, Limit={limit}')
     try:
-        loop = asyncio.get_running_loop()
-        func_call = functools.partial(requests.get, url, headers=headers,
-            params=current_params, timeout=15)
-        response = await loop.run_in_executor(None, func_call)
+        client = get_http_client(UPSTREAM_ME)
+        response = await send_with_retries(UPSTREAM_ME, lambda : client.
+            get(url, headers=headers, params=current_params, timeout=15),
+            'ME user collections', retries=0)
         response.raise_for_status()
         data = response.json()
         if isinstance(data, dict) and 'collections' in data:
@@ -42,7 +47,7 @@ async def fetch_user_collections(user_address: str, offset: int=0, limit: int=5
             logger.error(
                 f'Unexpected User Collections API response format: {data}')
             return None, 'Error: Unexpected API response format.'
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f'User Collections API request error: {e}')
         if hasattr(e, 'response') and e.response is not None:
             status_code = e.response.status_code
@@ -0,0 +1,55 @@
+import logging
+from typing import Dict
+import httpx
+from config import ME_MAX_CONNECTIONS, WALLET_API_MAX_CONNECTIONS, RPC_MAX_CONNECTIONS
+logger = logging.getLogger(__name__)
+try:
+    import h2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+UPSTREAM_ME = 'magiceden'
+UPSTREAM_WALLET = 'zerion'
+UPSTREAM_RPC = 'rpc'
+KEEPALIVE_EXPIRY_SECONDS = 30.0
+DEFAULT_TIMEOUT_SECONDS = 30.0
+_UPSTREAM_LIMITS = {UPSTREAM_ME: ME_MAX_CONNECTIONS, UPSTREAM_WALLET:
+    WALLET_API_MAX_CONNECTIONS, UPSTREAM_RPC: RPC_MAX_CONNECTIONS}
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def upstream_max_connections(upstream: str) ->int:
+    return _UPSTREAM_LIMITS.get(upstream, 10)
+
+
+def get_http_client(upstream: str) ->httpx.AsyncClient:
+    """
+    Returns the pooled AsyncClient for an upstream API, creating it on first use.
+    Each upstream keeps its own keep-alive pool so one slow provider cannot
+    starve connections of another.
+    """
+    client = _clients.get(upstream)
+    if client is not None and not client.is_closed:
+        return client
+    max_connections = upstream_max_connections(upstream)
+    limits = httpx.Limits(max_connections=max_connections,
+        max_keepalive_connections=max_connections, keepalive_expiry=
+        KEEPALIVE_EXPIRY_SECONDS)
+    client = httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=limits,
+        timeout=DEFAULT_TIMEOUT_SECONDS)
+    _clients[upstream] = client
+    logger.info(
+        f'Created HTTP client for {upstream} (max_connections={max_connections}, http2={HTTP2_AVAILABLE})'
+        )
+    return client
+
+
+async def close_http_clients() ->None:
+    """Closes every pooled client. Called from Application post_shutdown."""
+    while _clients:
+        upstream, client = _clients.popitem()
+        try:
+            await client.aclose()
+            logger.info(f'Closed HTTP client for {upstream}')
+        except Exception as e:
+            logger.error(f'Error closing HTTP client for {upstream}: {e}')
@@ -0,0 +1,164 @@
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+logger = logging.getLogger(__name__)
+try:
+    import ijson
+    STREAMING_AVAILABLE = ijson.backend in ('yajl2_c', 'yajl2_cffi')
+except ImportError:
+    ijson = None
+    STREAMING_AVAILABLE = False
+STREAMING_MIN_BYTES = 256 * 1024
+_SCALAR_EVENTS = {'string', 'number', 'boolean', 'null'}
+ItemSpec = Dict[str, Tuple[Any, ...]]
+TX_ITEM_FIELDS: ItemSpec = {'type': ('type',), 'id': ('id',),
+    'attributes.hash': ('attributes', 'hash'), 'attributes.sent_to': (
+    'attributes', 'sent_to'), 'attributes.mined_at': ('attributes',
+    'mined_at'), 'attributes.operation_type': ('attributes',
+    'operation_type')}
+POSITION_ITEM_FIELDS: ItemSpec = {'type': ('type',), 'id': ('id',),
+    'attributes.quantity.int': ('attributes', 'quantity', 'int'),
+    'attributes.value': ('attributes', 'value'), 'attributes.price': (
+    'attributes', 'price'), 'attributes.fungible_info.name': ('attributes',
+    'fungible_info', 'name'), 'attributes.fungible_info.symbol': (
+    'attributes', 'fungible_info', 'symbol'),
+    'attributes.fungible_info.implementations.0.decimals': ('attributes',
+    'fungible_info', 'implementations', 0, 'decimals'),
+    'attributes.fungible_info.implementations.0.address': ('attributes',
+    'fungible_info', 'implementations', 0, 'address')}
+
+
+def _put(target: Dict[str, Any], keys: Tuple[Any, ...], value: Any) ->None:
+    """Sets a nested value; int keys mean 'element of a list'. First value wins."""
+    node: Any = target
+    for key, next_key in zip(keys, keys[1:]):
+        empty = [] if isinstance(next_key, int) else {}
+        if isinstance(key, int):
+            while len(node) <= key:
+                node.append({})
+            node = node[key]
+        else:
+            node = node.setdefault(key, empty)
+    last = keys[-1]
+    if isinstance(node, dict) and last not in node:
+        node[last] = value
+
+
+def _lookup(value: Any, path: Iterable[str]) ->Iterable[Any]:
+    """
+    Values at an ijson-style dotted path ('item' = every list element, a
+    number = only that element).
+    """
+    nodes = [value]
+    for part in path:
+        found = []
+        for node in nodes:
+            if part == 'item' and isinstance(node, list):
+                found.extend(node)
+            elif part.isdigit() and isinstance(node, list):
+                found.extend(node[int(part):int(part) + 1])
+            elif isinstance(node, dict) and part in node:
+                found.append(node[part])
+        nodes = found
+    return nodes
+
+
+def _extract_parsed(body: bytes, item_spec: ItemSpec, top_fields:
+    Iterable[str]) ->Tuple[Optional[List[Dict[str, Any]]], Dict[str, Any]]:
+    data = json.loads(body)
+    if not isinstance(data, dict):
+        return None, {}
+    top = {}
+    for name in top_fields:
+        for value in _lookup(data, name.split('.')):
+            top[name] = value
+            break
+    raw_items = data.get('data')
+    if not isinstance(raw_items, list):
+        return None, top
+    paths = [(path.split('.'), keys) for path, keys in item_spec.items()]
+    items = []
+    for raw in raw_items:
+        item: Dict[str, Any] = {}
+        if isinstance(raw, dict):
+            for path, keys in paths:
+                for value in _lookup(raw, path):
+                    if value is not None and not isinstance(value, (dict,
+                        list)):
+                        _put(item, keys, value)
+                        break
+        items.append(item)
+    return items, top
+
+
+def _stream_path(path: str) ->Tuple[str, Tuple[str, ...]]:
+    """
+    The ijson prefix of an item spec path, plus the prefixes of the lists
+    whose element it is pinned to by a numeric part.
+    """
+    parts = ['data', 'item']
+    pinned = []
+    for part in path.split('.'):
+        if part.isdigit():
+            pinned.append('.'.join(parts))
+            part = 'item'
+        parts.append(part)
+    return '.'.join(parts), tuple(pinned)
+
+
+def _extract_streaming(body: bytes, item_spec: ItemSpec, top_fields:
+    Iterable[str]) ->Tuple[Optional[List[Dict[str, Any]]], Dict[str, Any]]:
+    wanted_top = set(top_fields)
+    item_paths = {}
+    for path, keys in item_spec.items():
+        prefix, pinned = _stream_path(path)
+        item_paths[prefix] = keys, pinned
+    pinned_lists = {p for _, pinned in item_paths.values() for p in pinned}
+    element_starts = {f'{p}.item': p for p in pinned_lists}
+    positions: Dict[str, int] = {}
+    top: Dict[str, Any] = {}
+    items: Optional[List[Dict[str, Any]]] = None
+    current: Optional[Dict[str, Any]] = None
+    for prefix, event, value in ijson.parse(body, use_float=True):
+        if prefix in pinned_lists and event == 'start_array':
+            positions[prefix] = -1
+        elif prefix in element_starts and (event in _SCALAR_EVENTS or
+            event.startswith('start_')):
+            positions[element_starts[prefix]] += 1
+        spec = item_paths.get(prefix)
+        if spec is not None:
+            keys, pinned = spec
+            if (current is not None and value is not None and event in
+                _SCALAR_EVENTS and all(positions.get(p) == 0 for p in pinned)
+                ):
+                _put(current, keys, value)
+        elif prefix == 'data.item':
+            if event == 'start_map':
+                current = {}
+            elif event == 'end_map':
+                items.append(current)
+                current = None
+        elif prefix == 'data':
+            if event == 'start_array':
+                items = []
+        elif prefix in wanted_top and event in _SCALAR_EVENTS:
+            top.setdefault(prefix, value)
+    return items, top
+
+
+def extract_page(body: bytes, item_spec: ItemSpec, top_fields: Iterable[
+    str]=()) ->Tuple[Optional[List[Dict[str, Any]]], Dict[str, Any]]:
+    """
+    Pulls only the fields named in item_spec out of each element of a
+    JSON:API page's 'data' array, plus the dotted top_fields (e.g.
+    'links.next'). A numeric path part reads only that list element, so
+    fields pinned to one element never mix values from different elements.
+    Items keep the original nesting, so callers read them as before.
+    Bodies of STREAMING_MIN_BYTES or more are streamed with ijson when a C
+    backend is installed, so the full object graph is never built; smaller
+    ones are parsed with json (faster per byte) and projected right away.
+    Items is None when 'data' is not a list.
+    """
+    if STREAMING_AVAILABLE and len(body) >= STREAMING_MIN_BYTES:
+        return _extract_streaming(body, item_spec, top_fields)
+    return _extract_parsed(body, item_spec, top_fields)
@@ -1,16 +1,21 @@
-import requests
+import httpx
 import json
 import os
 import logging
-import asyncio
-import functools
 from typing import Optional, List, Dict, Any, Tuple
 from config import ME_BASE_URL
+from .http_client import get_http_client, UPSTREAM_ME
+from .concurrency import send_with_retries
+from .single_flight import single_flight
+from .response_cache import cached, me_endpoint_policy
 logger = logging.getLogger(__name__)
 
 
-async def _fetch_page_m(endpoint_tmpl: str, params: dict, api_key: str, ct:
-    Optional[str]=None, lmt: int=20) ->Tuple[Optional[Any], Optional[str]]:
+@single_flight('me_page')
+async def fetch_page_m_uncached(endpoint_tmpl: str, params: dict, api_key:
+    str, ct: Optional[str]=None, lmt: int=20) ->Tuple[Optional[Any],
+    Optional[str]]:
+    """One ME API page, bypassing the response cache (_fetch_page_m is the cached form)."""
     if not api_key:
         return None, 'Error: API Key not configured.'
     if not ME_BASE_URL:
@@ -26,10 +31,10 @@ async def _fetch_page_m(endpoint_tmpl: str, params: dict, api_key: str, ct:
     log_ep = log_ep_parts[-1] if log_ep_parts[-1] else log_ep_parts[-2]
     logger.info(f'Requesting ME API: Endpoint={log_ep}, Limit={lmt}{log_ct}')
     try:
-        loop = asyncio.get_running_loop()
-        func_call = functools.partial(requests.get, url, headers=headers,
-            params=current_params, timeout=15)
-        response = await loop.run_in_executor(None, func_call)
+        client = get_http_client(UPSTREAM_ME)
+        response = await send_with_retries(UPSTREAM_ME, lambda : client.
+            get(url, headers=headers, params=current_params, timeout=15),
+            f'ME {log_ep}')
         response.raise_for_status()
         data = response.json()
         if isinstance(data, dict):
@@ -64,10 +69,10 @@ async def _fetch_page_m(endpoint_tmpl: str, params: dict, api_key: str, ct:
                 f'Unexpected API response format (expected dict, got {type(data)}): {data}'
                 )
             return None, 'Error: Unexpected API response format.'
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         logger.error(f'API request timeout for {log_ep}: {url}')
         return None, 'Error: API request timed out.'
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f'API request error for {log_ep}: {e}')
         if hasattr(e, 'response') and e.response is not None:
             status_code = e.response.status_code
@@ -83,5 +88,10 @@ async def _fetch_page_m(endpoint_tmpl: str, params: dict, api_key: str, ct:
                 return None, f'API Error ({status_code}).'
         return None, f'Error communicating with API.'
     except Exception as e:
-        logger.exception(f'Unexpected error in _fetch_page_m for {log_ep}')
+        logger.exception(
+            f'Unexpected error in fetch_page_m_uncached for {log_ep}')
         return None, f'An unexpected error occurred.'
+
+
+_fetch_page_m = cached('me_page', lambda endpoint_tmpl, *args, **kwargs:
+    me_endpoint_policy(endpoint_tmpl))(fetch_page_m_uncached)
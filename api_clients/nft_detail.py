@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Tuple, List, Set
+from .fetch_nft_overview import fetch_nft_overview
+from .fetch_nft_bids import fetch_token_bids
+from .fetch_nft_activity import fetch_token_activity
+from .response_cache import CachePolicy, fresh_responses
+logger = logging.getLogger(__name__)
+NFT_DETAIL_PAGE_SIZE = 5
+NFT_DETAIL_POLICY = CachePolicy(ttl=20, stale_ttl=100)
+MAX_NFT_DETAILS = 500
+PageResult = Tuple[Optional[List[Dict[str, Any]]], Optional[str]]
+
+
+@dataclass
+class NftDetailBundle:
+    """Everything the Info view's tabs show for one NFT, fetched together."""
+    nft_id: str
+    overview: Tuple[Optional[Dict[str, Any]], Optional[str]]
+    bids: PageResult
+    activity: PageResult
+    fetched_at: float
+
+    def first_page(self, tab: str) ->Optional[PageResult]:
+        """The tab's first page ('bids' or 'activity'), or None if it failed to load."""
+        result = self.bids if tab == 'bids' else self.activity
+        return result if result[0] is not None else None
+
+
+class NftDetailStore:
+    """
+    NFT detail bundles keyed by contract:tokenId. A miss fetches the
+    overview and the first bids and activity pages concurrently; an entry
+    past its TTL but inside the stale window is served while one
+    background refresh replaces it. Loads skip the response cache lookup
+    (see fresh_responses), so fetched_at is the time the data was actually
+    fetched. Bundles whose overview failed are not kept. At most
+    max_entries are kept, least recently used evicted first.
+    """
+
+    def __init__(self, policy: CachePolicy, max_entries: int):
+        self.policy = policy
+        self.max_entries = max(1, max_entries)
+        self._bundles: 'OrderedDict[str, NftDetailBundle]' = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    async def get(self, contract: str, token_id: str) ->NftDetailBundle:
+        nft_id = f'{contract.lower()}:{token_id}'
+        bundle = self._bundles.get(nft_id)
+        if bundle is not None:
+            age = time.monotonic() - bundle.fetched_at
+            if age <= self.policy.ttl + self.policy.stale_ttl:
+                self._bundles.move_to_end(nft_id)
+                if age <= self.policy.ttl:
+                    self.hits += 1
+                else:
+                    self.stale_hits += 1
+                    self._refresh(nft_id, contract, token_id)
+                return bundle
+            del self._bundles[nft_id]
+        self.misses += 1
+        return await asyncio.shield(self._refresh(nft_id, contract, token_id))
+
+    def _refresh(self, nft_id: str, contract: str, token_id: str
+        ) ->asyncio.Task:
+        task = self._in_flight.get(nft_id)
+        if task is None:
+            task = asyncio.ensure_future(self._load(nft_id, contract, token_id)
+                )
+            self._in_flight[nft_id] = task
+            self._background.add(task)
+            task.add_done_callback(lambda t: self._in_flight.pop(nft_id, None))
+            task.add_done_callback(self._background.discard)
+        return task
+
+    async def _load(self, nft_id: str, contract: str, token_id: str
+        ) ->NftDetailBundle:
+        with fresh_responses():
+            overview, bids, activity = await asyncio.gather(
+                fetch_nft_overview(contract, token_id), fetch_token_bids(
+                contract, token_id, limit=NFT_DETAIL_PAGE_SIZE),
+                fetch_token_activity(contract, token_id, limit=
+                NFT_DETAIL_PAGE_SIZE))
+        bundle = NftDetailBundle(nft_id, overview, bids, activity, time.
+            monotonic())
+        if overview[0] is not None:
+            self._bundles[nft_id] = bundle
+            self._bundles.move_to_end(nft_id)
+            while len(self._bundles) > self.max_entries:
+                self._bundles.popitem(last=False)
+        else:
+            self._bundles.pop(nft_id, None)
+        return bundle
+
+    def stats(self) ->Dict[str, Any]:
+        return {'entries': len(self._bundles), 'hits': self.hits,
+            'stale_hits': self.stale_hits, 'misses': self.misses}
+
+
+nft_detail_store = NftDetailStore(NFT_DETAIL_POLICY, MAX_NFT_DETAILS)
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import time
+from typing import Optional, Mapping
+logger = logging.getLogger(__name__)
+RATE_LIMIT_REMAINING_HEADERS = ('ratelimit-remaining',
+    'x-ratelimit-remaining')
+RATE_LIMIT_RESET_HEADERS = 'ratelimit-reset', 'x-ratelimit-reset'
+
+
+def _header_number(headers: Mapping[str, str], names) ->Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def parse_retry_after(headers: Mapping[str, str]) ->Optional[float]:
+    """Returns Retry-After in seconds (numeric form only), or None."""
+    return _header_number(headers, ('retry-after',))
+
+
+class AdaptivePacer:
+    """
+    Spaces out request starts for one upstream.
+    The interval shrinks gently while responses are healthy and doubles on
+    429s; rate-limit headers (remaining/reset, Retry-After) push the next
+    allowed start time out directly. Waiters are served in arrival order.
+    """
+
+    def __init__(self, initial_interval: float=0.2, min_interval: float=
+        0.05, max_interval: float=10.0):
+        self.interval = initial_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.throttled_count = 0
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) ->None:
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            if delay > 0:
+                await asyncio.sleep(delay)
+                now = time.monotonic()
+            self._next_at = now + self.interval
+
+    def _push_back(self, seconds: float) ->None:
+        self._next_at = max(self._next_at, time.monotonic() + seconds)
+
+    def on_response(self, status_code: int, headers: Mapping[str, str]
+        ) ->None:
+        if status_code == 429:
+            self.throttled_count += 1
+            self.interval = min(self.max_interval, self.interval * 2)
+            retry_after = parse_retry_after(headers)
+            self._push_back(retry_after if retry_after is not None else
+                self.interval)
+            logger.warning(
+                f'Upstream throttled (429). Pacer interval now {self.interval:.2f}s'
+                )
+            return
+        if status_code < 500:
+            self.interval = max(self.min_interval, self.interval * 0.9)
+        remaining = _header_number(headers, RATE_LIMIT_REMAINING_HEADERS)
+        reset = _header_number(headers, RATE_LIMIT_RESET_HEADERS)
+        if remaining is not None and remaining <= 1 and reset is not None:
+            if reset > 1000000000:
+                reset = reset - time.time()
+            if reset > 0:
+                self._push_back(min(reset, self.max_interval))
+                logger.debug(
+                    f'Rate-limit budget exhausted, pausing {reset:.2f}s')
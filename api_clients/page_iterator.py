@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import time
+from typing import Optional, List, Any, Tuple, Callable, Awaitable
+logger = logging.getLogger(__name__)
+PageResult = Tuple[Optional[List[Any]], Optional[str]]
+PageFetcher = Callable[[Optional[str]], Awaitable[PageResult]]
+
+
+class PageIterator:
+    """
+    Walks a continuation-paged fetcher (any fetch_page(continuation) that
+    returns (items, next_continuation) or (None, error)) one page at a
+    time. As soon as a page is handed out, the page after it is requested
+    in the background, so the next call is usually served from that
+    read-ahead. At most one page is fetched ahead: nothing more is
+    requested until it is consumed, and close() cancels it. A preloaded
+    result (fetched elsewhere for the same position) is returned by the
+    first call instead of fetching.
+    """
+
+    def __init__(self, fetch_page: PageFetcher, continuation: Optional[str
+        ]=None, offset: int=0, preloaded: Optional[PageResult]=None):
+        self._fetch_page = fetch_page
+        self._preloaded = preloaded
+        self.continuation = continuation
+        self.offset = offset
+        self.exhausted = False
+        self.touched_at = time.monotonic()
+        self._ahead: Optional[asyncio.Task] = None
+        self.prefetch_hits = 0
+
+    @property
+    def has_more(self) ->bool:
+        return not self.exhausted
+
+    @property
+    def ready(self) ->bool:
+        """True when the next page has already been fetched ahead."""
+        return self._ahead is not None and self._ahead.done()
+
+    async def next_page(self) ->PageResult:
+        """
+        The next page and its continuation; ([], None) once exhausted. An
+        error leaves the position unchanged, so calling again retries it.
+        """
+        self.touched_at = time.monotonic()
+        if self.exhausted:
+            return [], None
+        if self._preloaded is not None:
+            items, next_ct_or_error = self._preloaded
+            self._preloaded = None
+        else:
+            task, self._ahead = self._ahead, None
+            if task is not None and task.done():
+                self.prefetch_hits += 1
+            if task is None:
+                task = asyncio.ensure_future(self._fetch_page(self.
+                    continuation))
+            items, next_ct_or_error = await task
+        if items is None:
+            return None, next_ct_or_error
+        self.offset += len(items)
+        self.continuation = next_ct_or_error
+        if not items or not next_ct_or_error:
+            self.exhausted = True
+        else:
+            self._ahead = asyncio.ensure_future(self._fetch_page(
+                next_ct_or_error))
+            self._ahead.add_done_callback(_log_prefetch_failure)
+        return items, next_ct_or_error
+
+    def close(self) ->None:
+        if self._ahead is not None and not self._ahead.done():
+            self._ahead.cancel()
+        self._ahead = None
+
+
+def _log_prefetch_failure(task: asyncio.Task) ->None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f'Page prefetch failed: {task.exception()}')
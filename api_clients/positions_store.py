@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Tuple
+from config import POSITIONS_TTL_SECONDS, POSITIONS_MAX_WALLETS
+from utils.token_position import TokenPosition, position_from_item
+from .wallet_api import fetch_wallet_token_balances
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PositionsSnapshot:
+    """One wallet's fungible positions, sorted by value as Zerion returns them."""
+    address: str
+    positions: Tuple[TokenPosition, ...]
+    fetched_at: float
+
+    def __len__(self) ->int:
+        return len(self.positions)
+
+    def page(self, offset: int, limit: int) ->Tuple[TokenPosition, ...]:
+        return self.positions[offset:offset + limit]
+
+    @property
+    def total_value(self) ->float:
+        return sum(p.value for p in self.positions if p.value is not None)
+
+
+class PositionsStore:
+    """
+    Address-keyed positions snapshots shared by every user. A wallet costs
+    one upstream call per TTL however many users page through it, as
+    concurrent misses for one address share a single fetch; at most
+    max_wallets snapshots are kept, least recently used evicted first.
+    """
+
+    def __init__(self, ttl: float, max_wallets: int):
+        self.ttl = ttl
+        self.max_wallets = max(1, max_wallets)
+        self._snapshots: 'OrderedDict[str, PositionsSnapshot]' = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def peek(self, address: str) ->Optional[PositionsSnapshot]:
+        """The cached snapshot if still fresh, without fetching."""
+        key = address.lower()
+        snapshot = self._snapshots.get(key)
+        if snapshot is None:
+            return None
+        if time.monotonic() - snapshot.fetched_at > self.ttl:
+            del self._snapshots[key]
+            return None
+        self._snapshots.move_to_end(key)
+        return snapshot
+
+    async def get(self, address: str) ->Tuple[Optional[PositionsSnapshot],
+        Optional[str]]:
+        snapshot = self.peek(address)
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot, None
+        self.misses += 1
+        key = address.lower()
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(address))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _load(self, address: str) ->Tuple[Optional[PositionsSnapshot
+        ], Optional[str]]:
+        items, error_msg = await fetch_wallet_token_balances(address=address)
+        if items is None:
+            return None, error_msg
+        snapshot = PositionsSnapshot(address, tuple(position_from_item(item
+            ) for item in items), time.monotonic())
+        self.put(snapshot)
+        logger.debug(
+            f'Stored positions snapshot for {address} ({len(snapshot)} tokens)'
+            )
+        return snapshot, None
+
+    def put(self, snapshot: PositionsSnapshot) ->None:
+        key = snapshot.address.lower()
+        self._snapshots[key] = snapshot
+        self._snapshots.move_to_end(key)
+        while len(self._snapshots) > self.max_wallets:
+            self._snapshots.popitem(last=False)
+
+    def invalidate(self, address: str) ->None:
+        self._snapshots.pop(address.lower(), None)
+
+    def stats(self) ->Dict[str, Any]:
+        return {'wallets': len(self._snapshots), 'positions': sum(len(s) for
+            s in self._snapshots.values()), 'hits': self.hits, 'misses':
+            self.misses}
+
+
+_store: Optional[PositionsStore] = None
+
+
+def get_positions_store() ->PositionsStore:
+    global _store
+    if _store is None:
+        _store = PositionsStore(POSITIONS_TTL_SECONDS, POSITIONS_MAX_WALLETS)
+    return _store
+
+
+def positions_store_stats() ->Dict[str, Any]:
+    return get_positions_store().stats()
@@ -0,0 +1,212 @@
+import asyncio
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Any, Dict, Tuple, Callable, Set
+from telegram.ext import ContextTypes
+from config import RESPONSE_CACHE_MAX_MB
+from .single_flight import make_call_key
+logger = logging.getLogger(__name__)
+CACHE_STATS_LOG_INTERVAL_SECONDS = 300
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: float
+    stale_ttl: float = 0.0
+
+
+ME_TRENDING_POLICY = CachePolicy(ttl=60, stale_ttl=60)
+ME_USER_COLLECTIONS_POLICY = CachePolicy(ttl=120, stale_ttl=120)
+ME_COLLECTION_METADATA_POLICY = CachePolicy(ttl=300, stale_ttl=600)
+ME_ENDPOINT_POLICIES = [('/collections/trending/', ME_TRENDING_POLICY), (
+    '/collections/v7', ME_COLLECTION_METADATA_POLICY), ('/tokens/v7',
+    CachePolicy(ttl=60, stale_ttl=60)), ('/tokens/v6', CachePolicy(ttl=30,
+    stale_ttl=30)), ('/orders/bids/', CachePolicy(ttl=15, stale_ttl=15)), (
+    '/activity/', CachePolicy(ttl=20, stale_ttl=20))]
+
+
+def me_endpoint_policy(endpoint_tmpl: str) ->Optional[CachePolicy]:
+    for fragment, policy in ME_ENDPOINT_POLICIES:
+        if fragment in endpoint_tmpl:
+            return policy
+    return None
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    stored_at: float
+    policy: CachePolicy
+
+
+class ResponseCache:
+    """
+    Bounded in-memory cache of fetcher results.
+    Entries are evicted least-recently-used once the approximate payload size
+    exceeds max_bytes. An entry past its TTL but inside its stale window is
+    still served while a single background refresh replaces it.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._bytes = 0
+        self._refreshing: Set[str] = set()
+        self._background: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) ->Tuple[Any, Optional[str]]:
+        """Returns (value, 'fresh' | 'stale') or (None, None) on a miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, None
+        age = time.monotonic() - entry.stored_at
+        if age <= entry.policy.ttl:
+            self._entries.move_to_end(key)
+            return entry.value, 'fresh'
+        if age <= entry.policy.ttl + entry.policy.stale_ttl:
+            self._entries.move_to_end(key)
+            return entry.value, 'stale'
+        self._remove(key)
+        return None, None
+
+    def lookup(self, key: str) ->Tuple[Any, Optional[str]]:
+        """Like get, but counts the result as a hit, stale hit or miss."""
+        value, state = self.get(key)
+        if state == 'fresh':
+            self.hits += 1
+        elif state == 'stale':
+            self.stale_hits += 1
+        else:
+            self.misses += 1
+        return value, state
+
+    def put(self, key: str, value: Any, policy: CachePolicy) ->None:
+        try:
+            size = len(json.dumps(value, default=str))
+        except (TypeError, ValueError):
+            return
+        if size > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = _Entry(value, size, time.monotonic(), policy)
+        self._bytes += size
+        while self._bytes > self.max_bytes and self._entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key: str) ->None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def invalidate(self, key: str) ->None:
+        self._remove(key)
+
+    def stats(self) ->Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {'entries': len(self._entries), 'bytes': self._bytes,
+            'hits': self.hits, 'stale_hits': self.stale_hits, 'misses':
+            self.misses, 'evictions': self.evictions, 'hit_ratio': (self.
+            hits + self.stale_hits) / lookups if lookups else 0.0}
+
+    def _schedule_refresh(self, key: str, func, args, kwargs, policy:
+        CachePolicy) ->None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                result = await func(*args, **kwargs)
+                if _is_cacheable(result):
+                    self.put(key, result, policy)
+            except Exception as e:
+                logger.warning(f'Background cache refresh failed: {e}')
+            finally:
+                self._refreshing.discard(key)
+        task = asyncio.ensure_future(refresh())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+
+def _is_cacheable(result: Any) ->bool:
+    """Only successful (data, ...) tuples are cached; errors are always refetched."""
+    return isinstance(result, tuple) and len(result) == 2 and result[0
+        ] is not None
+
+
+me_cache = ResponseCache(RESPONSE_CACHE_MAX_MB * 1024 * 1024)
+_bypass_lookups = contextvars.ContextVar('bypass_response_cache', default=
+    False)
+
+
+@contextlib.contextmanager
+def fresh_responses():
+    """
+    Within this block (and tasks started from it) cached fetchers skip the
+    lookup and call upstream, storing the fresh result for everyone else.
+    For callers that keep their own copy and must not stamp a cached
+    response with a new fetch time.
+    """
+    token = _bypass_lookups.set(True)
+    try:
+        yield
+    finally:
+        _bypass_lookups.reset(token)
+
+
+def cached(name: str, policy_for: Callable[..., Optional[CachePolicy]],
+    cache: ResponseCache=me_cache):
+    """
+    Decorator caching an async fetcher's successful results under a policy
+    chosen per call by policy_for(*args, **kwargs); None means do not cache.
+    """
+
+    def decorator(func):
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            policy = policy_for(*args, **kwargs)
+            if policy is None:
+                return await func(*args, **kwargs)
+            key = make_call_key(name, args, kwargs)
+            if _bypass_lookups.get():
+                cache.misses += 1
+                value, state = None, None
+            else:
+                value, state = cache.lookup(key)
+            if state == 'fresh':
+                return value
+            if state == 'stale':
+                cache._schedule_refresh(key, func, args, kwargs, policy)
+                return value
+            result = await func(*args, **kwargs)
+            if _is_cacheable(result):
+                cache.put(key, result, policy)
+            return result
+        return wrapper
+    return decorator
+
+
+def response_cache_stats() ->Dict[str, Any]:
+    return me_cache.stats()
+
+
+async def log_cache_stats_job(context: ContextTypes.DEFAULT_TYPE) ->None:
+    """JobQueue callback: logs response cache hit ratio and size."""
+    stats = me_cache.stats()
+    logger.info(
+        f"Response cache: {stats['entries']} entries, {stats['bytes']} bytes, hit ratio {stats['hit_ratio']:.2f} ({stats['hits']} hits, {stats['stale_hits']} stale, {stats['misses']} misses, {stats['evictions']} evictions)"
+        )
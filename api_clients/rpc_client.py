@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+from .http_client import get_http_client, UPSTREAM_RPC
+from .concurrency import get_concurrency_limiter
+logger = logging.getLogger(__name__)
+BATCH_WINDOW_SECONDS = 0.005
+MAX_BATCH_SIZE = 50
+RPC_TIMEOUT_SECONDS = 10.0
+ENDPOINT_BACKOFF_BASE_SECONDS = 2.0
+ENDPOINT_BACKOFF_MAX_SECONDS = 120.0
+
+
+class RpcError(Exception):
+    """A JSON-RPC error object returned by the node for one request."""
+
+    def __init__(self, message: str, code: Optional[int]=None):
+        super().__init__(message)
+        self.code = code
+
+
+class RpcUnavailableError(Exception):
+    """No configured RPC endpoint answered the batch."""
+
+
+@dataclass
+class EndpointHealth:
+    url: str
+    consecutive_failures: int = 0
+    down_until: float = 0.0
+    last_latency: Optional[float] = None
+    last_error: Optional[str] = None
+
+    @property
+    def healthy(self) ->bool:
+        return self.down_until <= time.monotonic()
+
+    def mark_success(self, latency: float) ->None:
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+        self.last_latency = latency
+        self.last_error = None
+
+    def mark_failure(self, error: str) ->None:
+        self.consecutive_failures += 1
+        backoff = min(ENDPOINT_BACKOFF_MAX_SECONDS,
+            ENDPOINT_BACKOFF_BASE_SECONDS * 2 ** (self.consecutive_failures -
+            1))
+        self.down_until = time.monotonic() + backoff
+        self.last_error = error
+
+
+class AsyncRpcClient:
+    """
+    Async JSON-RPC client over the shared httpx pool.
+    Calls made within BATCH_WINDOW_SECONDS of each other are sent as one
+    batch POST. Endpoints are tried in configured order, skipping ones that
+    recently failed, and a failing endpoint backs off exponentially.
+    """
+
+    def __init__(self, urls: List[str], batch_window: float=
+        BATCH_WINDOW_SECONDS, max_batch_size: int=MAX_BATCH_SIZE):
+        if not urls:
+            raise ValueError('AsyncRpcClient needs at least one RPC URL')
+        self.endpoints = [EndpointHealth(url) for url in urls]
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[int, str, list, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._next_id = 0
+        self._inflight: set = set()
+        self.batches_sent = 0
+        self.requests_sent = 0
+
+    async def call(self, method: str, params: Optional[list]=None) ->Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._next_id += 1
+        self._pending.append((self._next_id, method, params or [], future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self.
+                _flush)
+        return await future
+
+    def _flush(self) ->None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._send_batch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    def _endpoint_order(self) ->List[EndpointHealth]:
+        healthy = [e for e in self.endpoints if e.healthy]
+        cooling = sorted((e for e in self.endpoints if not e.healthy), key=
+            lambda e: e.down_until)
+        return healthy + cooling
+
+    async def post(self, endpoint: EndpointHealth, payload: Any) ->Any:
+        """POSTs one payload to one endpoint and updates its health."""
+        client = get_http_client(UPSTREAM_RPC)
+        started = time.monotonic()
+        try:
+            async with get_concurrency_limiter(UPSTREAM_RPC).slot() as slot:
+                response = await client.post(endpoint.url, json=payload,
+                    timeout=RPC_TIMEOUT_SECONDS)
+                slot.observe(response.status_code)
+            response.raise_for_status()
+            body = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            endpoint.mark_failure(str(e) or type(e).__name__)
+            logger.warning(
+                f'RPC endpoint #{self.endpoints.index(endpoint)} failed ({endpoint.consecutive_failures}x): {e}'
+                )
+            raise
+        if endpoint.consecutive_failures:
+            logger.info(
+                f'RPC endpoint #{self.endpoints.index(endpoint)} recovered after {endpoint.consecutive_failures} failure(s)'
+                )
+        endpoint.mark_success(time.monotonic() - started)
+        return body
+
+    async def probe(self) ->int:
+        """
+        Sends eth_blockNumber to every endpoint, outside the batch queue.
+        Recovered endpoints are put back into rotation immediately instead of
+        waiting out their backoff. Returns the number of healthy endpoints.
+        """
+        payload = {'jsonrpc': '2.0', 'id': 0, 'method': 'eth_blockNumber',
+            'params': []}
+
+        async def probe_one(endpoint: EndpointHealth) ->bool:
+            try:
+                await self.post(endpoint, payload)
+                return True
+            except (httpx.HTTPError, ValueError):
+                return False
+        results = await asyncio.gather(*(probe_one(e) for e in self.endpoints)
+            )
+        return sum(results)
+
+    async def _send_batch(self, batch: List[Tuple[int, str, list, asyncio.
+        Future]]) ->None:
+        requests = [{'jsonrpc': '2.0', 'id': req_id, 'method': method,
+            'params': params} for req_id, method, params, _ in batch]
+        payload = requests if len(requests) > 1 else requests[0]
+        body = None
+        for endpoint in self._endpoint_order():
+            try:
+                body = await self.post(endpoint, payload)
+                break
+            except (httpx.HTTPError, ValueError):
+                continue
+        self.batches_sent += 1
+        self.requests_sent += len(batch)
+        if body is None:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(RpcUnavailableError(
+                        'No RPC endpoint available'))
+            return
+        responses = body if isinstance(body, list) else [body]
+        by_id: Dict[Any, Dict[str, Any]] = {r.get('id'): r for r in
+            responses if isinstance(r, dict)}
+        for req_id, method, _, future in batch:
+            if future.done():
+                continue
+            item = by_id.get(req_id)
+            if item is None:
+                future.set_exception(RpcError(
+                    f'No response for {method} in batch'))
+            elif item.get('error'):
+                error = item['error']
+                future.set_exception(RpcError(error.get('message',
+                    'RPC error'), error.get('code')))
+            else:
+                future.set_result(item.get('result'))
+
+    def stats(self) ->Dict[str, Any]:
+        return {'batches_sent': self.batches_sent, 'requests_sent': self.
+            requests_sent, 'endpoints': [{'healthy': e.healthy,
+            'failures': e.consecutive_failures, 'latency': e.last_latency} for
+            e in self.endpoints]}
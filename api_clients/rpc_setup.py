@@ -1,19 +1,38 @@
 import logging
-from web3 import Web3
-from config import RPC_URL
+from typing import Optional
+from telegram.ext import ContextTypes
+from config import RPC_URLS
+from .rpc_client import AsyncRpcClient
 logger = logging.getLogger(__name__)
-w3 = None
-if not RPC_URL:
-    logger.error('RPC_URL not found in config.')
-else:
-    try:
-        w3 = Web3(Web3.HTTPProvider(RPC_URL))
-        if not w3.is_connected():
-            logger.error(
-                f'Failed to connect to RPC endpoint defined in config.')
-            w3 = None
-        else:
-            logger.info(f'Successfully connected to RPC endpoint.')
-    except Exception as e:
-        logger.error(f'Error initializing Web3 connection: {e}')
-        w3 = None
+RPC_HEALTH_PROBE_INTERVAL_SECONDS = 30
+RPC_HEALTH_PROBE_FIRST_SECONDS = 10
+_rpc_client: Optional[AsyncRpcClient] = None
+
+
+def get_rpc_client() ->Optional[AsyncRpcClient]:
+    """
+    Returns the shared RPC client, creating it on first use. Creation does
+    no network I/O; endpoint health is learned from real calls and probes.
+    """
+    global _rpc_client
+    if _rpc_client is None:
+        if not RPC_URLS:
+            logger.error('RPC_URL not found in config.')
+            return None
+        _rpc_client = AsyncRpcClient(RPC_URLS)
+        logger.info(f'Configured RPC client with {len(RPC_URLS)} endpoint(s).')
+    return _rpc_client
+
+
+async def probe_rpc_job(context: ContextTypes.DEFAULT_TYPE) ->None:
+    """JobQueue callback: background health probe that brings failed endpoints back."""
+    client = get_rpc_client()
+    if client is None:
+        return
+    healthy = await client.probe()
+    if healthy == 0:
+        logger.warning('RPC health probe: no endpoint is reachable.')
+    else:
+        logger.debug(
+            f'RPC health probe: {healthy}/{len(client.endpoints)} endpoints healthy.'
+            )
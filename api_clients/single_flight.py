@@ -0,0 +1,49 @@
+import asyncio
+import functools
+import json
+import logging
+from typing import Dict, Any, Tuple
+logger = logging.getLogger(__name__)
+_in_flight: Dict[str, asyncio.Task] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def make_call_key(name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]
+    ) ->str:
+    """Stable key for a fetcher call; dict params are order-insensitive."""
+    return name + ':' + json.dumps([args, kwargs], sort_keys=True, default=str)
+
+
+def single_flight(name: str):
+    """
+    Decorator for async fetchers: concurrent calls with identical arguments
+    share one in-flight request and all receive its result. The shared call
+    runs as its own task, so a cancelled waiter does not cancel the others.
+    """
+
+    def decorator(func):
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = make_call_key(name, args, kwargs)
+            stats = _stats.setdefault(name, {'calls': 0, 'leaders': 0,
+                'coalesced': 0})
+            stats['calls'] += 1
+            task = _in_flight.get(key)
+            if task is None:
+                stats['leaders'] += 1
+                task = asyncio.ensure_future(func(*args, **kwargs))
+                _in_flight[key] = task
+                task.add_done_callback(lambda t: _in_flight.pop(key, None) if
+                    _in_flight.get(key) is t else None)
+            else:
+                stats['coalesced'] += 1
+                logger.debug(f'Coalesced in-flight {name} call')
+            return await asyncio.shield(task)
+        return wrapper
+    return decorator
+
+
+def single_flight_stats() ->Dict[str, Dict[str, int]]:
+    """Per-fetcher counters: total calls, upstream requests (leaders), coalesced."""
+    return {name: dict(values) for name, values in _stats.items()}
@@ -1,15 +1,18 @@
 import logging
-import asyncio
-import functools
-import requests
+import httpx
 import json
 import base64
 from typing import Optional, List, Dict, Any, Tuple
 from config import WALLET_API_KEY, WALLET_API_BASE_URL
+from .http_client import get_http_client, UPSTREAM_WALLET
+from .concurrency import send_with_retries
+from .json_extract import extract_page, POSITION_ITEM_FIELDS
+from .single_flight import single_flight
 logger = logging.getLogger(__name__)
 WALLET_API_CHAIN_ID = 'monad-test-v2'
 
 
+@single_flight('wallet_positions')
 async def fetch_wallet_token_balances(address: str, chain_id: str=
     WALLET_API_CHAIN_ID) ->Tuple[Optional[List[Dict[str, Any]]], Optional[str]
     ]:
@@ -35,19 +38,14 @@ async def fetch_wallet_token_balances(address: str, chain_id: str=
         f'Requesting ALL Wallet API Positions: Addr={address}, Chain={chain_id}'
         )
     try:
-        loop = asyncio.get_running_loop()
-        func_call = functools.partial(requests.get, url, headers=headers,
-            params=params, timeout=30)
-        response = await loop.run_in_executor(None, func_call)
+        client = get_http_client(UPSTREAM_WALLET)
+        response = await send_with_retries(UPSTREAM_WALLET, lambda :
+            client.get(url, headers=headers, params=params, timeout=30),
+            'Wallet API positions', retries=0)
         response.raise_for_status()
-        data = response.json()
-        if isinstance(data, dict) and 'data' in data:
-            position_items = data.get('data', [])
-            if not isinstance(position_items, list):
-                logger.error(
-                    f"Wallet API positions 'data' is not list: {position_items}"
-                    )
-                return None, 'Error: Unexpected response structure.'
+        position_items, _ = extract_page(response.content,
+            POSITION_ITEM_FIELDS)
+        if position_items is not None:
             fungible_tokens = [item for item in position_items if 
                 isinstance(item, dict) and item.get('type') == 'positions' and
                 item.get('attributes', {}).get('fungible_info')]
@@ -56,12 +54,13 @@ async def fetch_wallet_token_balances(address: str, chain_id: str=
             return fungible_tokens, None
         else:
             logger.error(
-                f'Unexpected Wallet API positions response format: {data}')
+                f'Unexpected Wallet API positions response format: {response.content[:200]!r}'
+                )
             return None, 'Error: Unexpected API response format.'
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         logger.error(f'Wallet API timeout: {url}')
         return None, 'Error: API request timed out.'
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f'Wallet API positions request error: {e}')
         error_detail = ''
         status_code = 'N/A'
@@ -0,0 +1,288 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Tuple
+from config import INVENTORY_MAX_TOKENS, PORTFOLIO_MAX_COLLECTIONS
+from .fetch_user_nfts import fetch_user_nfts
+from .fetch_user_collections import fetch_user_collections
+from .response_cache import ME_USER_COLLECTIONS_POLICY
+logger = logging.getLogger(__name__)
+INVENTORY_PAGE_SIZE = 100
+INVENTORY_CURSOR_PREFIX = 'inv:'
+MAX_INVENTORIES = 200
+INVENTORY_WAIT_SECONDS = 2.0
+
+
+def _count(raw: Any) ->int:
+    try:
+        return int(float(raw))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _compact_item(item: Dict[str, Any]) ->Dict[str, Any]:
+    """Keeps the fields fmt_nft_list_item reads, in the same nested shape."""
+    token = item.get('token') or {}
+    ownership = item.get('ownership') or {}
+    return {'token': {'contract': token.get('contract'), 'tokenId': token.
+        get('tokenId'), 'name': token.get('name'), 'imageSmall': token.get
+        ('imageSmall') or token.get('image'), 'collection': {'name': (token
+        .get('collection') or {}).get('name')}}, 'ownership': {'tokenCount':
+        ownership.get('tokenCount', '1')}}
+
+
+@dataclass
+class CollectionGroup:
+    """One collection's share of a wallet, summarized like a collections/v3 entry."""
+    summary: Dict[str, Any]
+    items: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class WalletInventory:
+    """
+    A wallet's full token listing (users/{addr}/tokens/v7), grouped by
+    collection in first-seen order, i.e. most recently acquired first.
+    Only usable once the whole listing has been read; the read stops as soon
+    as a wallet passes INVENTORY_MAX_TOKENS, which marks it truncated and
+    leaves it to the per-collection endpoints.
+    """
+
+    def __init__(self, address: str):
+        self.address = address
+        self.groups: Dict[str, CollectionGroup] = {}
+        self.token_count = 0
+        self.complete = False
+        self.truncated = False
+        self.error: Optional[str] = None
+        self.fetched_at = time.monotonic()
+        self._done = asyncio.Event()
+
+    @property
+    def usable(self) ->bool:
+        return self.complete and not self.truncated and self.error is None
+
+    def add_items(self, items: List[Dict[str, Any]]) ->None:
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            token = item.get('token') or {}
+            collection = token.get('collection') or {}
+            coll_id = collection.get('id') or token.get('contract')
+            if not coll_id:
+                continue
+            ownership = item.get('ownership') or {}
+            group = self.groups.get(coll_id.lower())
+            if group is None:
+                floor = collection.get('floorAskPrice') or {}
+                group = CollectionGroup({'collection': {'id': coll_id,
+                    'name': collection.get('name'), 'floorAskPrice': {
+                    'amount': {'native': (floor.get('amount') or {}).get(
+                    'native')}, 'currency': {'symbol': (floor.get(
+                    'currency') or {}).get('symbol')}} if floor else {}},
+                    'ownership': {'tokenCount': 0, 'onSaleCount': 0}})
+                self.groups[coll_id.lower()] = group
+            group.summary['ownership']['tokenCount'] += _count(ownership.
+                get('tokenCount', 1))
+            group.summary['ownership']['onSaleCount'] += _count(ownership.
+                get('onSaleCount', 0))
+            group.items.append(_compact_item(item))
+            self.token_count += 1
+
+    def collection_page(self, offset: int, limit: int) ->Tuple[List[Dict[
+        str, Any]], bool]:
+        """Collection summaries in fetch_user_collections' (page, has_more) form."""
+        summaries = [group.summary for group in self.groups.values()]
+        page = summaries[offset:offset + limit]
+        return page, offset + limit < len(summaries)
+
+    def item_page(self, collection_id: str, continuation: Optional[str],
+        limit: int) ->Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of a collection's items in fetch_user_nfts' (items, continuation) form."""
+        group = self.groups.get(collection_id.lower())
+        if group is None:
+            return [], None
+        start = int(continuation[len(INVENTORY_CURSOR_PREFIX):]
+            ) if continuation else 0
+        end = start + limit
+        next_ct = f'{INVENTORY_CURSOR_PREFIX}{end}' if end < len(group.items
+            ) else None
+        return group.items[start:end], next_ct
+
+    async def wait(self) ->None:
+        await self._done.wait()
+
+    def finish(self) ->None:
+        self.fetched_at = time.monotonic()
+        self._done.set()
+
+
+class WalletInventoryStore:
+    """
+    Inventories keyed by wallet address, each read by one background task
+    that walks every continuation page. start() only kicks the read off, so
+    callers serve from the regular endpoints until it is done; get() waits
+    for it at most a short timeout. A finished inventory is reused for ttl
+    seconds, failed reads are dropped, and at most max_wallets are kept
+    (least recently used first).
+    """
+
+    def __init__(self, ttl: float, max_wallets: int):
+        self.ttl = ttl
+        self.max_wallets = max(1, max_wallets)
+        self._inventories: 'OrderedDict[str, WalletInventory]' = OrderedDict(
+            )
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def start(self, address: str) ->WalletInventory:
+        """The wallet's inventory, starting a background read if there is no current one."""
+        key = address.lower()
+        inventory = self._inventories.get(key)
+        if inventory is not None and inventory._done.is_set() and (
+            inventory.error is not None or time.monotonic() - inventory.
+            fetched_at > self.ttl):
+            inventory = None
+        if inventory is None:
+            inventory = WalletInventory(address)
+            self._inventories[key] = inventory
+            while len(self._inventories) > self.max_wallets:
+                self._inventories.popitem(last=False)
+            task = asyncio.ensure_future(self._read(inventory))
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._tasks.pop(key, None) if
+                self._tasks.get(key) is t else None)
+        self._inventories.move_to_end(key)
+        return inventory
+
+    async def get(self, address: str, timeout: float=INVENTORY_WAIT_SECONDS
+        ) ->WalletInventory:
+        """start(), then waits up to timeout for the read; check usable on the result."""
+        inventory = self.start(address)
+        try:
+            await asyncio.wait_for(inventory.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.debug(
+                f'Inventory for {address} still reading after {timeout}s ({inventory.token_count} tokens so far)'
+                )
+        return inventory
+
+    async def _read(self, inventory: WalletInventory) ->None:
+        continuation = None
+        pages = 0
+        try:
+            while True:
+                items, next_ct_or_error = await fetch_user_nfts(user_address
+                    =inventory.address, continuation_token=continuation,
+                    limit=INVENTORY_PAGE_SIZE)
+                if items is None:
+                    inventory.error = next_ct_or_error or 'API error.'
+                    break
+                pages += 1
+                inventory.add_items(items)
+                if not items or not next_ct_or_error:
+                    inventory.complete = True
+                    break
+                if inventory.token_count >= INVENTORY_MAX_TOKENS:
+                    inventory.truncated = True
+                    inventory.groups.clear()
+                    break
+                continuation = next_ct_or_error
+        except Exception as e:
+            logger.exception(
+                f'Inventory read failed for {inventory.address}')
+            inventory.error = str(e)
+        finally:
+            inventory.finish()
+        logger.info(
+            f'Inventory for {inventory.address}: {inventory.token_count} tokens in {len(inventory.groups)} collections from {pages} pages (complete: {inventory.complete}, truncated: {inventory.truncated})'
+            )
+
+    def stats(self) ->Dict[str, Any]:
+        return {'wallets': len(self._inventories), 'reading': len(self.
+            _tasks), 'tokens': sum(inv.token_count for inv in self.
+            _inventories.values())}
+
+
+inventory_store = WalletInventoryStore(ME_USER_COLLECTIONS_POLICY.ttl,
+    MAX_INVENTORIES)
+
+
+def inventory_ready(user_address: str) ->bool:
+    """Whether the wallet's inventory can serve right now; starts reading it if not."""
+    return inventory_store.start(user_address).usable
+
+
+async def fetch_collection_summaries(user_address: str, offset: int=0,
+    limit: int=5, from_inventory: Optional[bool]=None) ->Tuple[Optional[
+    List[Dict[str, Any]]], Optional[Any]]:
+    """
+    fetch_user_collections served from the wallet's inventory, falling back
+    to the collections endpoint when the inventory is not usable. A listing
+    that began on one source passes from_inventory to stay on it, since the
+    two order collections differently; None picks the inventory only if it
+    is ready now.
+    """
+    if from_inventory is None:
+        from_inventory = inventory_ready(user_address)
+    if from_inventory:
+        inventory = await inventory_store.get(user_address)
+        if inventory.usable:
+            return inventory.collection_page(offset, limit)
+    return await fetch_user_collections(user_address=user_address, offset=
+        offset, limit=limit)
+
+
+async def fetch_collection_items_page(user_address: str, collection_id:
+    str, continuation: Optional[str]=None, limit: int=10) ->Tuple[Optional[
+    List[Dict[str, Any]]], Optional[str]]:
+    """
+    One page of a collection's items from the wallet's inventory, or from
+    the filtered tokens endpoint while the inventory is not ready. Inventory
+    pages carry INVENTORY_CURSOR_PREFIX continuations, so a listing stays on
+    the source it started with.
+    """
+    if continuation is None and inventory_ready(user_address):
+        continuation = f'{INVENTORY_CURSOR_PREFIX}0'
+    if continuation is not None and continuation.startswith(
+        INVENTORY_CURSOR_PREFIX):
+        inventory = await inventory_store.get(user_address)
+        if inventory.usable:
+            return inventory.item_page(collection_id, continuation, limit)
+        return None, 'Item list expired. Open the collection again.'
+    return await fetch_user_nfts(user_address=user_address,
+        collection_id_filter=collection_id, continuation_token=continuation,
+        limit=limit)
+
+
+async def fetch_collection_holdings(user_address: str) ->Tuple[Optional[
+    List[Tuple[str, str, int]]], Optional[str]]:
+    """
+    (collection id, name, token count) for every collection the wallet
+    holds, from its inventory if that is ready within INVENTORY_WAIT_SECONDS
+    or else from up to PORTFOLIO_MAX_COLLECTIONS entries of the collections
+    endpoint.
+    """
+    inventory = await inventory_store.get(user_address)
+    if inventory.usable:
+        summaries = [group.summary for group in inventory.groups.values()]
+    else:
+        summaries = []
+        while len(summaries) < PORTFOLIO_MAX_COLLECTIONS:
+            page, has_more_or_error = await fetch_user_collections(
+                user_address=user_address, offset=len(summaries), limit=
+                INVENTORY_PAGE_SIZE)
+            if page is None:
+                return None, has_more_or_error or 'API error.'
+            summaries.extend(page)
+            if not has_more_or_error:
+                break
+    holdings = []
+    for summary in summaries[:PORTFOLIO_MAX_COLLECTIONS]:
+        collection = summary.get('collection') or {}
+        if not collection.get('id'):
+            continue
+        holdings.append((collection['id'], collection.get('name') or
+            '[No Name]', _count((summary.get('ownership') or {}).get(
+            'tokenCount'))))
+    return holdings, None
@@ -6,6 +6,8 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 BOT_TOKEN = os.getenv('T')
 RPC_URL = os.getenv('R')
+RPC_URLS = [url.strip() for url in [RPC_URL or ''] + os.getenv(
+    'RPC_FALLBACK_URLS', '').split(',') if url.strip()]
 ME_API_KEY = os.getenv('MEK')
 WALLET_API_KEY = os.getenv('WK')
 NETWORK = 'monad-testnet'
@@ -52,6 +54,140 @@ try:
 except ValueError:
     logger.warning('Invalid page size')
     TOP_COLL_RESULTS_PER_PAGE = 30
+try:
+    ME_MAX_CONNECTIONS = int(os.getenv('ME_MAX_CONNECTIONS', 20))
+except ValueError:
+    logger.warning('Invalid connection limit')
+    ME_MAX_CONNECTIONS = 20
+try:
+    WALLET_API_MAX_CONNECTIONS = int(os.getenv('WALLET_API_MAX_CONNECTIONS',
+        10))
+except ValueError:
+    logger.warning('Invalid connection limit')
+    WALLET_API_MAX_CONNECTIONS = 10
+try:
+    RPC_MAX_CONNECTIONS = int(os.getenv('RPC_MAX_CONNECTIONS', 10))
+except ValueError:
+    logger.warning('Invalid connection limit')
+    RPC_MAX_CONNECTIONS = 10
+try:
+    SCAN_PARTITIONS = int(os.getenv('SCAN_PARTITIONS', 4))
+except ValueError:
+    logger.warning('Invalid scan partition count')
+    SCAN_PARTITIONS = 4
+try:
+    SCAN_WORKERS = int(os.getenv('SCAN_WORKERS', 3))
+except ValueError:
+    logger.warning('Invalid scan worker count')
+    SCAN_WORKERS = 3
+try:
+    RESPONSE_CACHE_MAX_MB = int(os.getenv('RESPONSE_CACHE_MAX_MB', 32))
+except ValueError:
+    logger.warning('Invalid cache size')
+    RESPONSE_CACHE_MAX_MB = 32
+BOT_MODE = os.getenv('BOT_MODE', 'polling').strip().lower()
+WEBHOOK_URL = os.getenv('WEBHOOK_URL')
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/telegram')
+WEBHOOK_LISTEN = os.getenv('WEBHOOK_LISTEN', '127.0.0.1')
+WEBHOOK_SECRET_TOKEN = os.getenv('WEBHOOK_SECRET_TOKEN')
+TELEGRAM_API_BASE_URL = os.getenv('TELEGRAM_API_BASE_URL')
+try:
+    WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 8080))
+except ValueError:
+    logger.warning('Invalid webhook port')
+    WEBHOOK_PORT = 8080
+try:
+    CONCURRENT_UPDATES = int(os.getenv('CONCURRENT_UPDATES', 16))
+except ValueError:
+    logger.warning('Invalid concurrent update count')
+    CONCURRENT_UPDATES = 16
+try:
+    MAX_PENDING_UPDATES = int(os.getenv('MAX_PENDING_UPDATES',
+        CONCURRENT_UPDATES * 8))
+except ValueError:
+    logger.warning('Invalid pending update limit')
+    MAX_PENDING_UPDATES = CONCURRENT_UPDATES * 8
+if BOT_MODE not in ('polling', 'webhook'):
+    logger.warning(f'Unknown BOT_MODE {BOT_MODE}, using polling')
+    BOT_MODE = 'polling'
+try:
+    SESSION_MAX_BYTES_PER_USER = int(os.getenv(
+        'SESSION_MAX_BYTES_PER_USER', 512 * 1024))
+except ValueError:
+    logger.warning('Invalid session size cap')
+    SESSION_MAX_BYTES_PER_USER = 512 * 1024
+try:
+    USER_DATA_IDLE_SECONDS = int(os.getenv('USER_DATA_IDLE_SECONDS', 3600))
+except ValueError:
+    logger.warning('Invalid user data idle time')
+    USER_DATA_IDLE_SECONDS = 3600
+try:
+    COMMAND_RATE_CAPACITY = float(os.getenv('COMMAND_RATE_CAPACITY', 6))
+    if COMMAND_RATE_CAPACITY <= 0:
+        raise ValueError(COMMAND_RATE_CAPACITY)
+except ValueError:
+    logger.warning('Invalid command rate capacity')
+    COMMAND_RATE_CAPACITY = 6.0
+try:
+    COMMAND_RATE_REFILL_PER_SECOND = float(os.getenv(
+        'COMMAND_RATE_REFILL_PER_SECOND', 0.2))
+    if COMMAND_RATE_REFILL_PER_SECOND <= 0:
+        raise ValueError(COMMAND_RATE_REFILL_PER_SECOND)
+except ValueError:
+    logger.warning('Invalid command rate refill')
+    COMMAND_RATE_REFILL_PER_SECOND = 0.2
+COMMAND_RATE_COSTS = {'start': 1, 'commands': 1, 'balance': 1,
+    'transactioncount': 1, 'tokens': 2, 'nfts': 2, 'mynftactivity': 2,
+    'topcollections': 2, 'portfolio': 3, 'uniquecontracts': 6}
+for _item in os.getenv('COMMAND_RATE_COSTS', '').split(','):
+    _name, _, _cost = _item.strip().partition('=')
+    if not _name:
+        continue
+    try:
+        COMMAND_RATE_COSTS[_name.strip().lower()] = float(_cost)
+    except ValueError:
+        logger.warning(f'Invalid command rate cost for {_name}')
+try:
+    UNIQUE_EXACT_LIMIT = int(os.getenv('UNIQUE_EXACT_LIMIT', 250000))
+except ValueError:
+    logger.warning('Invalid exact unique address limit')
+    UNIQUE_EXACT_LIMIT = 250000
+try:
+    SCAN_CHECKPOINT_PAGES = int(os.getenv('SCAN_CHECKPOINT_PAGES', 10))
+except ValueError:
+    logger.warning('Invalid scan checkpoint interval')
+    SCAN_CHECKPOINT_PAGES = 10
+try:
+    SCAN_CHECKPOINT_MAX_AGE_SECONDS = int(os.getenv(
+        'SCAN_CHECKPOINT_MAX_AGE_SECONDS', 86400))
+except ValueError:
+    logger.warning('Invalid scan checkpoint max age')
+    SCAN_CHECKPOINT_MAX_AGE_SECONDS = 86400
+try:
+    POSITIONS_TTL_SECONDS = int(os.getenv('POSITIONS_TTL_SECONDS', 120))
+except ValueError:
+    logger.warning('Invalid positions snapshot TTL')
+    POSITIONS_TTL_SECONDS = 120
+try:
+    POSITIONS_MAX_WALLETS = int(os.getenv('POSITIONS_MAX_WALLETS', 500))
+except ValueError:
+    logger.warning('Invalid positions snapshot limit')
+    POSITIONS_MAX_WALLETS = 500
+try:
+    INVENTORY_MAX_TOKENS = int(os.getenv('INVENTORY_MAX_TOKENS', 5000))
+except ValueError:
+    logger.warning('Invalid inventory token limit')
+    INVENTORY_MAX_TOKENS = 5000
+try:
+    PORTFOLIO_MAX_COLLECTIONS = int(os.getenv('PORTFOLIO_MAX_COLLECTIONS', 500)
+        )
+except ValueError:
+    logger.warning('Invalid portfolio collection limit')
+    PORTFOLIO_MAX_COLLECTIONS = 500
+TX_INDEX_PATH = os.getenv('TX_INDEX_PATH', os.path.join(os.path.dirname(os
+    .path.abspath(__file__)), 'tx_index.db'))
+PERSISTENCE_DB_PATH = os.getenv('PERSISTENCE_DB_PATH', os.path.join(os.path
+    .dirname(os.path.abspath(__file__)), 'bot_persistence.db'))
 
 
 BOT_COMMANDS = {
@@ -60,6 +196,7 @@ BOT_COMMANDS = {
     "tokens":       "🟣 Lists other token balances (ERC20s).\n☄➠ Usage: /tokens <address>",
     "nfts":         "🟣 Shows summary of NFT collections owned.\n☄➠ Usage: /nfts <address>",
     "mynftactivity":"🟣 Shows recent NFT activity for wallet.\n☄➠ Usage: /mynftactivity <address>",
+    "portfolio":    "🟣 Values tokens plus NFTs at floor and top bid.\n☄➠ Usage: /portfolio <address>",
     "topcollections":"🟣 Shows top collections by volume/sales.\n☄➠ Interactive usage, no address needed.",
     "transactioncount":"🟣 Shows Nonce (outgoing tx count).\n☄➠ Usage: /transactioncount <address>",
     "uniquecontracts":"🟣 Scans all txs for unique interactions.\n☄➠ Can be slow. Usage: /uniquecontracts <address>",
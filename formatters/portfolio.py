@@ -0,0 +1,39 @@
+import html
+from utils.portfolio_valuation import PortfolioValuation
+from formatters.address import format_address
+
+
+def _native(amount: float) ->str:
+    return f'{amount:,.4f}'.rstrip('0').rstrip('.')
+
+
+def fmt_portfolio(address: str, valuation: PortfolioValuation, note: str=''
+    ) ->str:
+    currency = html.escape(valuation.currency or 'MON')
+    lines = [f'📊 <b>Portfolio for</b> {format_address(address)}', '',
+        f'💰 <b>Tokens:</b> ${valuation.token_usd:,.2f} ({valuation.token_count} positions)'
+        ]
+    for symbol, value in valuation.top_tokens:
+        lines.append(f'   • {html.escape(symbol)}: ${value:,.2f}')
+    lines += ['',
+        f'🖼️ <b>NFTs:</b> {valuation.nft_count} items in {valuation.collection_count} collections'
+        ,
+        f'   Floor: {_native(valuation.floor_native)} {currency} (~${valuation.floor_usd:,.2f})'
+        ,
+        f'   Top bid: {_native(valuation.bid_native)} {currency} (~${valuation.bid_usd:,.2f})'
+        ]
+    for name, count, floor_native, floor_usd in valuation.top_collections:
+        usd = f' (~${floor_usd:,.2f})' if floor_usd is not None else ''
+        lines.append(
+            f'   • {html.escape(name)} ×{count}: {_native(floor_native)} {currency}{usd}'
+            )
+    if valuation.unpriced_collections:
+        lines.append(
+            f'   <i>{valuation.unpriced_collections} collections have no floor and are valued at 0.</i>'
+            )
+    lines += ['',
+        f'🧮 <b>Total:</b> ~${valuation.total_floor_usd:,.2f} at floor, ~${valuation.total_bid_usd:,.2f} at top bid'
+        ]
+    if note:
+        lines += ['', f'<i>{html.escape(note)}</i>']
+    return '\n'.join(lines)
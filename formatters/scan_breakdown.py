@@ -0,0 +1,42 @@
+import html
+import time
+from typing import Any, Dict, List, Optional
+from utils.scan_analytics import ScanAnalytics, KIND_CONTRACT, KIND_EOA
+from .address import format_address
+MONTH_BAR_WIDTH = 12
+MAX_MONTHS_SHOWN = 12
+
+
+def _date(ms: Optional[int]) ->str:
+    if ms is None:
+        return '?'
+    return time.strftime('%Y-%m-%d', time.gmtime(ms / 1000))
+
+
+def fmt_scan_breakdown(address: str, analytics: ScanAnalytics, top: List[
+    Dict[str, Any]]) ->str:
+    """HTML breakdown of a wallet's cached scan analytics; top as from ScanAnalytics.top()."""
+    lines = [f'📊 <b>Breakdown for</b> <code>{html.escape(format_address(address))}</code>',
+        f'Active {_date(analytics.first_ms)} → {_date(analytics.last_ms)} ({analytics.txns} txns)'
+        , '']
+    counterparties = analytics.kind_counterparties()
+    lines.append(
+        f'🧩 Contract calls: {analytics.kind_txns[KIND_CONTRACT]} txns, ~{counterparties[KIND_CONTRACT]} contracts'
+        )
+    lines.append(
+        f'👤 Transfers: {analytics.kind_txns[KIND_EOA]} txns, ~{counterparties[KIND_EOA]} recipients'
+        )
+    if top:
+        lines.extend(['', '<b>Top counterparties</b>'])
+        for index, entry in enumerate(top, 1):
+            lines.append(
+                f"{index}. <code>{entry['address']}</code> {entry['count']} txns ({_date(entry['first_ms'])} → {_date(entry['last_ms'])})"
+                )
+    if analytics.months:
+        months = sorted(analytics.months.items())[-MAX_MONTHS_SHOWN:]
+        peak = max(count for _, count in months)
+        lines.extend(['', '<b>Monthly activity</b>'])
+        for month, count in months:
+            bar = '▇' * max(1, round(count / peak * MONTH_BAR_WIDTH))
+            lines.append(f'<code>{month} {bar}</code> {count}')
+    return '\n'.join(lines)
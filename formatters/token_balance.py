@@ -1,19 +1,16 @@
 import logging
 import html
-from typing import Dict, Any
+from utils.token_position import TokenPosition
 logger = logging.getLogger(__name__)
 
 
-def fmt_token_balance_item(item_data: Dict[str, Any], index: int) ->str:
-    if not item_data:
+def fmt_token_balance_item(position: TokenPosition, index: int) ->str:
+    if not position:
         return f'{index}. Error: Empty token data.'
-    attrs = item_data.get('attributes', {})
-    finfo = attrs.get('fungible_info', {})
-    impl = finfo.get('implementations', [{}])[0]
-    name = finfo.get('name') or '[No Name]'
-    symbol = finfo.get('symbol') or '???'
-    qty_raw = attrs.get('quantity', {}).get('int')
-    decimals = impl.get('decimals')
+    name = position.name
+    symbol = position.symbol
+    qty_raw = position.quantity
+    decimals = position.decimals
     balance_str = 'N/A'
     if qty_raw is not None and decimals is not None:
         try:
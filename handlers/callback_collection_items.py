@@ -1,13 +1,15 @@
 import logging
-import asyncio
 import html
 from typing import Optional, Tuple, Dict, Any, List
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 from telegram.error import BadRequest
-from api_clients.fetch_user_nfts import fetch_user_nfts
+from api_clients.wallet_inventory import fetch_collection_items_page
 from formatters.nft_list_item import fmt_nft_list_item
+from .session_state import session_get, session_set, session_pop
+from .pager_registry import start_pager, resume_pager, save_pager, end_pager
+from .send_pipeline import send_page, button_rows
 try:
     from config import COLLECTIONS_PAGE_SIZE as ITEMS_PER_PAGE
 except ImportError:
@@ -17,70 +19,76 @@ except ImportError:
 logger = logging.getLogger(__name__)
 CALLBACK_COLLECTION_ITEMS_INITIAL = 'nftcoll_'
 CALLBACK_COLLECTION_ITEMS_MORE = 'nftcollitems_more_'
-CALLBACK_INFO = 'nftinfo_'
+CALLBACK_INFO_NEW = 'nftinfonew_'
 CALLBACK_COLLECTION_LIST_BACK = 'back_to_coll_list_'
 
 
 async def collection_items_btn_callback(update: Update, context:
     ContextTypes.DEFAULT_TYPE) ->None:
-    """Handles click on '[View My Items]' button below a collection summary.
-       Sends item list page 1 as new messages.
+    """Handles click on '[View My Items]' below a collection summary and the
+       'Load More Items' button under a page. Each page is sent as packed
+       messages with one keyboard; the next page is prefetched meanwhile.
     """
     query = update.callback_query
     callback_data = query.data
     user_id = query.from_user.id
     logger.debug(f'User {user_id} triggered coll items cb: {callback_data}')
-    logger.debug(f'User {user_id} user_data: {context.user_data}')
-    current_offset = 0
-    current_ct = None
-    collection_id = None
-    is_initial_load = False
-    if callback_data.startswith(CALLBACK_COLLECTION_ITEMS_INITIAL):
+    if callback_data.startswith(CALLBACK_COLLECTION_ITEMS_MORE):
+        await query.answer('Fetching more items...')
+        is_initial_load = False
+        collection_id = callback_data[len(CALLBACK_COLLECTION_ITEMS_MORE):]
+    elif callback_data.startswith(CALLBACK_COLLECTION_ITEMS_INITIAL):
         await query.answer('Fetching collection items...')
         is_initial_load = True
-        try:
-            collection_id = callback_data.split('_', 1)[1]
-        except IndexError:
-            logger.error(
-                f'Could not extract collection_id from {callback_data}')
-            await query.answer('Error.', show_alert=True)
-            return
-        context.user_data.pop(f'coll_items_cont_{user_id}_{collection_id}',
-            None)
-        context.user_data.pop(f'coll_items_offset_{user_id}_{collection_id}',
-            None)
-        context.user_data.pop(f'coll_items_msgids_{user_id}_{collection_id}',
-            None)
+        collection_id = callback_data[len(CALLBACK_COLLECTION_ITEMS_INITIAL):]
     else:
         logger.warning(f'Unknown action prefix: {callback_data}')
         await query.answer('Unknown action.', show_alert=True)
         return
     if not collection_id:
-        logger.error(f'Failed to get collection_id')
+        logger.error(f'Failed to get collection_id from {callback_data}')
         await query.answer('Error.', show_alert=True)
         return
-    addr = context.user_data.get(f'current_nfts_addr_{user_id}')
+    addr = session_get(context.user_data, f'current_nfts_addr_{user_id}')
     if not addr:
         logger.error(f'Address missing for {user_id}')
         await query.answer('Session expired.', show_alert=True)
         return
-    ack_text = (
-        f'Fetching items for <code>{html.escape(collection_id)}</code>...')
-    ack_msg = await context.bot.send_message(chat_id=query.message.chat_id,
-        text=ack_text, parse_mode=ParseMode.HTML)
-    nfts_page, next_continuation = await fetch_user_nfts(user_address=addr,
-        collection_id_filter=collection_id, continuation_token=current_ct,
-        limit=ITEMS_PER_PAGE)
-    try:
-        await ack_msg.delete()
-    except Exception as e:
-        logger.warning(f'Could not delete items ack msg: {e}')
+    msg_ids_key = f'coll_items_msgids_{user_id}_{collection_id}'
+    pager_key = f'coll_items_pager_{user_id}_{collection_id}'
+    fetch_page = lambda ct: fetch_collection_items_page(addr,
+        collection_id, ct, ITEMS_PER_PAGE)
+    if is_initial_load:
+        session_pop(context.user_data, msg_ids_key, None)
+        pager = start_pager(context.user_data, pager_key, fetch_page)
+    else:
+        pager = resume_pager(context.user_data, pager_key, fetch_page)
+        if pager is None or not pager.has_more:
+            logger.warning(f'No collection items pager found for {pager_key}'
+                )
+            await query.answer('Session expired.', show_alert=True)
+            return
+        await _remove_load_more_button(query)
+    current_offset = pager.offset
+    ack_msg = None
+    if not pager.ready:
+        ack_text = (
+            f'Fetching items for <code>{html.escape(collection_id)}</code>...')
+        ack_msg = await context.bot.send_message(chat_id=query.message.
+            chat_id, text=ack_text, parse_mode=ParseMode.HTML)
+    nfts_page, next_continuation = await pager.next_page()
+    if ack_msg is not None:
+        try:
+            await ack_msg.delete()
+        except Exception as e:
+            logger.warning(f'Could not delete items ack msg: {e}')
     if nfts_page is None:
         error_msg = next_continuation or 'API error.'
         await context.bot.send_message(chat_id=query.message.chat_id, text=
             error_msg)
         return
-    if not nfts_page:
+    if not nfts_page and is_initial_load:
+        end_pager(context.user_data, pager_key)
         empty_text = (
             f'No owned items found in collection <code>{html.escape(collection_id)}</code>.'
             )
@@ -90,11 +98,12 @@ async def collection_items_btn_callback(update: Update, context:
             empty_text, reply_markup=InlineKeyboardMarkup(kb), parse_mode=
             ParseMode.HTML)
         return
-    sent_item_msg_ids = []
     display_index = current_offset + 1
     logger.info(
         f'Displaying items {display_index}-{display_index + len(nfts_page) - 1} for collection {collection_id}'
         )
+    blocks = []
+    info_buttons = []
     for nft_item in nfts_page:
         if not isinstance(nft_item, dict):
             logger.warning(f'Skipping non-dict item: {nft_item}')
@@ -112,44 +121,42 @@ async def collection_items_btn_callback(update: Update, context:
                 f'Error fmt item {display_index} ({contract}:{token_id}): {fmt_err}'
                 )
             nft_text = f'{display_index}. Error'
-        info_callback_data = f'{CALLBACK_INFO}{contract}:{token_id}'
-        keyboard = InlineKeyboardMarkup([[InlineKeyboardButton('Info',
-            callback_data=info_callback_data)]])
-        try:
-            sent_msg = await context.bot.send_message(chat_id=query.message
-                .chat_id, text=nft_text, parse_mode=ParseMode.HTML,
-                reply_markup=keyboard, disable_web_page_preview=True)
-            sent_item_msg_ids.append(sent_msg.message_id)
-        except Exception as send_err:
-            logger.error(
-                f'Error sending item {display_index} ({contract}:{token_id}): {send_err}'
-                )
+        blocks.append(nft_text)
+        info_buttons.append(InlineKeyboardButton(f'ℹ️ #{display_index}',
+            callback_data=f'{CALLBACK_INFO_NEW}{contract}:{token_id}'))
         display_index += 1
-        await asyncio.sleep(0.05)
-    nav_buttons = [InlineKeyboardButton('⬅️ Back to Collections',
-        callback_data=f'{CALLBACK_COLLECTION_LIST_BACK}{collection_id}')]
-    nav_text = '[End of items for this collection]'
-    if next_continuation:
+    save_pager(context.user_data, pager_key, pager)
+    keyboard_rows = button_rows(info_buttons)
+    if pager.has_more:
         logger.info(f'More items exist for collection {collection_id}.')
-        context.user_data[f'coll_items_cont_{user_id}_{collection_id}'
-            ] = next_continuation
-        context.user_data[f'coll_items_offset_{user_id}_{collection_id}'
-            ] = display_index - 1
-        nav_text = '[More items exist...]'
+        keyboard_rows.append([InlineKeyboardButton('Load More Items ➡️',
+            callback_data=f'{CALLBACK_COLLECTION_ITEMS_MORE}{collection_id}')]
+            )
     else:
-        context.user_data.pop(f'coll_items_cont_{user_id}_{collection_id}',
-            None)
-        context.user_data.pop(f'coll_items_offset_{user_id}_{collection_id}',
-            None)
-    nav_keyboard = InlineKeyboardMarkup([nav_buttons])
-    try:
-        final_nav_msg = await context.bot.send_message(chat_id=query.
-            message.chat_id, text=nav_text, reply_markup=nav_keyboard)
-        sent_item_msg_ids.append(final_nav_msg.message_id)
-    except Exception as e:
-        logger.error(f'Failed to send item nav message: {e}')
-    context.user_data[f'coll_items_msgids_{user_id}_{collection_id}'
-        ] = sent_item_msg_ids
+        blocks.append('[End of items for this collection]')
+    keyboard_rows.append([InlineKeyboardButton('⬅️ Back to Collections',
+        callback_data=f'{CALLBACK_COLLECTION_LIST_BACK}{collection_id}')])
+    sent_item_msg_ids = await send_page(context.bot, query.message.chat_id,
+        blocks, keyboard_rows)
+    if not is_initial_load:
+        sent_item_msg_ids = session_get(context.user_data, msg_ids_key, []
+            ) + sent_item_msg_ids
+    session_set(context.user_data, msg_ids_key, sent_item_msg_ids)
     logger.debug(
         f'Stored {len(sent_item_msg_ids)} item view message IDs for user {user_id}, coll {collection_id}'
         )
+
+
+async def _remove_load_more_button(query) ->None:
+    """Keeps the previous page's item buttons, dropping only its Load More row."""
+    markup = query.message.reply_markup
+    if not markup:
+        return
+    rows = [row for row in markup.inline_keyboard if not any((button.
+        callback_data or '').startswith(CALLBACK_COLLECTION_ITEMS_MORE) for
+        button in row)]
+    try:
+        await query.edit_message_reply_markup(reply_markup=
+            InlineKeyboardMarkup(rows) if rows else None)
+    except Exception as e:
+        logger.warning(f"Could not remove 'Load More Items' button: {e}")
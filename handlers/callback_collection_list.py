@@ -9,6 +9,9 @@ from telegram.error import BadRequest
 from api_clients.fetch_user_collections import fetch_user_collections
 from formatters.user_collection_summary import fmt_user_collection_summary
 from .commands import _send_collection_list_page
+from .session_state import session_get, session_pop
+from .pager_registry import end_pager
+from utils.priority_rate_limiter import LANE_LISTING
 try:
     from config import COLLECTIONS_PAGE_SIZE
 except ImportError:
@@ -26,10 +29,11 @@ async def collections_list_more_callback(update: Update, context:
     query = update.callback_query
     user_id = query.from_user.id
     await query.answer('Loading more collections...')
-    addr = context.user_data.get(f'coll_list_addr_{user_id}')
-    current_offset = context.user_data.get(f'coll_list_offset_{user_id}')
+    addr = session_get(context.user_data, f'coll_list_addr_{user_id}')
+    current_offset = session_get(context.user_data,
+        f'coll_list_offset_{user_id}')
     user_data_key_msgids = f'coll_page_msgids_{user_id}'
-    previous_msg_ids = context.user_data.get(user_data_key_msgids, [])
+    previous_msg_ids = session_get(context.user_data, user_data_key_msgids, [])
     if addr is None or current_offset is None:
         logger.warning(
             f'State missing for {user_id} in more collections callback')
@@ -47,13 +51,13 @@ async def collections_list_more_callback(update: Update, context:
     for msg_id in previous_msg_ids:
         try:
             await context.bot.delete_message(chat_id=query.message.chat_id,
-                message_id=msg_id)
+                message_id=msg_id, rate_limit_args=LANE_LISTING)
             deleted_count += 1
         except Exception as e:
             logger.warning(
                 f'Could not delete previous collection message {msg_id}: {e}')
     logger.info(f'Deleted {deleted_count}/{len(previous_msg_ids)} messages.')
-    context.user_data.pop(user_data_key_msgids, None)
+    session_pop(context.user_data, user_data_key_msgids, None)
     await _send_collection_list_page(chat_id=query.message.chat_id, user_id
         =user_id, address=addr, context=context, offset=current_offset)
 
@@ -81,13 +85,13 @@ async def back_to_coll_list_callback(update: Update, context: ContextTypes.
             )
         await query.answer('Error processing request.', show_alert=True)
         return
-    addr = context.user_data.get(f'current_nfts_addr_{user_id}')
+    addr = session_get(context.user_data, f'current_nfts_addr_{user_id}')
     if not addr:
         logger.warning(f'Address not found for user {user_id}')
         await query.answer('Session expired.', show_alert=True)
         return
     item_msg_ids_key = f'coll_items_msgids_{user_id}_{collection_id}'
-    item_msg_ids = context.user_data.get(item_msg_ids_key, [])
+    item_msg_ids = session_get(context.user_data, item_msg_ids_key, [])
     logger.info(
         f'Deleting {len(item_msg_ids)} previous item messages for user {user_id}, coll {collection_id}'
         )
@@ -95,14 +99,14 @@ async def back_to_coll_list_callback(update: Update, context: ContextTypes.
     for msg_id in item_msg_ids:
         try:
             await context.bot.delete_message(chat_id=query.message.chat_id,
-                message_id=msg_id)
+                message_id=msg_id, rate_limit_args=LANE_LISTING)
             deleted_count += 1
         except Exception as e:
             logger.warning(f'Could not delete item message {msg_id}: {e}')
     logger.info(f'Deleted {deleted_count}/{len(item_msg_ids)} messages.')
-    context.user_data.pop(item_msg_ids_key, None)
-    context.user_data.pop(f'coll_items_cont_{user_id}_{collection_id}', None)
-    context.user_data.pop(f'coll_items_offset_{user_id}_{collection_id}', None)
+    session_pop(context.user_data, item_msg_ids_key, None)
+    end_pager(context.user_data,
+        f'coll_items_pager_{user_id}_{collection_id}')
     logger.info(
         f'Resending collection list page 0 for user {user_id}, address {addr}')
     await _send_collection_list_page(chat_id=query.message.chat_id, user_id
@@ -4,7 +4,9 @@ from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 from telegram.error import BadRequest
 from api_clients.fetch_nft_activity import fetch_token_activity
+from api_clients.nft_detail import nft_detail_store, NFT_DETAIL_PAGE_SIZE
 from formatters.nft_activity import fmt_nft_act
+from .pager_registry import start_pager, resume_pager, save_pager
 logger = logging.getLogger(__name__)
 CALLBACK_ACTIVITY_INITIAL = 'nftact_'
 CALLBACK_ACTIVITY_MORE = 'nftactmore_'
@@ -19,27 +21,13 @@ async def activity_btn_callback(update: Update, context: ContextTypes.
     user_id = query.from_user.id
     logger.info(
         f'Processing activity callback for user {user_id}: {callback_data}')
-    page_offset = 0
-    current_ct = None
-    if callback_data.startswith(CALLBACK_ACTIVITY_INITIAL):
+    is_initial_load = callback_data.startswith(CALLBACK_ACTIVITY_INITIAL)
+    if is_initial_load:
         await query.answer('Fetching activity...')
         nft_id = callback_data[len(CALLBACK_ACTIVITY_INITIAL):]
-        context.user_data.pop(f'act_cont_{user_id}_{nft_id}', None)
-        context.user_data.pop(f'act_offset_{user_id}_{nft_id}', None)
     elif callback_data.startswith(CALLBACK_ACTIVITY_MORE):
         await query.answer('Fetching more activity...')
         nft_id = callback_data[len(CALLBACK_ACTIVITY_MORE):]
-        current_ct = context.user_data.get(f'act_cont_{user_id}_{nft_id}')
-        page_offset = context.user_data.get(f'act_offset_{user_id}_{nft_id}', 0
-            )
-        if not current_ct:
-            logger.warning(
-                f'Continuation token not found for act_{nft_id}, user {user_id}'
-                )
-            await query.answer(
-                'Error: Could not find next page data. Try again.',
-                show_alert=True)
-            return
     else:
         logger.warning(
             f'Unknown activity action prefix in callback: {callback_data}')
@@ -51,9 +39,25 @@ async def activity_btn_callback(update: Update, context: ContextTypes.
         logger.error(f'Invalid nft_id format in activity callback: {nft_id}')
         await query.edit_message_text('Error: Invalid NFT identifier.')
         return
-    items_per_page = 5
-    activity_list, next_ct = await fetch_token_activity(contract, tokenid,
-        continuation_token=current_ct, limit=items_per_page)
+    items_per_page = NFT_DETAIL_PAGE_SIZE
+    pager_key = f'act_pager_{user_id}_{nft_id}'
+    fetch_page = lambda ct: fetch_token_activity(contract, tokenid,
+        continuation_token=ct, limit=items_per_page)
+    if is_initial_load:
+        bundle = await nft_detail_store.get(contract, tokenid)
+        pager = start_pager(context.user_data, pager_key, fetch_page,
+            bundle.first_page('activity'))
+    else:
+        pager = resume_pager(context.user_data, pager_key, fetch_page)
+        if pager is None or not pager.has_more:
+            logger.warning(
+                f'No activity pager found for {pager_key}')
+            await query.answer(
+                'Error: Could not find next page data. Try again.',
+                show_alert=True)
+            return
+    page_offset = pager.offset
+    activity_list, next_ct = await pager.next_page()
     if activity_list is None:
         error_msg = f'Error fetching activity: {next_ct}'
         try:
@@ -69,21 +73,12 @@ async def activity_btn_callback(update: Update, context: ContextTypes.
     buttons_row = []
     back_cb = f'{CALLBACK_INFO}{nft_id}'
     buttons_row.append(InlineKeyboardButton('⬅️ Back', callback_data=back_cb))
-    if next_ct:
-        next_offset = page_offset + len(activity_list)
-        user_data_key_ct = f'act_cont_{user_id}_{nft_id}'
-        user_data_key_offset = f'act_offset_{user_id}_{nft_id}'
-        context.user_data[user_data_key_ct] = next_ct
-        context.user_data[user_data_key_offset] = next_offset
-        logger.info(
-            f'Stored activity continuation for user {user_id}, nft {nft_id}. Next offset: {next_offset}'
-            )
+    save_pager(context.user_data, pager_key, pager)
+    if pager.has_more:
         more_act_cb = f'{CALLBACK_ACTIVITY_MORE}{nft_id}'
         buttons_row.append(InlineKeyboardButton('More Activity ➡️',
             callback_data=more_act_cb))
     else:
-        context.user_data.pop(f'act_cont_{user_id}_{nft_id}', None)
-        context.user_data.pop(f'act_offset_{user_id}_{nft_id}', None)
         logger.info(
             f'Reached end of activity for user {user_id}, nft {nft_id}. Cleared state.'
             )
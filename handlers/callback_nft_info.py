@@ -4,31 +4,47 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputMe
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 from telegram.error import BadRequest
-from api_clients.fetch_nft_overview import fetch_nft_overview
+from api_clients.nft_detail import nft_detail_store
 from formatters.nft_overview import fmt_nft_ovw
 logger = logging.getLogger(__name__)
 CALLBACK_INFO = 'nftinfo_'
+CALLBACK_INFO_NEW = 'nftinfonew_'
 CALLBACK_BIDS_INITIAL = 'nftbids_'
 CALLBACK_ACTIVITY_INITIAL = 'nftact_'
 
 
 async def info_btn_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
     ) ->None:
-    """Handles 'Info' button clicks & 'Back' clicks TO Overview (from Bids/Activity)."""
+    """Handles 'Info' button clicks & 'Back' clicks TO Overview (from Bids/Activity).
+       Info buttons on packed listing pages send the overview as a new message.
+       The overview comes from the NFT's detail bundle, which also preloads
+       the first Offers and Activity pages.
+    """
     query = update.callback_query
     await query.answer('Fetching details...')
     callback_data = query.data
     logger.info(f'Processing info callback: {callback_data}')
+    send_new = callback_data.startswith(CALLBACK_INFO_NEW)
+    chat_id = query.message.chat_id
     try:
         prefix, nft_id = callback_data.split('_', 1)
         contract, tokenid = nft_id.split(':', 1)
     except (ValueError, IndexError):
         logger.error(f'Invalid format: {callback_data}')
-        await query.edit_message_text('Error: Invalid ID.')
+        if send_new:
+            await context.bot.send_message(chat_id=chat_id, text=
+                'Error: Invalid ID.')
+        else:
+            await query.edit_message_text('Error: Invalid ID.')
         return
-    token_data, error = await fetch_nft_overview(contract, tokenid)
+    bundle = await nft_detail_store.get(contract, tokenid)
+    token_data, error = bundle.overview
     if token_data is None:
-        await query.edit_message_text(f'Error fetching details: {error}')
+        if send_new:
+            await context.bot.send_message(chat_id=chat_id, text=
+                f'Error fetching details: {error}')
+        else:
+            await query.edit_message_text(f'Error fetching details: {error}')
         return
     caption, image_url = fmt_nft_ovw(token_data)
     offers_cb = f'{CALLBACK_BIDS_INITIAL}{nft_id}'
@@ -36,6 +52,10 @@ async def info_btn_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
     keyboard = InlineKeyboardMarkup([[InlineKeyboardButton('Offers',
         callback_data=offers_cb), InlineKeyboardButton('Activity',
         callback_data=activity_cb)]])
+    if send_new:
+        await _send_overview_message(context, chat_id, caption, image_url,
+            keyboard)
+        return
     try:
         if image_url:
             media = InputMediaPhoto(media=image_url, caption=caption,
@@ -61,3 +81,25 @@ async def info_btn_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
     except Exception as e:
         logger.error(f'Unexpected error editing overview: {e}')
         await query.answer('Error.', show_alert=True)
+
+
+async def _send_overview_message(context: ContextTypes.DEFAULT_TYPE,
+    chat_id: int, caption: str, image_url: str, keyboard: InlineKeyboardMarkup
+    ) ->None:
+    """Sends the overview as its own message, so Offers/Activity edit it and not the listing page."""
+    if image_url:
+        try:
+            await context.bot.send_photo(chat_id=chat_id, photo=image_url,
+                caption=caption, parse_mode=ParseMode.HTML, reply_markup=
+                keyboard)
+            return
+        except BadRequest as e:
+            logger.warning(
+                f'Could not send overview photo {image_url}: {e}. Falling back.'
+                )
+    try:
+        await context.bot.send_message(chat_id=chat_id, text=caption,
+            parse_mode=ParseMode.HTML, reply_markup=keyboard,
+            disable_web_page_preview=True)
+    except Exception as e:
+        logger.error(f'Error sending overview message: {e}')
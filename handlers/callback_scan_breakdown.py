@@ -0,0 +1,37 @@
+import logging
+from telegram import Update
+from telegram.ext import ContextTypes
+from telegram.constants import ParseMode
+from api_clients.fetch_all_transactions import CALLBACK_SCAN_BREAKDOWN
+from formatters.scan_breakdown import fmt_scan_breakdown
+from utils.scan_analytics import load_scan_analytics
+from utils.tx_index import get_tx_index, run_in_index
+logger = logging.getLogger(__name__)
+
+
+async def scan_breakdown_callback(update: Update, context: ContextTypes.
+    DEFAULT_TYPE) ->None:
+    """
+    Handles the '📊 Breakdown' button under a finished scan. Reads the
+    cached analytics; the sketch's top counterparties get exact counts and
+    first/last seen from the index.
+    """
+    query = update.callback_query
+    address = query.data[len(CALLBACK_SCAN_BREAKDOWN):]
+    logger.info(
+        f'User {query.from_user.id} requested scan breakdown for {address}')
+    analytics = await run_in_index(load_scan_analytics, get_tx_index(),
+        address)
+    if not analytics.txns:
+        await query.answer('No scan data yet. Run /uniquecontracts first.',
+            show_alert=True)
+        return
+    await query.answer()
+    top = analytics.top()
+    exact = await run_in_index(get_tx_index().counterparty_stats, address,
+        [entry['address'] for entry in top])
+    for entry in top:
+        entry.update(exact.get(entry['address'], {}))
+    top.sort(key=lambda entry: -entry['count'])
+    await context.bot.send_message(chat_id=query.message.chat_id, text=
+        fmt_scan_breakdown(address, analytics, top), parse_mode=ParseMode.HTML)
@@ -6,6 +6,7 @@ from telegram.constants import ParseMode
 from telegram.error import BadRequest
 from api_clients.fetch_trending_collections import fetch_trending_collections, VALID_PERIODS, VALID_SORT_BY
 from formatters.trending_collection_summary import fmt_trending_collection_summary
+from .session_state import session_get, session_set, session_pop
 logger = logging.getLogger(__name__)
 CALLBACK_SORT_PREFIX = 'topcoll_sort_'
 CALLBACK_PERIOD_PREFIX = 'topcoll_period_'
@@ -35,8 +36,8 @@ async def top_collections_callback(update: Update, context: ContextTypes.
         if callback_data.startswith(CALLBACK_SORT_PREFIX):
             selected_sort = callback_data[len(CALLBACK_SORT_PREFIX):]
             assert selected_sort in VALID_SORT_BY
-            context.user_data[state_key_sort] = selected_sort
-            context.user_data.pop(state_key_period, None)
+            session_set(context.user_data, state_key_sort, selected_sort)
+            session_pop(context.user_data, state_key_period, None)
             logger.debug(f'User {user_id} selected sort: {selected_sort}')
             kb_rows = []
             btn_row = []
@@ -54,12 +55,12 @@ async def top_collections_callback(update: Update, context: ContextTypes.
                 f'🕒 Sort: {selected_sort.capitalize()}. Select period:',
                 reply_markup=markup)
         elif callback_data.startswith(CALLBACK_PERIOD_PREFIX):
-            current_sort = context.user_data.get(state_key_sort)
+            current_sort = session_get(context.user_data, state_key_sort)
             if not current_sort:
                 raise ValueError('Sort missing')
             selected_period = callback_data[len(CALLBACK_PERIOD_PREFIX):]
             assert selected_period in VALID_PERIODS
-            context.user_data[state_key_period] = selected_period
+            session_set(context.user_data, state_key_period, selected_period)
             logger.debug(f'User {user_id} selected period: {selected_period}')
             kb_rows = []
             btn_row = []
@@ -73,8 +74,8 @@ async def top_collections_callback(update: Update, context: ContextTypes.
                 f'🔢 Sort: {current_sort.capitalize()}, Period: {selected_period.upper()}. Select limit:'
                 , reply_markup=markup)
         elif callback_data.startswith(CALLBACK_LIMIT_PREFIX):
-            current_sort = context.user_data.get(state_key_sort)
-            current_period = context.user_data.get(state_key_period)
+            current_sort = session_get(context.user_data, state_key_sort)
+            current_period = session_get(context.user_data, state_key_period)
             if not current_sort or not current_period:
                 raise ValueError('Sort/Period missing')
             try:
@@ -92,8 +93,8 @@ async def top_collections_callback(update: Update, context: ContextTypes.
             collections_list, error_msg = await fetch_trending_collections(
                 period=current_period, limit=selected_limit, sort_by=
                 current_sort)
-            context.user_data.pop(state_key_sort, None)
-            context.user_data.pop(state_key_period, None)
+            session_pop(context.user_data, state_key_sort, None)
+            session_pop(context.user_data, state_key_period, None)
             if collections_list is None:
                 await query.edit_message_text(error_msg or 'Failed fetch.')
                 return
@@ -135,5 +136,5 @@ async def top_collections_callback(update: Update, context: ContextTypes.
     except Exception as e:
         logger.exception(f'Error in top_collections_callback')
         await query.answer('Error.', show_alert=True)
-        context.user_data.pop(state_key_sort, None)
-        context.user_data.pop(state_key_period, None)
+        session_pop(context.user_data, state_key_sort, None)
+        session_pop(context.user_data, state_key_period, None)
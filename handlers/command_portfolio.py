@@ -0,0 +1,63 @@
+import asyncio
+import logging
+from telegram import Update
+from telegram.ext import ContextTypes
+from telegram.constants import ParseMode
+from telegram.error import BadRequest
+from api_clients.positions_store import get_positions_store
+from api_clients.wallet_inventory import fetch_collection_holdings
+from api_clients.fetch_collection_prices import fetch_collection_prices
+from formatters.address import format_address
+from formatters.portfolio import fmt_portfolio
+from utils.portfolio_valuation import value_portfolio
+logger = logging.getLogger(__name__)
+
+
+async def portfolio_command(update: Update, context: ContextTypes.DEFAULT_TYPE
+    ):
+    """
+    Handles /portfolio, requires address arg. Token positions and NFT
+    holdings are read concurrently, then every held collection is priced in
+    batched floor/top bid lookups.
+    """
+    if not context.args or len(context.args) != 1:
+        await update.message.reply_html('Usage: /portfolio <code>address</code>'
+            )
+        return
+    addr = context.args[0]
+    user_id = update.effective_user.id
+    logger.info(
+        f'Processing /portfolio request for user {user_id}, address: {addr}')
+    sent_message = await update.effective_message.reply_text(
+        f'Valuing portfolio for {format_address(addr)}...',
+        disable_notification=True)
+    (snapshot, token_error), (holdings, nft_error) = await asyncio.gather(
+        get_positions_store().get(addr), fetch_collection_holdings(addr))
+    if snapshot is None and holdings is None:
+        await sent_message.edit_text(token_error or nft_error or 'API error.')
+        return
+    notes = []
+    if snapshot is None:
+        notes.append(f'Tokens unavailable: {token_error}')
+    if holdings is None:
+        notes.append(f'NFTs unavailable: {nft_error}')
+    prices = {}
+    if holdings:
+        prices, price_error = await fetch_collection_prices([coll_id for
+            coll_id, _, _ in holdings])
+        if price_error:
+            notes.append(f'Some collection prices unavailable: {price_error}')
+    valuation = value_portfolio(snapshot.positions if snapshot else (),
+        holdings or [], prices)
+    text = fmt_portfolio(addr, valuation, ' '.join(notes))
+    try:
+        await sent_message.edit_text(text=text, parse_mode=ParseMode.HTML,
+            disable_web_page_preview=True)
+    except BadRequest as e:
+        if 'Message is not modified' in str(e):
+            logger.info('Portfolio message not modified.')
+        else:
+            logger.error(f'Error editing portfolio msg: {e}')
+    except Exception as e:
+        logger.error(f'Error editing portfolio msg: {e}')
+        await update.effective_message.reply_html(text)
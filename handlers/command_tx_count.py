@@ -1,5 +1,4 @@
 import logging
-import asyncio
 import html
 from telegram import Update
 from telegram.ext import ContextTypes
@@ -21,11 +20,9 @@ async def transaction_count_command(update: Update, context: ContextTypes.
     logger.info(
         f'Processing /transactioncount request for user {user_id}, address: {addr}'
         )
-    loop = asyncio.get_running_loop()
     reply_text = 'An error occurred.'
     try:
-        nonce_count, error_msg = await loop.run_in_executor(None,
-            fetch_address_nonce, addr)
+        nonce_count, error_msg = await fetch_address_nonce(addr)
         if error_msg:
             reply_text = error_msg
         elif nonce_count is not None:
@@ -1,13 +1,13 @@
 import logging
-import asyncio
 import html
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Update, InlineKeyboardButton
 from telegram.ext import ContextTypes
-from telegram.constants import ParseMode
 from telegram.error import BadRequest
 from api_clients.fetch_user_activity import fetch_user_activity
 from formatters.address import format_address
 from formatters.user_activity import fmt_user_activity_item
+from .pager_registry import start_pager, save_pager
+from .send_pipeline import send_page
 try:
     from config import USER_ACTIVITY_PAGE_SIZE
 except ImportError:
@@ -32,8 +32,11 @@ async def user_activity_command(update: Update, context: ContextTypes.
         f'Fetching activity for {format_address(addr)}...',
         disable_notification=True)
     limit = USER_ACTIVITY_PAGE_SIZE
-    activity_page, next_continuation = await fetch_user_activity(user_address
-        =addr, limit=limit)
+    pager_key = f'user_act_pager_{user_id}_{addr}'
+    pager = start_pager(context.user_data, pager_key, lambda ct:
+        fetch_user_activity(user_address=addr, continuation_token=ct, limit
+        =limit))
+    activity_page, next_continuation = await pager.next_page()
     if activity_page is None:
         error_msg = next_continuation or 'API error.'
         await ack_msg.edit_text(error_msg)
@@ -49,37 +52,24 @@ async def user_activity_command(update: Update, context: ContextTypes.
     current_index = 1
     logger.info(
         f'Sending first {len(activity_page)} activity events for {addr}')
+    blocks = []
     for item in activity_page:
         if not isinstance(item, dict):
             continue
         try:
-            activity_text = fmt_user_activity_item(item, current_index)
-            if len(activity_text) > 4050:
-                activity_text = activity_text[:4050] + '\n[Truncated]'
-            await update.effective_message.reply_html(activity_text,
-                disable_web_page_preview=True)
-        except Exception as fmt_send_err:
+            blocks.append(fmt_user_activity_item(item, current_index))
+        except Exception as fmt_err:
             logger.error(
-                f'Error formatting/sending user activity item {current_index}: {fmt_send_err}'
+                f'Error formatting user activity item {current_index}: {fmt_err}'
                 )
         current_index += 1
-        await asyncio.sleep(0.05)
-    if next_continuation:
-        logger.info(f'More activity exists for {addr}. Storing state.')
-        context.user_data[f'user_act_cont_{user_id}_{addr}'
-            ] = next_continuation
-        context.user_data[f'user_act_offset_{user_id}_{addr}'
-            ] = current_index - 1
+    keyboard_rows = None
+    save_pager(context.user_data, pager_key, pager)
+    if pager.has_more:
+        logger.info(f'More activity exists for {addr}. Next page prefetching.')
         cb_data = f'{CALLBACK_USER_ACTIVITY_MORE}{addr}'
-        btn = InlineKeyboardButton('Load More Activity ➡️', callback_data=
-            cb_data)
-        kb = InlineKeyboardMarkup([[btn]])
-        try:
-            await update.effective_message.reply_text('Load more activity?',
-                reply_markup=kb)
-        except Exception as e:
-            logger.error(f'Error sending Load More Activity button: {e}')
+        keyboard_rows = [[InlineKeyboardButton('Load More Activity ➡️',
+            callback_data=cb_data)]]
     else:
         logger.info(f'No more activity found.')
-        context.user_data.pop(f'user_act_cont_{user_id}_{addr}', None)
-        context.user_data.pop(f'user_act_offset_{user_id}_{addr}', None)
+    await send_page(context.bot, chat_id, blocks, keyboard_rows)
@@ -0,0 +1,112 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+from telegram.ext import ContextTypes
+from api_clients.page_iterator import PageIterator, PageFetcher, PageResult
+from .session_state import session_get, session_set, session_pop, session_ttl
+logger = logging.getLogger(__name__)
+MAX_OPEN_PAGERS = 2000
+
+
+class PagerRegistry:
+    """
+    Live PageIterators of "Load More" listings, keyed by their session key.
+    A pager left idle past its session feature's TTL, evicted over
+    MAX_OPEN_PAGERS, or replaced by a new listing is closed, which cancels
+    its read-ahead. Pagers are memory-only; the position they have reached
+    is mirrored into user_data so a listing survives a restart.
+    """
+
+    def __init__(self, max_pagers: int=MAX_OPEN_PAGERS):
+        self.max_pagers = max_pagers
+        self._pagers: 'OrderedDict[str, PageIterator]' = OrderedDict()
+
+    def open(self, key: str, fetch_page: PageFetcher, continuation:
+        Optional[str]=None, offset: int=0, preloaded: Optional[PageResult]=None
+        ) ->PageIterator:
+        self.close(key)
+        pager = PageIterator(fetch_page, continuation, offset, preloaded)
+        self._pagers[key] = pager
+        while len(self._pagers) > self.max_pagers:
+            _, evicted = self._pagers.popitem(last=False)
+            evicted.close()
+        return pager
+
+    def get(self, key: str) ->Optional[PageIterator]:
+        pager = self._pagers.get(key)
+        if pager is not None:
+            self._pagers.move_to_end(key)
+        return pager
+
+    def close(self, key: str) ->None:
+        pager = self._pagers.pop(key, None)
+        if pager is not None:
+            pager.close()
+
+    def sweep(self, now: Optional[float]=None) ->int:
+        """Closes pagers idle for longer than their session TTL."""
+        now = time.monotonic() if now is None else now
+        idle = [key for key, pager in self._pagers.items() if now - pager.
+            touched_at > (session_ttl(key) or 0)]
+        for key in idle:
+            self.close(key)
+        return len(idle)
+
+    def close_all(self) ->None:
+        for key in list(self._pagers):
+            self.close(key)
+
+    def stats(self) ->Dict[str, Any]:
+        return {'open': len(self._pagers), 'prefetch_hits': sum(p.
+            prefetch_hits for p in self._pagers.values())}
+
+
+pager_registry = PagerRegistry()
+
+
+async def sweep_pagers_job(context: ContextTypes.DEFAULT_TYPE) ->None:
+    """JobQueue callback: closes abandoned pagers."""
+    closed = pager_registry.sweep()
+    if closed:
+        logger.info(
+            f'Closed {closed} idle pagers; {pager_registry.stats()}')
+
+
+def start_pager(user_data: Dict[Any, Any], key: str, fetch_page:
+    PageFetcher, first_page: Optional[PageResult]=None) ->PageIterator:
+    """Opens a fresh listing under key, dropping any earlier one; first_page skips the first fetch."""
+    session_pop(user_data, key, None)
+    return pager_registry.open(key, fetch_page, preloaded=first_page)
+
+
+def resume_pager(user_data: Dict[Any, Any], key: str, fetch_page:
+    PageFetcher) ->Optional[PageIterator]:
+    """
+    The live pager for a "Load More" click, or one reopened at the position
+    saved in user_data (after a restart or sweep); None if the listing is
+    gone or was finished.
+    """
+    pager = pager_registry.get(key)
+    if pager is not None:
+        return pager
+    saved: Optional[Tuple[str, int]] = session_get(user_data, key)
+    if not saved:
+        return None
+    continuation, offset = saved
+    logger.debug(f'Reopening pager {key} at offset {offset}')
+    return pager_registry.open(key, fetch_page, continuation, offset)
+
+
+def save_pager(user_data: Dict[Any, Any], key: str, pager: PageIterator
+    ) ->None:
+    """Mirrors the pager's position into user_data, or ends the listing once exhausted."""
+    if pager.has_more:
+        session_set(user_data, key, (pager.continuation, pager.offset))
+    else:
+        end_pager(user_data, key)
+
+
+def end_pager(user_data: Dict[Any, Any], key: str) ->None:
+    session_pop(user_data, key, None)
+    pager_registry.close(key)
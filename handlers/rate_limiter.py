@@ -1,37 +1,133 @@
 import logging
 import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
 from telegram import Update
-from telegram.ext import ContextTypes, ApplicationHandlerStop
+from telegram.ext import ContextTypes, ApplicationHandlerStop, BaseHandler, filters
+from config import COMMAND_RATE_CAPACITY, COMMAND_RATE_REFILL_PER_SECOND, COMMAND_RATE_COSTS
 logger = logging.getLogger(__name__)
-RATE_LIMIT_SECONDS = 10
+DEFAULT_COMMAND_COST = 1.0
+MAX_TRACKED_USERS = 10000
+
+
+def command_name(text: Optional[str]) ->str:
+    """'/Balance@MyBot 0xabc' -> 'balance'."""
+    if not text or not text.startswith('/'):
+        return ''
+    end = len(text)
+    for sep in (' ', '@', '\n'):
+        index = text.find(sep, 1, end)
+        if index != -1:
+            end = index
+    return text[1:end].lower()
+
+
+class CommandRateLimiter:
+    """
+    Per-user token buckets held in memory only. Each command costs
+    costs[name] tokens (default_cost otherwise, never more than capacity);
+    buckets refill at refill_per_second. A bucket idle long enough to be
+    full again is reset in place, and at most max_tracked users are kept
+    (least recently seen dropped first), so memory stays bounded.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float, costs:
+        Dict[str, float], default_cost: float=DEFAULT_COMMAND_COST,
+        max_tracked: int=MAX_TRACKED_USERS):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.costs = {name: min(float(cost), self.capacity) for name, cost in
+            costs.items()}
+        self.default_cost = min(float(default_cost), self.capacity)
+        self.max_tracked = max_tracked
+        self._full_after = self.capacity / self.refill_per_second
+        self._buckets: 'OrderedDict[int, List[float]]' = OrderedDict()
+        self.limited = 0
+
+    def _bucket(self, user_id: int, now: float) ->List[float]:
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = [self.capacity, now]
+            self._buckets[user_id] = bucket
+            if len(self._buckets) > self.max_tracked:
+                self._buckets.popitem(last=False)
+            return bucket
+        self._buckets.move_to_end(user_id)
+        elapsed = now - bucket[1]
+        if elapsed >= self._full_after:
+            bucket[0] = self.capacity
+        else:
+            bucket[0] = min(self.capacity, bucket[0] + elapsed * self.
+                refill_per_second)
+        bucket[1] = now
+        return bucket
+
+    def cost_of(self, command: str) ->float:
+        return self.costs.get(command, self.default_cost)
+
+    def check(self, user_id: int, command: str) ->float:
+        """Charges the command; returns 0.0 if allowed, else seconds to wait."""
+        cost = self.cost_of(command)
+        bucket = self._bucket(user_id, time.monotonic())
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return 0.0
+        self.limited += 1
+        return (cost - bucket[0]) / self.refill_per_second
+
+    def wait_time(self, user_id: int, command: str) ->float:
+        """Seconds until the command would be allowed, without charging it."""
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            return 0.0
+        tokens = min(self.capacity, bucket[0] + (time.monotonic() - bucket[
+            1]) * self.refill_per_second)
+        return max(0.0, (self.cost_of(command) - tokens) / self.
+            refill_per_second)
+
+    def tracked_users(self) ->int:
+        return len(self._buckets)
+
+
+command_limiter = CommandRateLimiter(COMMAND_RATE_CAPACITY,
+    COMMAND_RATE_REFILL_PER_SECOND, COMMAND_RATE_COSTS)
+
+
+class CommandRateLimitHandler(BaseHandler[Update, ContextTypes.
+    DEFAULT_TYPE, None]):
+    """
+    Charges every command against command_limiter inside check_update, so
+    allowed commands fall through to the next group without a
+    CallbackContext being built or user_data being loaded. Only rate
+    limited commands reach the callback.
+    """
+
+    def check_update(self, update: object) ->Optional[bool]:
+        if not isinstance(update, Update
+            ) or not update.message or not update.effective_user:
+            return None
+        if not filters.COMMAND.check_update(update):
+            return None
+        wait = command_limiter.check(update.effective_user.id, command_name(
+            update.message.text))
+        return True if wait > 0 else None
 
 
 async def check_rate_limit(update: Update, context: ContextTypes.DEFAULT_TYPE
     ) ->None:
     """
-    Checks if the user has sent a command too recently.
-    If rate limited, replies and stops further handlers.
-    Otherwise, updates the timestamp.
+    Callback for CommandRateLimitHandler: tells the user how long to wait
+    and stops further handlers. Never reads or writes user_data.
     """
-    if not update.message or not update.effective_user:
-        return
     user_id = update.effective_user.id
-    current_time = time.monotonic()
-    last_cmd_time_key = f'last_cmd_time_{user_id}'
-    last_command_time = context.user_data.get(last_cmd_time_key, 0)
-    elapsed = current_time - last_command_time
-    if elapsed < RATE_LIMIT_SECONDS:
-        wait_time = RATE_LIMIT_SECONDS - elapsed
-        logger.info(f'User {user_id} rate limited. Wait {wait_time:.1f}s.')
-        try:
-            await update.message.reply_text(
-                f'⏳ Please wait {wait_time:.1f} more seconds before sending another command.'
-                )
-        except Exception as e:
-            logger.error(f'Failed to send rate limit message: {e}')
-        raise ApplicationHandlerStop
-    else:
-        logger.debug(
-            f'User {user_id} passed rate limit check. Updating timestamp.')
-        context.user_data[last_cmd_time_key] = current_time
-        return
+    command = command_name(update.message.text)
+    wait_time = max(command_limiter.wait_time(user_id, command), 0.1)
+    logger.info(
+        f'User {user_id} rate limited on /{command}. Wait {wait_time:.1f}s.')
+    try:
+        await update.message.reply_text(
+            f'⏳ Please wait {wait_time:.1f} more seconds before sending another command.'
+            )
+    except Exception as e:
+        logger.error(f'Failed to send rate limit message: {e}')
+    raise ApplicationHandlerStop
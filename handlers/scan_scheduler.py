@@ -0,0 +1,295 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Deque, Any, Tuple
+from telegram.ext import Application
+from api_clients.fetch_all_transactions import fetch_all_transaction_targets
+from api_clients.pacer import AdaptivePacer
+from config import SCAN_WORKERS, SCAN_CHECKPOINT_MAX_AGE_SECONDS
+from formatters.address import format_address
+from utils.priority_rate_limiter import LANE_PROGRESS
+from utils.tx_index import get_tx_index, run_in_index
+logger = logging.getLogger(__name__)
+SCAN_TIMEOUT_SECONDS = 300
+MAX_QUEUED_PER_USER = 1
+LAST_SCAN_TIME_KEY = 'last_scan_time_{user_id}'
+RATE_SMOOTHING = 0.2
+
+
+@dataclass
+class ScanSubscriber:
+    user_id: int
+    chat_id: int
+    message_id: int
+    user_data: Optional[Dict[Any, Any]] = None
+
+
+@dataclass
+class ScanJob:
+    address: str
+    owner_user_id: int
+    subscribers: List[ScanSubscriber] = field(default_factory=list)
+    status_targets: List[Tuple[int, int]] = field(default_factory=list)
+    enqueued_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    pages_done: int = 0
+    was_queued: bool = False
+
+    def add_subscriber(self, subscriber: ScanSubscriber) ->None:
+        """Subscribers joining mid-scan get progress edits from the next update on."""
+        self.subscribers.append(subscriber)
+        self.status_targets.append((subscriber.chat_id, subscriber.message_id)
+            )
+
+
+@dataclass
+class SubmitResult:
+    job: ScanJob
+    joined: bool
+    position: int
+    starts_now: bool
+
+
+class ScanScheduler:
+    """
+    Runs /uniquecontracts scans on a fixed pool of workers.
+    Jobs are keyed by address so concurrent requests for one wallet share a
+    scan, queued jobs are taken round-robin across users, and all workers
+    draw upstream requests from one shared pacer.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = max(1, workers)
+        self.pacer = AdaptivePacer()
+        self._queues: Dict[int, Deque[ScanJob]] = {}
+        self._user_order: Deque[int] = deque()
+        self._jobs: Dict[str, ScanJob] = {}
+        self._running: Dict[str, ScanJob] = {}
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._bot = None
+        self._application: Optional[Application] = None
+        self._rate_window_start = time.monotonic()
+        self._rate_window_pages = 0
+        self.pages_per_second: Optional[float] = None
+        self.avg_pages_per_job: Optional[float] = None
+
+    @property
+    def queued_count(self) ->int:
+        return sum(len(q) for q in self._queues.values())
+
+    def find_job(self, address: str) ->Optional[ScanJob]:
+        return self._jobs.get(address.lower())
+
+    def user_job(self, user_id: int) ->Optional[ScanJob]:
+        for job in self._jobs.values():
+            if any(s.user_id == user_id for s in job.subscribers):
+                return job
+        return None
+
+    def _dispatch_order(self) ->List[ScanJob]:
+        """Queued jobs in the order workers will take them (round-robin by user)."""
+        cursors = {uid: list(q) for uid, q in self._queues.items()}
+        order: List[ScanJob] = []
+        users = deque(self._user_order)
+        while users:
+            uid = users.popleft()
+            pending = cursors.get(uid)
+            if not pending:
+                continue
+            order.append(pending.pop(0))
+            if pending:
+                users.append(uid)
+        return order
+
+    def position(self, job: ScanJob) ->int:
+        """1-based queue position, 0 if the job is already running."""
+        if job.address.lower() in self._running:
+            return 0
+        order = self._dispatch_order()
+        return order.index(job) + 1 if job in order else 0
+
+    def estimate_wait_seconds(self, position: int) ->Optional[float]:
+        if position <= 0 or not self.pages_per_second or not self.avg_pages_per_job:
+            return None
+        per_worker_rate = self.pages_per_second / max(1, len(self._running))
+        job_seconds = self.avg_pages_per_job / max(per_worker_rate, 0.01)
+        return math.ceil(position / self.workers) * job_seconds
+
+    def submit(self, subscriber: ScanSubscriber, address: str) ->SubmitResult:
+        key = address.lower()
+        job = self._jobs.get(key)
+        if job is not None:
+            job.add_subscriber(subscriber)
+            logger.info(
+                f'User {subscriber.user_id} joined existing scan for {address}')
+            return SubmitResult(job, True, self.position(job), False)
+        job = ScanJob(address=address, owner_user_id=subscriber.user_id)
+        job.add_subscriber(subscriber)
+        self._jobs[key] = job
+        queue = self._queues.setdefault(subscriber.user_id, deque())
+        queue.append(job)
+        if subscriber.user_id not in self._user_order:
+            self._user_order.append(subscriber.user_id)
+        position = self.position(job)
+        idle_workers = self.workers - len(self._running)
+        starts_now = position <= idle_workers
+        job.was_queued = not starts_now
+        self._wakeup.set()
+        logger.info(
+            f'Queued scan for {address} (user {subscriber.user_id}, position {position}, starts now: {starts_now})'
+            )
+        return SubmitResult(job, False, position, starts_now)
+
+    def can_queue(self, user_id: int) ->bool:
+        return len(self._queues.get(user_id, ())) < MAX_QUEUED_PER_USER
+
+    def _pop_next(self) ->Optional[ScanJob]:
+        while self._user_order:
+            uid = self._user_order.popleft()
+            queue = self._queues.get(uid)
+            if not queue:
+                self._queues.pop(uid, None)
+                continue
+            job = queue.popleft()
+            if queue:
+                self._user_order.append(uid)
+            else:
+                self._queues.pop(uid, None)
+            return job
+        return None
+
+    def _record_page(self, job: ScanJob) ->None:
+        job.pages_done += 1
+        self._rate_window_pages += 1
+        elapsed = time.monotonic() - self._rate_window_start
+        if elapsed >= 5:
+            rate = self._rate_window_pages / elapsed
+            self.pages_per_second = rate if self.pages_per_second is None else (
+                (1 - RATE_SMOOTHING) * self.pages_per_second +
+                RATE_SMOOTHING * rate)
+            self._rate_window_start = time.monotonic()
+            self._rate_window_pages = 0
+
+    def _record_job(self, job: ScanJob) ->None:
+        if job.pages_done <= 0:
+            return
+        if self.avg_pages_per_job is None:
+            self.avg_pages_per_job = float(job.pages_done)
+        else:
+            self.avg_pages_per_job = (1 - RATE_SMOOTHING
+                ) * self.avg_pages_per_job + RATE_SMOOTHING * job.pages_done
+
+    async def _edit_all(self, job: ScanJob, text: str) ->None:
+        for chat_id, message_id in list(job.status_targets):
+            try:
+                await self._bot.edit_message_text(text, chat_id=chat_id,
+                    message_id=message_id, rate_limit_args=LANE_PROGRESS)
+            except Exception as e:
+                logger.error(f'Failed scan status edit: {e}')
+
+    async def _run_job(self, job: ScanJob) ->None:
+        scan_task_name = f'ScanUniqueContracts_{job.owner_user_id}'
+        job.started_at = time.monotonic()
+        if job.was_queued:
+            await self._edit_all(job,
+                f'✅ Your turn! Starting scan for {format_address(job.address)}...'
+                )
+        try:
+            logger.info(
+                f"Background task '{scan_task_name}' started for {job.address}"
+                )
+            await asyncio.wait_for(fetch_all_transaction_targets(job.
+                address, self._bot, job.status_targets, pacer=self.pacer,
+                on_page_done=lambda : self._record_page(job),
+                checkpoint_meta=lambda : {'subscribers': [[s.user_id, s.
+                chat_id, s.message_id] for s in job.subscribers]}), timeout
+                =SCAN_TIMEOUT_SECONDS)
+            logger.info(
+                f"Background task '{scan_task_name}' finished successfully for {job.address}"
+                )
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Scan task '{scan_task_name}' timed out for {job.address}")
+            await self._edit_all(job,
+                f"""⚠️ Scan timed out (5 min) for {format_address(job.address)}.
+Progress is saved; run /uniquecontracts again to resume."""
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception(
+                f"Unexpected error during task '{scan_task_name}' for {job.address}"
+                )
+            await self._edit_all(job,
+                'An unexpected error occurred during the scan.')
+        finally:
+            self._record_job(job)
+            now = time.time()
+            for subscriber in job.subscribers:
+                if subscriber.user_data is not None:
+                    subscriber.user_data[LAST_SCAN_TIME_KEY.format(user_id=
+                        subscriber.user_id)] = now
+
+    async def _worker(self, worker_num: int) ->None:
+        while True:
+            job = self._pop_next()
+            if job is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            key = job.address.lower()
+            self._running[key] = job
+            try:
+                await self._run_job(job)
+            finally:
+                self._running.pop(key, None)
+                self._jobs.pop(key, None)
+
+    async def start(self, application: Application) ->None:
+        self._application = application
+        self._bot = application.bot
+        self._tasks = [asyncio.create_task(self._worker(i), name=
+            f'ScanWorker_{i}') for i in range(self.workers)]
+        logger.info(f'Scan scheduler started with {self.workers} workers.')
+        try:
+            await self._resume_checkpoints()
+        except Exception as e:
+            logger.error(f'Failed to resume saved scans: {e}')
+
+    async def _resume_checkpoints(self) ->None:
+        """Re-queues scans that were interrupted by a restart, for the users that were waiting on them."""
+        checkpoints = await run_in_index(get_tx_index().list_checkpoints)
+        for checkpoint in checkpoints:
+            subscribers = (checkpoint['meta'] or {}).get('subscribers')
+            if not subscribers or time.time() - (checkpoint['updated_at'] or 0
+                ) > SCAN_CHECKPOINT_MAX_AGE_SECONDS:
+                continue
+            for user_id, chat_id, message_id in subscribers:
+                self.submit(ScanSubscriber(user_id=user_id, chat_id=chat_id,
+                    message_id=message_id, user_data=self._application.
+                    user_data.get(user_id)), checkpoint['address'])
+        if checkpoints:
+            logger.info(
+                f'Found {len(checkpoints)} saved scan checkpoint(s); {len(self._jobs)} re-queued.'
+                )
+
+    async def stop(self) ->None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info('Scan scheduler stopped.')
+
+
+_scheduler: Optional[ScanScheduler] = None
+
+
+def get_scan_scheduler() ->ScanScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = ScanScheduler(SCAN_WORKERS)
+    return _scheduler
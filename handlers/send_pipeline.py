@@ -0,0 +1,65 @@
+import logging
+from typing import List, Optional
+from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.constants import ParseMode
+from utils.priority_rate_limiter import LANE_LISTING
+logger = logging.getLogger(__name__)
+TELEGRAM_MESSAGE_LIMIT = 4096
+PAGE_BLOCK_SEPARATOR = '\n\n'
+ITEM_BUTTONS_PER_ROW = 4
+
+
+def pack_blocks(blocks: List[str], limit: int=TELEGRAM_MESSAGE_LIMIT,
+    separator: str=PAGE_BLOCK_SEPARATOR) ->List[str]:
+    """
+    Joins rendered item blocks into as few message texts as fit under limit.
+    Blocks are never split; a single oversized block is truncated.
+    """
+    chunks: List[str] = []
+    current = ''
+    for block in blocks:
+        if len(block) > limit:
+            block = block[:limit - 20] + '\n[T]'
+        candidate = f'{current}{separator}{block}' if current else block
+        if len(candidate) <= limit:
+            current = candidate
+            continue
+        chunks.append(current)
+        current = block
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def button_rows(buttons: List[InlineKeyboardButton], per_row: int=
+    ITEM_BUTTONS_PER_ROW) ->List[List[InlineKeyboardButton]]:
+    return [buttons[i:i + per_row] for i in range(0, len(buttons), per_row)]
+
+
+async def send_page(bot: Bot, chat_id: int, blocks: List[str],
+    keyboard_rows: Optional[List[List[InlineKeyboardButton]]]=None) ->List[
+    int]:
+    """
+    Sends a rendered page as packed HTML messages on the listing lane of the
+    outbound rate limiter. The page's single inline keyboard goes on the last
+    message. Returns the sent message ids.
+    """
+    chunks = pack_blocks(blocks)
+    keyboard = InlineKeyboardMarkup(keyboard_rows) if keyboard_rows else None
+    sent_ids: List[int] = []
+    for i, chunk in enumerate(chunks):
+        is_last = i == len(chunks) - 1
+        try:
+            sent_msg = await bot.send_message(chat_id=chat_id, text=chunk,
+                parse_mode=ParseMode.HTML, reply_markup=keyboard if
+                is_last else None, disable_web_page_preview=True,
+                rate_limit_args=LANE_LISTING)
+            sent_ids.append(sent_msg.message_id)
+        except Exception as send_err:
+            logger.error(
+                f'Error sending page chunk {i + 1}/{len(chunks)} to chat {chat_id}: {send_err}'
+                )
+    logger.debug(
+        f'Sent page of {len(blocks)} blocks as {len(chunks)} message(s) to chat {chat_id}'
+        )
+    return sent_ids
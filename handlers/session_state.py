@@ -0,0 +1,136 @@
+import logging
+import pickle
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from telegram.ext import ContextTypes
+from config import SESSION_MAX_BYTES_PER_USER
+logger = logging.getLogger(__name__)
+SESSION_SWEEP_INTERVAL_SECONDS = 300
+SESSION_FEATURES: List[Tuple[str, str, int]] = [('coll_items_',
+    'collection_items', 1800), ('coll_list_', 'collection_list', 1800), (
+    'coll_page_msgids_', 'collection_list', 1800), ('current_nfts_addr_',
+    'collection_list', 1800), ('bids_', 'nft_bids', 900), ('act_',
+    'nft_activity', 900), ('user_act_', 'user_activity', 1800), ('topcoll_',
+    'top_collections', 900)]
+LEGACY_KEY_PREFIXES = ('last_cmd_time_', 'tokens_')
+
+
+@dataclass
+class SessionEntry:
+    value: Any
+    feature: str
+    expires_at: float
+    touched_at: float
+    size: int
+
+
+def _feature_for(key: str) ->Optional[Tuple[str, int]]:
+    for prefix, feature, ttl in SESSION_FEATURES:
+        if key.startswith(prefix):
+            return feature, ttl
+    return None
+
+
+def session_ttl(key: str) ->Optional[int]:
+    """TTL of the session feature registered for key, if any."""
+    feature = _feature_for(key)
+    return feature[1] if feature else None
+
+
+def _estimate_size(value: Any) ->int:
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+def session_set(user_data: Dict[Any, Any], key: str, value: Any) ->None:
+    """Stores browsing state under a registered key prefix with its feature TTL."""
+    feature = _feature_for(key)
+    if feature is None:
+        raise KeyError(f'No session feature registered for key {key}')
+    name, ttl = feature
+    now = time.time()
+    user_data[key] = SessionEntry(value=value, feature=name, expires_at=
+        now + ttl, touched_at=now, size=_estimate_size(value))
+    _enforce_user_cap(user_data, keep=key)
+
+
+def session_get(user_data: Dict[Any, Any], key: str, default: Any=None
+    ) ->Any:
+    entry = user_data.get(key)
+    if not isinstance(entry, SessionEntry):
+        return default
+    now = time.time()
+    if entry.expires_at <= now:
+        user_data.pop(key, None)
+        return default
+    entry.touched_at = now
+    return entry.value
+
+
+def session_pop(user_data: Dict[Any, Any], key: str, default: Any=None
+    ) ->Any:
+    entry = user_data.pop(key, None)
+    if not isinstance(entry, SessionEntry) or entry.expires_at <= time.time():
+        return default
+    return entry.value
+
+
+def _enforce_user_cap(user_data: Dict[Any, Any], keep: str) ->None:
+    entries = [(k, v) for k, v in user_data.items() if isinstance(v,
+        SessionEntry)]
+    total = sum(v.size for _, v in entries)
+    if total <= SESSION_MAX_BYTES_PER_USER:
+        return
+    for key, entry in sorted(entries, key=lambda kv: kv[1].touched_at):
+        if key == keep:
+            continue
+        user_data.pop(key, None)
+        total -= entry.size
+        logger.debug(
+            f'Evicted session key {key} ({entry.feature}, {entry.size} bytes) over per-user cap'
+            )
+        if total <= SESSION_MAX_BYTES_PER_USER:
+            break
+
+
+def sweep_user_data(user_data: Dict[Any, Any], now: Optional[float]=None
+    ) ->int:
+    """Drops expired entries and legacy raw values left under session key prefixes."""
+    now = time.time() if now is None else now
+    stale = [k for k, v in user_data.items() if (v.expires_at <= now if
+        isinstance(v, SessionEntry) else isinstance(k, str) and (
+        _feature_for(k) is not None or k.startswith(LEGACY_KEY_PREFIXES)))]
+    for key in stale:
+        user_data.pop(key, None)
+    return len(stale)
+
+
+def session_stats(all_user_data: Dict[int, Dict[Any, Any]]) ->Dict[str,
+    Dict[str, int]]:
+    """Entries and approximate bytes of live session state, per feature."""
+    stats: Dict[str, Dict[str, int]] = {}
+    for user_data in all_user_data.values():
+        for value in user_data.values():
+            if isinstance(value, SessionEntry):
+                feature_stats = stats.setdefault(value.feature, {'entries':
+                    0, 'bytes': 0})
+                feature_stats['entries'] += 1
+                feature_stats['bytes'] += value.size
+    return stats
+
+
+async def sweep_sessions_job(context: ContextTypes.DEFAULT_TYPE) ->None:
+    """JobQueue callback: expires session state for every loaded user."""
+    now = time.time()
+    removed = 0
+    for user_data in context.application.user_data.values():
+        removed += sweep_user_data(user_data, now)
+    stats = session_stats(context.application.user_data)
+    summary = ', '.join(f"{name}={s['entries']}/{s['bytes']}B" for name, s in
+        sorted(stats.items())) or 'empty'
+    logger.info(
+        f'Session sweep removed {removed} entries; held per feature: {summary}'
+        )
@@ -5,7 +5,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 load_dotenv()
 from telegram import Update
-from telegram.ext import Application, CommandHandler, ContextTypes, CallbackQueryHandler, PicklePersistence, MessageHandler, filters
+from telegram.ext import Application, CommandHandler, ContextTypes, CallbackQueryHandler, PersistenceInput
 from telegram.constants import ChatType
 import config
 
@@ -14,8 +14,12 @@ from handlers.commands import start_command, balance_command, nfts_command
 from handlers.command_top_collections import top_collections_command
 from handlers.command_user_activity import user_activity_command
 from handlers.command_tokens import tokens_command
+from handlers.command_portfolio import portfolio_command
 from handlers.command_tx_count import transaction_count_command
 from handlers.command_unique_contracts import unique_contracts_command
+from handlers.scan_scheduler import get_scan_scheduler
+from handlers.session_state import sweep_sessions_job, SESSION_SWEEP_INTERVAL_SECONDS
+from handlers.pager_registry import sweep_pagers_job, pager_registry
 from handlers.command_help import list_commands_handler # For /commands
 # Callbacks
 from handlers.callback_nft_info import info_btn_callback
@@ -26,10 +30,20 @@ from handlers.callback_collection_items import collection_items_btn_callback
 from handlers.callback_top_collections import top_collections_callback
 from handlers.callback_user_activity import user_activity_more_callback
 from handlers.callback_tokens import token_balance_more_callback
+from handlers.callback_scan_breakdown import scan_breakdown_callback
 # Rate Limiter
-from handlers.rate_limiter import check_rate_limit
+from handlers.rate_limiter import check_rate_limit, CommandRateLimitHandler
 # Error Handler
 from handlers.error import error_handler
+# Shared HTTP pools
+from api_clients.http_client import close_http_clients
+from utils.tx_index import close_tx_index
+from api_clients.response_cache import log_cache_stats_job, CACHE_STATS_LOG_INTERVAL_SECONDS
+from api_clients.rpc_setup import probe_rpc_job, RPC_HEALTH_PROBE_INTERVAL_SECONDS, RPC_HEALTH_PROBE_FIRST_SECONDS
+from utils.sqlite_persistence import SqlitePersistence, unload_idle_users_job
+from utils.priority_rate_limiter import PriorityRateLimiter
+from utils.webhook_app import TelegramWebhookApp
+from utils.update_processor import PerUserUpdateProcessor
 
 # --- Logging Setup ---
 logging.basicConfig(format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.DEBUG)
@@ -41,17 +55,51 @@ logger = logging.getLogger(__name__)
 if not config.BOT_TOKEN: logger.critical("CRITICAL: Bot token missing."); sys.exit(1)
 if not config.ME_API_KEY: logger.warning("Warning: ME API Key missing.")
 if not config.WALLET_API_KEY: logger.warning("Warning: Wallet API Key (WK) missing.")
-persistence_file = Path(__file__).parent / "bot_persistence.pkl"; persistence = PicklePersistence(filepath=persistence_file)
-logger.info(f"Using persistence file: {persistence_file}")
+persistence_file = Path(config.PERSISTENCE_DB_PATH); persistence = SqlitePersistence(filepath=persistence_file, store_data=PersistenceInput(chat_data=False))  # no handler uses chat_data
+legacy_pickle_file = Path(__file__).parent / "bot_persistence.pkl"
+if persistence.import_pickle_file(legacy_pickle_file): logger.info(f"Migrated legacy persistence from {legacy_pickle_file}")
+logger.info(f"Using persistence database: {persistence_file}")
 # --- End Validation & Persistence ---
 
+async def post_init(application: Application) -> None:
+    """Starts background workers once the Application is initialized."""
+    await get_scan_scheduler().start(application)
+    if application.job_queue:
+        application.job_queue.run_repeating(sweep_sessions_job, interval=SESSION_SWEEP_INTERVAL_SECONDS, first=SESSION_SWEEP_INTERVAL_SECONDS, name="session_sweep")
+        application.job_queue.run_repeating(sweep_pagers_job, interval=SESSION_SWEEP_INTERVAL_SECONDS, first=SESSION_SWEEP_INTERVAL_SECONDS, name="pager_sweep")
+        application.job_queue.run_repeating(unload_idle_users_job, interval=SESSION_SWEEP_INTERVAL_SECONDS, first=SESSION_SWEEP_INTERVAL_SECONDS, name="user_data_unload")
+        application.job_queue.run_repeating(probe_rpc_job, interval=RPC_HEALTH_PROBE_INTERVAL_SECONDS, first=RPC_HEALTH_PROBE_FIRST_SECONDS, name="rpc_health_probe")
+        application.job_queue.run_repeating(log_cache_stats_job, interval=CACHE_STATS_LOG_INTERVAL_SECONDS, first=CACHE_STATS_LOG_INTERVAL_SECONDS, name="cache_stats_log")
+    else: logger.warning("JobQueue unavailable; session state will only expire on access and RPC endpoints recover only via backoff.")
+
+async def post_shutdown(application: Application) -> None:
+    """Stops background workers and releases pooled upstream connections."""
+    await get_scan_scheduler().stop()
+    pager_registry.close_all()
+    await close_http_clients()
+    close_tx_index()
+
+def run_webhook(application: Application) -> None:
+    """Serves the webhook ASGI app with uvicorn; the app's lifespan runs the Application."""
+    try: import uvicorn
+    except ImportError: logger.critical("CRITICAL: BOT_MODE=webhook requires uvicorn (pip install uvicorn)."); sys.exit(1)
+    webhook_url = f"{config.WEBHOOK_URL.rstrip('/')}{config.WEBHOOK_PATH}" if config.WEBHOOK_URL else None
+    asgi_app = TelegramWebhookApp(application, config.WEBHOOK_PATH, webhook_url, secret_token=config.WEBHOOK_SECRET_TOKEN, allowed_updates=Update.ALL_TYPES)
+    logger.info(f"Webhook server listening on {config.WEBHOOK_LISTEN}:{config.WEBHOOK_PORT}{config.WEBHOOK_PATH}")
+    uvicorn.run(asgi_app, host=config.WEBHOOK_LISTEN, port=config.WEBHOOK_PORT, lifespan="on", log_level="info")
+
 def main() -> None:
     """Sets up the Application and runs the bot."""
-    logger.info("Starting bot application...")
-    application = ( Application.builder() .token(config.BOT_TOKEN) .persistence(persistence) .build() )
+    logger.info(f"Starting bot application ({config.BOT_MODE} mode, {config.CONCURRENT_UPDATES} concurrent updates)...")
+    builder = ( Application.builder() .token(config.BOT_TOKEN) .persistence(persistence) .rate_limiter(PriorityRateLimiter()) .concurrent_updates(PerUserUpdateProcessor(config.CONCURRENT_UPDATES, config.MAX_PENDING_UPDATES)) .post_init(post_init) .post_shutdown(post_shutdown) )
+    if config.TELEGRAM_API_BASE_URL:
+        api_base = config.TELEGRAM_API_BASE_URL.rstrip('/')
+        builder = builder.base_url(f"{api_base}/bot").base_file_url(f"{api_base}/file/bot")
+    if config.BOT_MODE == "webhook": builder = builder.updater(None)
+    application = builder.build()
 
     # GROUP 0: General handlers like Rate Limiter
-    application.add_handler(MessageHandler(filters.COMMAND, check_rate_limit), group=0)
+    application.add_handler(CommandRateLimitHandler(check_rate_limit), group=0)
 
     # GROUP 1: Specific Command Handlers (Run after Group 0)
     application.add_handler(CommandHandler("start", start_command), group=1)
@@ -60,26 +108,33 @@ def main() -> None:
     application.add_handler(CommandHandler("topcollections", top_collections_command), group=1)
     application.add_handler(CommandHandler("mynftactivity", user_activity_command), group=1)
     application.add_handler(CommandHandler("tokens", tokens_command), group=1)
+    application.add_handler(CommandHandler("portfolio", portfolio_command), group=1)
     application.add_handler(CommandHandler("transactioncount", transaction_count_command), group=1)
     application.add_handler(CommandHandler("uniquecontracts", unique_contracts_command), group=1)
     application.add_handler(CommandHandler("commands", list_commands_handler), group=1) # Moved to group 1
 
     # GROUP 1: Callback Query Handlers
     application.add_handler(CallbackQueryHandler(info_btn_callback, pattern=r"^nftinfo_"), group=1)
+    application.add_handler(CallbackQueryHandler(info_btn_callback, pattern=r"^nftinfonew_"), group=1)
     application.add_handler(CallbackQueryHandler(bids_btn_callback, pattern=r"^nftbids_"), group=1)
     application.add_handler(CallbackQueryHandler(bids_btn_callback, pattern=r"^nftbidsmore_"), group=1)
     application.add_handler(CallbackQueryHandler(activity_btn_callback, pattern=r"^nftact_"), group=1)
     application.add_handler(CallbackQueryHandler(activity_btn_callback, pattern=r"^nftactmore_"), group=1)
     application.add_handler(CallbackQueryHandler(collections_list_more_callback, pattern=r"^nftcollmore$"), group=1)
     application.add_handler(CallbackQueryHandler(collection_items_btn_callback, pattern=r"^nftcoll_"), group=1)
-    application.add_handler(CallbackQueryHandler(collection_items_btn_callback, pattern=r"^nftcollitems_more_"), group=1) # Placeholder
+    application.add_handler(CallbackQueryHandler(collection_items_btn_callback, pattern=r"^nftcollitems_more_"), group=1)
     application.add_handler(CallbackQueryHandler(back_to_coll_list_callback, pattern=r"^back_to_coll_list_"), group=1)
     application.add_handler(CallbackQueryHandler(top_collections_callback, pattern=r"^topcoll_"), group=1)
     application.add_handler(CallbackQueryHandler(user_activity_more_callback, pattern=r"^useractmore_"), group=1)
     application.add_handler(CallbackQueryHandler(token_balance_more_callback, pattern=r"^tokbalmore_"), group=1)
+    application.add_handler(CallbackQueryHandler(scan_breakdown_callback, pattern=r"^scanbreak_"), group=1)
 
     # Error Handler (Runs in its own context)
     application.add_error_handler(error_handler)
+    if config.BOT_MODE == "webhook":
+        run_webhook(application)
+        logger.info("Webhook server stopped.")
+        return
     logger.info("Bot polling started...")
     application.run_polling(allowed_updates=Update.ALL_TYPES)
     logger.info("Bot polling stopped.")
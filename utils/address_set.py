@@ -0,0 +1,229 @@
+import hashlib
+import logging
+import math
+from typing import Iterator, Optional
+logger = logging.getLogger(__name__)
+ADDRESS_BYTES = 20
+MIN_SLOTS = 64
+MAX_LOAD_FACTOR = 0.7
+HLL_PRECISION = 14
+_MODE_EXACT = 0
+_MODE_HLL = 1
+_EMPTY = bytes(ADDRESS_BYTES)
+
+
+def address_bytes(address: str) ->Optional[bytes]:
+    """'0xAbC…' -> 20 raw bytes, or None if it is not a 20-byte hex address."""
+    if address.startswith(('0x', '0X')):
+        address = address[2:]
+    if len(address) != ADDRESS_BYTES * 2:
+        return None
+    try:
+        return bytes.fromhex(address)
+    except ValueError:
+        return None
+
+
+class AddressSet:
+    """
+    Set of 20-byte addresses in one open-addressing bytearray (linear
+    probing, all-zero slot = empty; the zero address is tracked apart).
+    About 20 / MAX_LOAD_FACTOR bytes per entry instead of 100+ for a set of
+    hex strings.
+    """
+
+    def __init__(self, capacity: int=0):
+        slots = MIN_SLOTS
+        while slots * MAX_LOAD_FACTOR < capacity:
+            slots *= 2
+        self._slots = slots
+        self._table = bytearray(slots * ADDRESS_BYTES)
+        self._count = 0
+        self._has_zero = False
+
+    def __len__(self) ->int:
+        return self._count + self._has_zero
+
+    def _find(self, key: bytes) ->int:
+        """Slot holding key, or the empty slot where it would go."""
+        mask = self._slots - 1
+        slot = int.from_bytes(key[-8:], 'little') & mask
+        table = self._table
+        while True:
+            start = slot * ADDRESS_BYTES
+            current = table[start:start + ADDRESS_BYTES]
+            if current == key or current == _EMPTY:
+                return slot
+            slot = slot + 1 & mask
+
+    def add_bytes(self, key: bytes) ->bool:
+        """Adds a raw address; True if it was not present."""
+        if key == _EMPTY:
+            added = not self._has_zero
+            self._has_zero = True
+            return added
+        slot = self._find(key)
+        start = slot * ADDRESS_BYTES
+        if self._table[start:start + ADDRESS_BYTES] == key:
+            return False
+        self._table[start:start + ADDRESS_BYTES] = key
+        self._count += 1
+        if self._count > self._slots * MAX_LOAD_FACTOR:
+            self._grow()
+        return True
+
+    def add(self, address: str) ->bool:
+        key = address_bytes(address)
+        return self.add_bytes(key) if key is not None else False
+
+    def __contains__(self, address: str) ->bool:
+        key = address_bytes(address)
+        if key is None:
+            return False
+        if key == _EMPTY:
+            return self._has_zero
+        start = self._find(key) * ADDRESS_BYTES
+        return self._table[start:start + ADDRESS_BYTES] == key
+
+    def _grow(self) ->None:
+        old_table = self._table
+        self._slots *= 2
+        self._table = bytearray(self._slots * ADDRESS_BYTES)
+        for start in range(0, len(old_table), ADDRESS_BYTES):
+            key = bytes(old_table[start:start + ADDRESS_BYTES])
+            if key != _EMPTY:
+                slot = self._find(key) * ADDRESS_BYTES
+                self._table[slot:slot + ADDRESS_BYTES] = key
+
+    def __iter__(self) ->Iterator[bytes]:
+        if self._has_zero:
+            yield _EMPTY
+        table = self._table
+        for start in range(0, len(table), ADDRESS_BYTES):
+            key = bytes(table[start:start + ADDRESS_BYTES])
+            if key != _EMPTY:
+                yield key
+
+    def memory_bytes(self) ->int:
+        return len(self._table)
+
+    def to_bytes(self) ->bytes:
+        """Packed addresses only (no empty slots)."""
+        return b''.join(self)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) ->'AddressSet':
+        result = cls(len(data) // ADDRESS_BYTES)
+        for start in range(0, len(data) - ADDRESS_BYTES + 1, ADDRESS_BYTES):
+            result.add_bytes(data[start:start + ADDRESS_BYTES])
+        return result
+
+
+class HyperLogLog:
+    """HyperLogLog cardinality sketch over 2**precision one-byte registers (~1.04/sqrt(m) error)."""
+
+    def __init__(self, precision: int=HLL_PRECISION):
+        self.precision = precision
+        self._registers = bytearray(1 << precision)
+
+    def add_bytes(self, key: bytes) ->None:
+        value = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(),
+            'big')
+        index = value >> 64 - self.precision
+        rest_bits = 64 - self.precision
+        rest = value & (1 << rest_bits) - 1
+        rank = rest_bits - rest.bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def __len__(self) ->int:
+        m = len(self._registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self._registers)
+        zeros = self._registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def memory_bytes(self) ->int:
+        return len(self._registers)
+
+    def to_bytes(self) ->bytes:
+        return bytes([self.precision]) + bytes(self._registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) ->'HyperLogLog':
+        result = cls(data[0])
+        result._registers[:] = data[1:]
+        return result
+
+
+class UniqueAddressCounter:
+    """
+    Counts distinct addresses exactly with an AddressSet until exact_limit
+    is passed, then folds everything into a HyperLogLog and counts
+    approximately from there on (exact_limit=None never switches).
+    Serializes to a small blob for caching alongside the scan index.
+    """
+
+    def __init__(self, exact_limit: Optional[int]=None):
+        self.exact_limit = exact_limit
+        self._exact: Optional[AddressSet] = AddressSet()
+        self._sketch: Optional[HyperLogLog] = None
+
+    @property
+    def approximate(self) ->bool:
+        return self._sketch is not None
+
+    def add(self, address: str) ->None:
+        key = address_bytes(address)
+        if key is None:
+            return
+        if self._sketch is not None:
+            self._sketch.add_bytes(key)
+            return
+        if self._exact.add_bytes(key) and self.exact_limit is not None and len(
+            self._exact) > self.exact_limit:
+            self._switch_to_sketch()
+
+    def _switch_to_sketch(self) ->None:
+        sketch = HyperLogLog()
+        for key in self._exact:
+            sketch.add_bytes(key)
+        logger.info(
+            f'Unique address count passed {self.exact_limit}; switching to HyperLogLog ({len(self._exact)} exact so far)'
+            )
+        self._sketch = sketch
+        self._exact = None
+
+    def __len__(self) ->int:
+        return len(self._sketch) if self._sketch is not None else len(self
+            ._exact)
+
+    def memory_bytes(self) ->int:
+        if self._sketch is not None:
+            return self._sketch.memory_bytes()
+        return self._exact.memory_bytes()
+
+    def to_bytes(self) ->bytes:
+        if self._sketch is not None:
+            return bytes([_MODE_HLL]) + self._sketch.to_bytes()
+        return bytes([_MODE_EXACT]) + self._exact.to_bytes()
+
+    @classmethod
+    def from_bytes(cls, data: Optional[bytes], exact_limit: Optional[int]=None
+        ) ->'UniqueAddressCounter':
+        """Restores a counter; an empty or unknown blob gives an empty counter."""
+        result = cls(exact_limit)
+        if not data:
+            return result
+        if data[0] == _MODE_HLL:
+            result._sketch = HyperLogLog.from_bytes(data[1:])
+            result._exact = None
+        elif data[0] == _MODE_EXACT:
+            result._exact = AddressSet.from_bytes(data[1:])
+            if exact_limit is not None and len(result._exact) > exact_limit:
+                result._switch_to_sketch()
+        else:
+            logger.warning(f'Unknown address counter blob mode {data[0]}')
+        return result
@@ -0,0 +1,73 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Tuple, Sequence
+from utils.token_position import TokenPosition
+from api_clients.fetch_collection_prices import CollectionPrice
+logger = logging.getLogger(__name__)
+TOP_HOLDINGS = 5
+
+
+@dataclass
+class PortfolioValuation:
+    """A wallet's tokens (USD) and NFTs (native and USD, at floor and top bid)."""
+    token_usd: float = 0.0
+    token_count: int = 0
+    nft_count: int = 0
+    collection_count: int = 0
+    floor_native: float = 0.0
+    floor_usd: float = 0.0
+    bid_native: float = 0.0
+    bid_usd: float = 0.0
+    unpriced_collections: int = 0
+    currency: str = ''
+    top_tokens: List[Tuple[str, float]] = field(default_factory=list)
+    top_collections: List[Tuple[str, int, float, Optional[float]]] = field(
+        default_factory=list)
+
+    @property
+    def total_floor_usd(self) ->float:
+        return self.token_usd + self.floor_usd
+
+    @property
+    def total_bid_usd(self) ->float:
+        return self.token_usd + self.bid_usd
+
+
+def value_portfolio(positions: Sequence[TokenPosition], holdings: Sequence[
+    Tuple[str, str, int]], prices: Dict[str, CollectionPrice]
+    ) ->PortfolioValuation:
+    """
+    Values holdings (collection id, name, count) at each collection's floor
+    and top bid. A missing price counts as zero, and a held collection with
+    no floor is counted as unpriced.
+    """
+    valuation = PortfolioValuation(token_count=len(positions),
+        collection_count=len(holdings))
+    token_values = [(p.symbol, p.value) for p in positions if p.value]
+    valuation.token_usd = sum(value for _, value in token_values)
+    valuation.top_tokens = sorted(token_values, key=lambda t: t[1], reverse
+        =True)[:TOP_HOLDINGS]
+    ranked_collections = []
+    for coll_id, name, count in holdings:
+        price = prices.get(coll_id.lower())
+        valuation.nft_count += count
+        if price is None or not price.floor_native:
+            if count:
+                valuation.unpriced_collections += 1
+            if price is None:
+                continue
+        if price.currency and not valuation.currency:
+            valuation.currency = price.currency
+        held_floor = count * (price.floor_native or 0)
+        held_floor_usd = (count * price.floor_usd if price.floor_usd is not
+            None else None)
+        valuation.floor_native += held_floor
+        valuation.floor_usd += held_floor_usd or 0
+        valuation.bid_native += count * (price.top_bid_native or 0)
+        valuation.bid_usd += count * (price.top_bid_usd or 0)
+        if held_floor > 0:
+            ranked_collections.append((name, count, held_floor,
+                held_floor_usd))
+    valuation.top_collections = sorted(ranked_collections, key=lambda c: c
+        [2], reverse=True)[:TOP_HOLDINGS]
+    return valuation
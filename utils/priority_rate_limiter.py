@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Coroutine, Deque, Dict, List, Optional, Tuple
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+from .token_bucket import TokenBucket
+logger = logging.getLogger(__name__)
+LANE_INTERACTIVE = 0
+LANE_LISTING = 1
+LANE_PROGRESS = 2
+LANE_NAMES = ('interactive', 'listing', 'progress')
+GLOBAL_RATE_MAX = 25.0
+GLOBAL_RATE_MIN = 3.0
+GLOBAL_RATE_RECOVERY_STEP = 0.2
+PRIVATE_CHAT_RATE = 1.0
+PRIVATE_CHAT_BURST = 4
+GROUP_CHAT_RATE = 20 / 60
+GROUP_CHAT_BURST = 3
+MAX_TRACKED_CHATS = 2048
+MAX_RETRY_AFTER_RETRIES = 2
+COALESCED_ENDPOINTS = {'editMessageText', 'editMessageCaption',
+    'editMessageReplyMarkup'}
+
+
+def _retry_seconds(error: RetryAfter) ->float:
+    value = error.retry_after
+    return value.total_seconds() if hasattr(value, 'total_seconds'
+        ) else float(value)
+
+
+@dataclass
+class _Pending:
+    lane: int
+    chat_id: Optional[int]
+    coalesce_key: Optional[Tuple[Any, ...]]
+    callback: Callable[..., Coroutine[Any, Any, Any]]
+    args: Any
+    kwargs: Dict[str, Any]
+    granted: asyncio.Future
+    result: asyncio.Future
+    followers: int = 0
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class PriorityRateLimiter(BaseRateLimiter[int]):
+    """
+    Outbound Bot API scheduler with three priority lanes, passed per call as
+    rate_limit_args (LANE_INTERACTIVE when omitted). One dispatcher grants
+    requests against a global and a per-chat token bucket, always preferring
+    the highest lane with a chat that has budget. A queued progress edit for
+    a message is replaced by a newer edit of the same message, and both
+    callers receive the newer result. RetryAfter pauses dispatch, halves the
+    global rate and retries; the rate then recovers additively.
+    """
+
+    def __init__(self):
+        self._lanes: List[Deque[_Pending]] = [deque() for _ in LANE_NAMES]
+        self._coalescable: Dict[Tuple[Any, ...], _Pending] = {}
+        self._global = TokenBucket(GLOBAL_RATE_MAX, GLOBAL_RATE_MAX)
+        self._chats: 'OrderedDict[int, TokenBucket]' = OrderedDict()
+        self._paused_until = 0.0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.coalesced = 0
+        self.retry_after_hits = 0
+
+    async def initialize(self) ->None:
+        self._wakeup = asyncio.Event()
+        self._dispatcher = asyncio.create_task(self._dispatch_loop(), name=
+            'PriorityRateLimiterDispatcher')
+
+    async def shutdown(self) ->None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        for lane in self._lanes:
+            while lane:
+                entry = lane.popleft()
+                if not entry.granted.done():
+                    entry.granted.cancel()
+        self._coalescable.clear()
+
+    def queue_depths(self) ->Dict[str, int]:
+        return {name: len(lane) for name, lane in zip(LANE_NAMES, self._lanes)
+            }
+
+    def _chat_bucket(self, chat_id: int) ->TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if chat_id < 0:
+                bucket = TokenBucket(GROUP_CHAT_RATE, GROUP_CHAT_BURST)
+            else:
+                bucket = TokenBucket(PRIVATE_CHAT_RATE, PRIVATE_CHAT_BURST)
+            self._chats[chat_id] = bucket
+            while len(self._chats) > MAX_TRACKED_CHATS:
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+
+    def _next_ready(self) ->Tuple[Optional[_Pending], Optional[float]]:
+        """Returns (entry to grant, None) or (None, seconds to wait | None if idle)."""
+        now = time.monotonic()
+        if self._paused_until > now:
+            return None, self._paused_until - now
+        if not any(self._lanes):
+            return None, None
+        global_wait = self._global.wait_time()
+        if global_wait > 0:
+            return None, global_wait
+        shortest_wait: Optional[float] = None
+        for lane in self._lanes:
+            for entry in lane:
+                if entry.chat_id is None:
+                    return entry, None
+                bucket = self._chat_bucket(entry.chat_id)
+                wait = bucket.wait_time()
+                if wait <= 0:
+                    return entry, None
+                shortest_wait = wait if shortest_wait is None else min(
+                    shortest_wait, wait)
+        return None, shortest_wait
+
+    async def _dispatch_loop(self) ->None:
+        while True:
+            entry, wait = self._next_ready()
+            if entry is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._lanes[entry.lane].remove(entry)
+            if entry.coalesce_key is not None and self._coalescable.get(entry
+                .coalesce_key) is entry:
+                del self._coalescable[entry.coalesce_key]
+            self._global.try_take()
+            if entry.chat_id is not None:
+                self._chat_bucket(entry.chat_id).try_take()
+            if not entry.granted.done():
+                entry.granted.set_result(None)
+
+    def _enqueue(self, entry: _Pending, front: bool=False) ->None:
+        if front:
+            self._lanes[entry.lane].appendleft(entry)
+        else:
+            self._lanes[entry.lane].append(entry)
+        if entry.coalesce_key is not None:
+            self._coalescable[entry.coalesce_key] = entry
+        self._wakeup.set()
+
+    def _discard(self, entry: _Pending) ->None:
+        try:
+            self._lanes[entry.lane].remove(entry)
+        except ValueError:
+            pass
+        if entry.coalesce_key is not None and self._coalescable.get(entry.
+            coalesce_key) is entry:
+            del self._coalescable[entry.coalesce_key]
+
+    def _on_retry_after(self, error: RetryAfter) ->None:
+        self.retry_after_hits += 1
+        delay = _retry_seconds(error)
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        self._global.rate = max(GLOBAL_RATE_MIN, self._global.rate / 2)
+        logger.warning(
+            f'Telegram flood control: pausing sends for {delay:.0f}s, global rate now {self._global.rate:.1f}/s'
+            )
+
+    def _on_success(self) ->None:
+        if self._global.rate < GLOBAL_RATE_MAX:
+            self._global.rate = min(GLOBAL_RATE_MAX, self._global.rate +
+                GLOBAL_RATE_RECOVERY_STEP)
+
+    async def process_request(self, callback: Callable[..., Coroutine[Any,
+        Any, Any]], args: Any, kwargs: Dict[str, Any], endpoint: str, data:
+        Dict[str, Any], rate_limit_args: Optional[int]) ->Any:
+        lane = LANE_INTERACTIVE if rate_limit_args is None else max(0, min(
+            len(LANE_NAMES) - 1, int(rate_limit_args)))
+        chat_id = data.get('chat_id')
+        chat_id = chat_id if isinstance(chat_id, int) else None
+        coalesce_key = None
+        if (lane == LANE_PROGRESS and endpoint in COALESCED_ENDPOINTS and
+            chat_id is not None and data.get('message_id') is not None):
+            coalesce_key = endpoint, chat_id, data['message_id']
+            queued = self._coalescable.get(coalesce_key)
+            if queued is not None:
+                queued.callback, queued.args, queued.kwargs = (callback,
+                    args, kwargs)
+                queued.followers += 1
+                self.coalesced += 1
+                return await asyncio.shield(queued.result)
+        loop = asyncio.get_running_loop()
+        entry = _Pending(lane=lane, chat_id=chat_id, coalesce_key=
+            coalesce_key, callback=callback, args=args, kwargs=kwargs,
+            granted=loop.create_future(), result=loop.create_future())
+        self._enqueue(entry)
+        attempt = 0
+        try:
+            while True:
+                await entry.granted
+                try:
+                    result = await entry.callback(*entry.args, **entry.kwargs)
+                except RetryAfter as e:
+                    self._on_retry_after(e)
+                    attempt += 1
+                    if attempt > MAX_RETRY_AFTER_RETRIES:
+                        raise
+                    entry.granted = loop.create_future()
+                    entry.coalesce_key = None
+                    self._enqueue(entry, front=True)
+                    continue
+                self._on_success()
+                if entry.followers:
+                    entry.result.set_result(result)
+                return result
+        except BaseException as e:
+            self._discard(entry)
+            if entry.followers and not entry.result.done():
+                if isinstance(e, asyncio.CancelledError):
+                    entry.result.cancel()
+                else:
+                    entry.result.set_exception(e)
+            raise
@@ -0,0 +1,212 @@
+import base64
+import hashlib
+import json
+import logging
+import time
+from array import array
+from typing import Any, Dict, List, Optional
+from .address_set import HyperLogLog, UniqueAddressCounter, address_bytes
+logger = logging.getLogger(__name__)
+CMS_WIDTH = 2048
+CMS_DEPTH = 4
+TOP_K = 10
+TOP_K_CANDIDATES = 64
+KIND_HLL_PRECISION = 12
+KIND_CONTRACT = 'contract'
+KIND_EOA = 'eoa'
+TRANSFER_OPERATION_TYPES = {'send', 'receive'}
+
+
+def classify_operation(operation_type: Optional[str]) ->str:
+    """
+    Zerion operation_type -> KIND_EOA for plain sends/receives, else
+    KIND_CONTRACT (execute, approve, trade, mint, deploy, ...). A heuristic:
+    Zerion does not say whether sent_to has code.
+    """
+    return KIND_EOA if operation_type in TRANSFER_OPERATION_TYPES else KIND_CONTRACT
+
+
+def month_key(mined_at_ms: int) ->str:
+    tm = time.gmtime(mined_at_ms / 1000)
+    return f'{tm.tm_year:04d}-{tm.tm_mon:02d}'
+
+
+class CountMinSketch:
+    """Count-min sketch of depth x width uint32 counters with conservative update."""
+
+    def __init__(self, width: int=CMS_WIDTH, depth: int=CMS_DEPTH):
+        self.width = width
+        self.depth = depth
+        self._counters = array('I', bytes(4 * width * depth))
+
+    def _cells(self, key: bytes) ->List[int]:
+        digest = hashlib.blake2b(key, digest_size=4 * self.depth).digest()
+        return [row * self.width + int.from_bytes(digest[4 * row:4 * row +
+            4], 'little') % self.width for row in range(self.depth)]
+
+    def add(self, key: bytes, count: int=1) ->int:
+        """Adds count for key and returns the new estimate."""
+        cells = self._cells(key)
+        counters = self._counters
+        estimate = min(counters[c] for c in cells) + count
+        for c in cells:
+            if counters[c] < estimate:
+                counters[c] = estimate
+        return estimate
+
+    def estimate(self, key: bytes) ->int:
+        return min(self._counters[c] for c in self._cells(key))
+
+    def to_bytes(self) ->bytes:
+        return self._counters.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, width: int, depth: int
+        ) ->'CountMinSketch':
+        result = cls(width, depth)
+        result._counters = array('I')
+        result._counters.frombytes(data)
+        return result
+
+
+class ScanAnalytics:
+    """
+    Aggregates a wallet's transactions in one pass with bounded memory:
+    counterparty frequencies in a count-min sketch, the heaviest
+    counterparties (with first/last seen while tracked) in a fixed
+    candidate table, contract vs EOA tx counts and distinct counterparties
+    (HyperLogLog each), per-month tx counts and the overall time range.
+    Serializes to a blob so delta scans continue where the last one stopped.
+    """
+
+    def __init__(self):
+        self.txns = 0
+        self.first_ms: Optional[int] = None
+        self.last_ms: Optional[int] = None
+        self.months: Dict[str, int] = {}
+        self.kind_txns: Dict[str, int] = {KIND_CONTRACT: 0, KIND_EOA: 0}
+        self._kind_sketches: Dict[str, HyperLogLog] = {KIND_CONTRACT:
+            HyperLogLog(KIND_HLL_PRECISION), KIND_EOA: HyperLogLog(
+            KIND_HLL_PRECISION)}
+        self._frequencies = CountMinSketch()
+        self._candidates: Dict[bytes, List[Optional[int]]] = {}
+        self._candidate_floor = 0
+
+    def add(self, sent_to: Optional[str], mined_at_ms: Optional[int],
+        operation_type: Optional[str]) ->None:
+        self.txns += 1
+        kind = classify_operation(operation_type)
+        self.kind_txns[kind] += 1
+        if mined_at_ms is not None:
+            if self.first_ms is None or mined_at_ms < self.first_ms:
+                self.first_ms = mined_at_ms
+            if self.last_ms is None or mined_at_ms > self.last_ms:
+                self.last_ms = mined_at_ms
+            month = month_key(mined_at_ms)
+            self.months[month] = self.months.get(month, 0) + 1
+        key = address_bytes(sent_to) if sent_to else None
+        if key is None:
+            return
+        self._kind_sketches[kind].add_bytes(key)
+        self._track(key, self._frequencies.add(key), mined_at_ms)
+
+    def _track(self, key: bytes, estimate: int, mined_at_ms: Optional[int]
+        ) ->None:
+        entry = self._candidates.get(key)
+        if entry is None:
+            if len(self._candidates) >= TOP_K_CANDIDATES:
+                if estimate <= self._candidate_floor:
+                    return
+                weakest = min(self._candidates, key=lambda k: self.
+                    _candidates[k][0])
+                if estimate <= self._candidates[weakest][0]:
+                    self._candidate_floor = self._candidates[weakest][0]
+                    return
+                del self._candidates[weakest]
+                self._candidate_floor = 0
+            entry = [estimate, mined_at_ms, mined_at_ms]
+            self._candidates[key] = entry
+            return
+        entry[0] = estimate
+        if mined_at_ms is not None:
+            if entry[1] is None or mined_at_ms < entry[1]:
+                entry[1] = mined_at_ms
+            if entry[2] is None or mined_at_ms > entry[2]:
+                entry[2] = mined_at_ms
+
+    def top(self, n: int=TOP_K) ->List[Dict[str, Any]]:
+        ranked = sorted(self._candidates.items(), key=lambda item: -item[1][0]
+            )[:n]
+        return [{'address': '0x' + key.hex(), 'count': entry[0],
+            'first_ms': entry[1], 'last_ms': entry[2]} for key, entry in ranked
+            ]
+
+    def kind_counterparties(self) ->Dict[str, int]:
+        return {kind: len(sketch) for kind, sketch in self._kind_sketches.
+            items()}
+
+    def to_bytes(self) ->bytes:
+        state = {'txns': self.txns, 'first_ms': self.first_ms, 'last_ms':
+            self.last_ms, 'months': self.months, 'kind_txns': self.
+            kind_txns, 'kind_sketches': {kind: base64.b64encode(sketch.
+            to_bytes()).decode() for kind, sketch in self._kind_sketches.
+            items()}, 'cms': [self._frequencies.width, self._frequencies.
+            depth, base64.b64encode(self._frequencies.to_bytes()).decode()],
+            'candidates': [[key.hex()] + entry for key, entry in self.
+            _candidates.items()]}
+        return json.dumps(state, separators=(',', ':')).encode()
+
+    @classmethod
+    def from_bytes(cls, data: Optional[bytes]) ->'ScanAnalytics':
+        """Restores saved state; a missing or unreadable blob starts fresh."""
+        result = cls()
+        if not data:
+            return result
+        try:
+            state = json.loads(data)
+            result.txns = state['txns']
+            result.first_ms = state['first_ms']
+            result.last_ms = state['last_ms']
+            result.months = state['months']
+            result.kind_txns.update(state['kind_txns'])
+            for kind, blob in state['kind_sketches'].items():
+                result._kind_sketches[kind] = HyperLogLog.from_bytes(base64
+                    .b64decode(blob))
+            width, depth, blob = state['cms']
+            result._frequencies = CountMinSketch.from_bytes(base64.
+                b64decode(blob), width, depth)
+            result._candidates = {bytes.fromhex(row[0]): row[1:] for row in
+                state['candidates']}
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f'Discarding unreadable scan analytics: {e}')
+            return cls()
+        return result
+
+
+def load_scan_analytics(tx_index, address: str, blob: Optional[bytes]=None,
+    counterparties: Optional[UniqueAddressCounter]=None) ->ScanAnalytics:
+    """
+    Analytics covering every indexed transaction of a wallet: the saved blob
+    (by default the one stored with the wallet) while it still accounts for
+    exactly the indexed rows, otherwise rebuilt from those rows (wallets
+    scanned before analytics were kept, or a scan interrupted between
+    checkpoints). Passing an empty counterparties counter forces the
+    rebuild and fills it in the same pass. Blocking; run it via
+    run_in_index.
+    """
+    if blob is None:
+        blob = tx_index.get_analytics(address)
+    analytics = ScanAnalytics.from_bytes(blob)
+    indexed = tx_index.row_count(address)
+    if analytics.txns == indexed and counterparties is None:
+        return analytics
+    analytics = ScanAnalytics()
+    for sent_to, mined_at_ms, operation_type in tx_index.transaction_rows(
+        address):
+        if sent_to and counterparties is not None:
+            counterparties.add(sent_to)
+        analytics.add(sent_to, mined_at_ms, operation_type)
+    logger.info(
+        f'Rebuilt scan analytics for {address} from {analytics.txns} indexed txns'
+        )
+    return analytics
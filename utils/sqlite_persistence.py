@@ -0,0 +1,304 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, Set, Tuple, Mapping
+from telegram.ext import BasePersistence, PersistenceInput, ContextTypes
+from config import USER_DATA_IDLE_SECONDS
+logger = logging.getLogger(__name__)
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_data (
+    user_id INTEGER PRIMARY KEY,
+    data BLOB NOT NULL,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS chat_data (
+    chat_id INTEGER PRIMARY KEY,
+    data BLOB NOT NULL,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS singletons (
+    name TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS conversations (
+    name TEXT NOT NULL,
+    conv_key TEXT NOT NULL,
+    state BLOB NOT NULL,
+    PRIMARY KEY (name, conv_key)
+) WITHOUT ROWID;
+"""
+
+
+def _digest(blob: bytes) ->bytes:
+    return hashlib.blake2b(blob, digest_size=16).digest()
+
+
+class SqlitePersistence(BasePersistence):
+    """
+    Persistence backend storing each user's and chat's data as its own SQLite
+    row (WAL mode). Rows are loaded lazily the first time a handler touches
+    that user or chat. update_* re-pickles the row's whole dict and writes
+    it only if that pickle differs from the one last read or written, so
+    writes are per row rather than per key. Users idle past
+    USER_DATA_IDLE_SECONDS are written back and unloaded (see
+    unload_idle_users), which keeps memory to recently active users. Chats
+    are never unloaded, so main.py builds this with chat_data disabled.
+    """
+
+    def __init__(self, filepath: str, store_data: Optional[
+        PersistenceInput]=None, update_interval: float=60):
+        super().__init__(store_data=store_data, update_interval=
+            update_interval)
+        self.filepath = str(filepath)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.filepath, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self._loaded_users: Set[int] = set()
+        self._loaded_chats: Set[int] = set()
+        self._user_touched: Dict[int, float] = {}
+        self._digests: Dict[Tuple[str, Any], bytes] = {}
+        self.rows_written = 0
+        self.rows_skipped = 0
+
+    @property
+    def loaded_user_count(self) ->int:
+        """Users whose data is currently held in memory."""
+        return len(self._loaded_users)
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    def _read_blob(self, sql: str, params: tuple) ->Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        return row[0] if row else None
+
+    def _write_if_dirty(self, kind: str, key: Any, sql: str, params_tail:
+        tuple, obj: Any) ->None:
+        blob = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        digest = _digest(blob)
+        if self._digests.get((kind, key)) == digest:
+            self.rows_skipped += 1
+            return
+        with self._lock:
+            self._conn.execute(sql, (key, blob) + params_tail)
+            self._conn.commit()
+        self._digests[kind, key] = digest
+        self.rows_written += 1
+
+    def _delete(self, sql: str, params: tuple) ->None:
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._conn.commit()
+
+    async def get_user_data(self) ->Dict[int, Dict[Any, Any]]:
+        return {}
+
+    async def get_chat_data(self) ->Dict[int, Dict[Any, Any]]:
+        return {}
+
+    async def get_bot_data(self) ->Dict[Any, Any]:
+        blob = await self._run(self._read_blob,
+            'SELECT data FROM singletons WHERE name = ?', ('bot_data',))
+        if blob is None:
+            return {}
+        self._digests['singleton', 'bot_data'] = _digest(blob)
+        return pickle.loads(blob)
+
+    async def get_callback_data(self) ->Optional[Any]:
+        blob = await self._run(self._read_blob,
+            'SELECT data FROM singletons WHERE name = ?', ('callback_data',))
+        if blob is None:
+            return None
+        self._digests['singleton', 'callback_data'] = _digest(blob)
+        return pickle.loads(blob)
+
+    async def get_conversations(self, name: str) ->Dict[Tuple, Any]:
+
+        def load():
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT conv_key, state FROM conversations WHERE name = ?',
+                    (name,)).fetchall()
+            return {tuple(json.loads(k)): pickle.loads(v) for k, v in rows}
+        return await self._run(load)
+
+    async def update_conversation(self, name: str, key: Tuple, new_state:
+        Optional[object]) ->None:
+        conv_key = json.dumps(list(key))
+        if new_state is None:
+            await self._run(self._delete,
+                'DELETE FROM conversations WHERE name = ? AND conv_key = ?',
+                (name, conv_key))
+            return
+        blob = pickle.dumps(new_state, protocol=pickle.HIGHEST_PROTOCOL)
+
+        def write():
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO conversations (name, conv_key, state) VALUES (?, ?, ?)'
+                    , (name, conv_key, blob))
+                self._conn.commit()
+        await self._run(write)
+
+    async def update_user_data(self, user_id: int, data: Dict[Any, Any]
+        ) ->None:
+        if user_id not in self._loaded_users:
+            return
+        await self._run(self._write_if_dirty, 'user', user_id,
+            'INSERT OR REPLACE INTO user_data (user_id, data, updated_at) VALUES (?, ?, ?)'
+            , (time.time(),), data)
+
+    async def update_chat_data(self, chat_id: int, data: Dict[Any, Any]
+        ) ->None:
+        if chat_id not in self._loaded_chats:
+            return
+        await self._run(self._write_if_dirty, 'chat', chat_id,
+            'INSERT OR REPLACE INTO chat_data (chat_id, data, updated_at) VALUES (?, ?, ?)'
+            , (time.time(),), data)
+
+    async def update_bot_data(self, data: Dict[Any, Any]) ->None:
+        await self._run(self._write_if_dirty, 'singleton', 'bot_data',
+            'INSERT OR REPLACE INTO singletons (name, data) VALUES (?, ?)',
+            (), data)
+
+    async def update_callback_data(self, data: Any) ->None:
+        await self._run(self._write_if_dirty, 'singleton', 'callback_data',
+            'INSERT OR REPLACE INTO singletons (name, data) VALUES (?, ?)',
+            (), data)
+
+    async def drop_user_data(self, user_id: int) ->None:
+        self._loaded_users.discard(user_id)
+        self._user_touched.pop(user_id, None)
+        self._digests.pop(('user', user_id), None)
+        await self._run(self._delete,
+            'DELETE FROM user_data WHERE user_id = ?', (user_id,))
+
+    async def drop_chat_data(self, chat_id: int) ->None:
+        self._loaded_chats.discard(chat_id)
+        self._digests.pop(('chat', chat_id), None)
+        await self._run(self._delete,
+            'DELETE FROM chat_data WHERE chat_id = ?', (chat_id,))
+
+    async def refresh_user_data(self, user_id: int, user_data: Dict[Any, Any]
+        ) ->None:
+        self._user_touched[user_id] = time.monotonic()
+        if user_id in self._loaded_users:
+            return
+        blob = await self._run(self._read_blob,
+            'SELECT data FROM user_data WHERE user_id = ?', (user_id,))
+        if user_id in self._loaded_users:
+            return
+        self._loaded_users.add(user_id)
+        if blob is not None:
+            self._digests['user', user_id] = _digest(blob)
+            for key, value in pickle.loads(blob).items():
+                user_data.setdefault(key, value)
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: Dict[Any, Any]
+        ) ->None:
+        if chat_id in self._loaded_chats:
+            return
+        blob = await self._run(self._read_blob,
+            'SELECT data FROM chat_data WHERE chat_id = ?', (chat_id,))
+        if chat_id in self._loaded_chats:
+            return
+        self._loaded_chats.add(chat_id)
+        if blob is not None:
+            self._digests['chat', chat_id] = _digest(blob)
+            for key, value in pickle.loads(blob).items():
+                chat_data.setdefault(key, value)
+
+    async def refresh_bot_data(self, bot_data: Dict[Any, Any]) ->None:
+        pass
+
+    async def unload_idle_users(self, user_data: Mapping[int, Dict[Any, Any]],
+        idle_seconds: float) ->int:
+        """
+        Writes back and clears the in-memory data of users not seen for
+        idle_seconds; their next update lazily reloads it from the row. The
+        Application keeps an empty dict per cleared user, since its mapping
+        is read-only to persistence.
+        """
+        cutoff = time.monotonic() - idle_seconds
+        unloaded = 0
+        for user_id in [uid for uid, touched in self._user_touched.items() if
+            touched < cutoff]:
+            data = user_data.get(user_id)
+            if data is not None and user_id in self._loaded_users:
+                await self._run(self._write_if_dirty, 'user', user_id,
+                    'INSERT OR REPLACE INTO user_data (user_id, data, updated_at) VALUES (?, ?, ?)'
+                    , (time.time(),), data)
+            if self._user_touched.get(user_id, cutoff) >= cutoff:
+                continue
+            if data is not None:
+                data.clear()
+            self._loaded_users.discard(user_id)
+            self._digests.pop(('user', user_id), None)
+            del self._user_touched[user_id]
+            unloaded += 1
+        return unloaded
+
+    async def flush(self) ->None:
+        logger.info(
+            f'Persistence flush: {self.rows_written} rows written, {self.rows_skipped} unchanged rows skipped.'
+            )
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    def import_pickle_file(self, pickle_path: str) ->bool:
+        """
+        One-off migration from a PicklePersistence single file. Only runs
+        when this database holds no user rows yet.
+        """
+        if not os.path.exists(pickle_path):
+            return False
+        with self._lock:
+            has_rows = self._conn.execute('SELECT 1 FROM user_data LIMIT 1'
+                ).fetchone()
+        if has_rows:
+            return False
+        with open(pickle_path, 'rb') as f:
+            data = pickle.load(f)
+        now = time.time()
+        dump = lambda obj: pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO user_data (user_id, data, updated_at) VALUES (?, ?, ?)'
+                , ((uid, dump(dict(ud)), now) for uid, ud in (data.get(
+                'user_data') or {}).items()))
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO chat_data (chat_id, data, updated_at) VALUES (?, ?, ?)'
+                , ((cid, dump(dict(cd)), now) for cid, cd in (data.get(
+                'chat_data') or {}).items()))
+            if data.get('bot_data') is not None:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO singletons (name, data) VALUES (?, ?)'
+                    , ('bot_data', dump(data['bot_data'])))
+            self._conn.commit()
+        logger.info(f'Imported pickle persistence from {pickle_path}')
+        return True
+
+
+async def unload_idle_users_job(context: ContextTypes.DEFAULT_TYPE) ->None:
+    """JobQueue callback: frees the user data of idle users."""
+    persistence = context.application.persistence
+    if not isinstance(persistence, SqlitePersistence):
+        return
+    unloaded = await persistence.unload_idle_users(context.application.
+        user_data, USER_DATA_IDLE_SECONDS)
+    if unloaded:
+        logger.info(
+            f'Unloaded {unloaded} idle users; {persistence.loaded_user_count} loaded'
+            )
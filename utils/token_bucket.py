@@ -0,0 +1,34 @@
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket refilling at `rate` tokens per second up to `capacity`.
+    Callers poll with try_take() and sleep for wait_time(); `rate` may be
+    changed at any time.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) ->None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self.
+            _updated) * self.rate)
+        self._updated = now
+
+    def try_take(self, tokens: float=1.0) ->bool:
+        """Takes tokens without waiting; False if not enough are available."""
+        self._refill()
+        if self._tokens < tokens:
+            return False
+        self._tokens -= tokens
+        return True
+
+    def wait_time(self, tokens: float=1.0) ->float:
+        """Seconds until try_take(tokens) would succeed."""
+        self._refill()
+        return max(0.0, (tokens - self._tokens) / self.rate)
@@ -0,0 +1,40 @@
+import sys
+from typing import Optional, Dict, Any, NamedTuple
+
+
+class TokenPosition(NamedTuple):
+    symbol: str
+    name: str
+    quantity: Optional[str]
+    decimals: Optional[int]
+    value: Optional[float]
+    price: Optional[float]
+    token_address: Optional[str]
+
+
+def _intern(text: Optional[str]) ->Optional[str]:
+    return sys.intern(text) if isinstance(text, str) else text
+
+
+def _to_float(raw: Any) ->Optional[float]:
+    try:
+        return float(raw) if raw is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def position_from_item(item: Dict[str, Any]) ->TokenPosition:
+    """Reduces a Zerion position item to the fields the bot displays."""
+    attrs = item.get('attributes', {})
+    finfo = attrs.get('fungible_info') or {}
+    impl = (finfo.get('implementations') or [{}])[0] or {}
+    quantity = (attrs.get('quantity') or {}).get('int')
+    try:
+        decimals = int(impl['decimals']) if impl.get('decimals'
+            ) is not None else None
+    except (TypeError, ValueError):
+        decimals = None
+    return TokenPosition(_intern(finfo.get('symbol') or '???'), _intern(
+        finfo.get('name') or '[No Name]'), str(quantity) if quantity is not
+        None else None, decimals, _to_float(attrs.get('value')), _to_float(
+        attrs.get('price')), _intern(impl.get('address')))
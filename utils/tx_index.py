@@ -0,0 +1,304 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Optional, List, Tuple, Dict, Any, Set, Iterator
+from config import TX_INDEX_PATH
+logger = logging.getLogger(__name__)
+TxRow = Tuple[str, Optional[str], Optional[int], Optional[str]]
+SQL_IN_CHUNK = 500
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wallets (
+    address TEXT PRIMARY KEY,
+    high_water_ms INTEGER,
+    last_scan_at REAL,
+    total_txns INTEGER NOT NULL DEFAULT 0,
+    unique_count INTEGER NOT NULL DEFAULT 0,
+    counterparties BLOB,
+    analytics BLOB
+);
+CREATE TABLE IF NOT EXISTS txs (
+    address TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    sent_to TEXT,
+    mined_at_ms INTEGER,
+    operation_type TEXT,
+    PRIMARY KEY (address, tx_hash)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS scan_checkpoints (
+    address TEXT PRIMARY KEY,
+    since_ms INTEGER,
+    cursors TEXT NOT NULL,
+    pages_done INTEGER NOT NULL DEFAULT 0,
+    txns_processed INTEGER NOT NULL DEFAULT 0,
+    meta TEXT,
+    counterparties BLOB,
+    analytics BLOB,
+    updated_at REAL
+);
+"""
+
+
+def parse_mined_at_ms(mined_at: Optional[str]) ->Optional[int]:
+    if not mined_at:
+        return None
+    try:
+        return int(datetime.fromisoformat(mined_at.replace('Z', '+00:00')).
+            timestamp() * 1000)
+    except (ValueError, TypeError):
+        logger.warning(f'Could not parse mined_at: {mined_at}')
+        return None
+
+
+def tx_row_from_item(tx: Dict[str, Any]) ->Optional[TxRow]:
+    """Reduces a Zerion transaction item to (hash, sent_to, mined_at_ms, operation_type)."""
+    attributes = tx.get('attributes', {})
+    tx_hash = attributes.get('hash') or tx.get('id')
+    if not tx_hash:
+        return None
+    sent_to = attributes.get('sent_to')
+    return tx_hash, sent_to.lower() if sent_to else None, parse_mined_at_ms(
+        attributes.get('mined_at')), attributes.get('operation_type')
+
+
+class TxIndex:
+    """
+    On-disk per-wallet transaction index. Rows are written page by page as a
+    scan progresses, each page together with the scan's checkpoint (cursors,
+    counters and subscribers); the high-water mark only moves when a scan
+    completes. An interrupted scan resumes from its checkpoint, and rows
+    seen again are ignored as duplicates.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        self._conn.commit()
+        logger.info(f'Transaction index opened at {path}')
+
+    def _migrate(self) ->None:
+        columns = {row[1] for row in self._conn.execute(
+            'PRAGMA table_info(wallets)')}
+        for column in ('counterparties', 'analytics'):
+            if column not in columns:
+                self._conn.execute(
+                    f'ALTER TABLE wallets ADD COLUMN {column} BLOB')
+        tx_columns = {row[1] for row in self._conn.execute(
+            'PRAGMA table_info(txs)')}
+        if 'operation_type' not in tx_columns:
+            self._conn.execute(
+                'ALTER TABLE txs ADD COLUMN operation_type TEXT')
+
+    def get_counterparties(self, address: str) ->Optional[bytes]:
+        """Serialized UniqueAddressCounter saved by the last completed scan."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT counterparties FROM wallets WHERE address = ?', (
+                address.lower(),)).fetchone()
+        return row[0] if row else None
+
+    def get_analytics(self, address: str) ->Optional[bytes]:
+        """Serialized ScanAnalytics covering every indexed transaction."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT analytics FROM wallets WHERE address = ?', (address
+                .lower(),)).fetchone()
+        return row[0] if row else None
+
+    def row_count(self, address: str) ->int:
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM txs WHERE address = ?', (address.lower(
+                ),)).fetchone()[0]
+
+    def _write_checkpoint(self, address: str, checkpoint: Dict[str, Any]
+        ) ->None:
+        """Upserts a checkpoint without committing; blobs left out keep their stored value."""
+        self._conn.execute(
+            'INSERT INTO scan_checkpoints (address, since_ms, cursors, pages_done, txns_processed, meta, counterparties, analytics, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(address) DO UPDATE SET since_ms = excluded.since_ms, cursors = excluded.cursors, pages_done = excluded.pages_done, txns_processed = excluded.txns_processed, meta = excluded.meta, counterparties = COALESCE(excluded.counterparties, scan_checkpoints.counterparties), analytics = COALESCE(excluded.analytics, scan_checkpoints.analytics), updated_at = excluded.updated_at'
+            , (address, checkpoint.get('since_ms'), json.dumps(checkpoint[
+            'cursors']), checkpoint.get('pages_done', 0), checkpoint.get(
+            'txns_processed', 0), json.dumps(checkpoint.get('meta')),
+            checkpoint.get('counterparties'), checkpoint.get('analytics'),
+            time.time()))
+
+    def save_checkpoint(self, address: str, checkpoint: Dict[str, Any]
+        ) ->None:
+        with self._lock:
+            self._write_checkpoint(address.lower(), checkpoint)
+            self._conn.commit()
+
+    def get_checkpoint(self, address: str) ->Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT since_ms, cursors, pages_done, txns_processed, meta, counterparties, analytics, updated_at FROM scan_checkpoints WHERE address = ?'
+                , (address.lower(),)).fetchone()
+        if row is None:
+            return None
+        return {'since_ms': row[0], 'cursors': json.loads(row[1]),
+            'pages_done': row[2], 'txns_processed': row[3], 'meta': json.
+            loads(row[4]) if row[4] else None, 'counterparties': row[5],
+            'analytics': row[6], 'updated_at': row[7]}
+
+    def checkpoint_user_ids(self, address: str) ->Set[int]:
+        """User ids subscribed to the address's unfinished scan; empty if there is none."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT meta FROM scan_checkpoints WHERE address = ?', (address
+                .lower(),)).fetchone()
+        meta = json.loads(row[0]) if row and row[0] else None
+        return {subscriber[0] for subscriber in (meta or {}).get(
+            'subscribers') or []}
+
+    def list_checkpoints(self) ->List[Dict[str, Any]]:
+        """(address, meta, updated_at) of every unfinished scan."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT address, meta, updated_at FROM scan_checkpoints ORDER BY updated_at'
+                ).fetchall()
+        return [{'address': address, 'meta': json.loads(meta) if meta else
+            None, 'updated_at': updated_at} for address, meta, updated_at in
+            rows]
+
+    def delete_checkpoint(self, address: str) ->None:
+        with self._lock:
+            self._conn.execute('DELETE FROM scan_checkpoints WHERE address = ?'
+                , (address.lower(),))
+            self._conn.commit()
+
+    def transaction_rows(self, address: str) ->Iterator[Tuple[Optional[str
+        ], Optional[int], Optional[str]]]:
+        """
+        (sent_to, mined_at_ms, operation_type) of every indexed transaction,
+        read SQL_IN_CHUNK rows at a time in tx_hash order so only one batch
+        is held in memory and the lock is released between batches.
+        """
+        address = address.lower()
+        last_hash = ''
+        while True:
+            with self._lock:
+                batch = self._conn.execute(
+                    'SELECT tx_hash, sent_to, mined_at_ms, operation_type FROM txs WHERE address = ? AND tx_hash > ? ORDER BY tx_hash LIMIT ?'
+                    , (address, last_hash, SQL_IN_CHUNK)).fetchall()
+            for row in batch:
+                yield row[1:]
+            if len(batch) < SQL_IN_CHUNK:
+                return
+            last_hash = batch[-1][0]
+
+    def counterparty_stats(self, address: str, counterparties: List[str]
+        ) ->Dict[str, Dict[str, Any]]:
+        """Exact tx count and first/last mined_at per counterparty, from the index."""
+        if not counterparties:
+            return {}
+        placeholders = ','.join('?' * len(counterparties))
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT sent_to, COUNT(*), MIN(mined_at_ms), MAX(mined_at_ms) FROM txs WHERE address = ? AND sent_to IN ({placeholders}) GROUP BY sent_to'
+                , [address.lower()] + [c.lower() for c in counterparties]
+                ).fetchall()
+        return {sent_to: {'count': count, 'first_ms': first_ms, 'last_ms':
+            last_ms} for sent_to, count, first_ms, last_ms in rows}
+
+    def get_wallet(self, address: str) ->Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT high_water_ms, last_scan_at, total_txns, unique_count FROM wallets WHERE address = ?'
+                , (address.lower(),)).fetchone()
+        if row is None:
+            return None
+        return {'high_water_ms': row[0], 'last_scan_at': row[1],
+            'total_txns': row[2], 'unique_count': row[3]}
+
+    def add_transactions(self, address: str, rows: List[TxRow], checkpoint:
+        Optional[Dict[str, Any]]=None) ->Set[str]:
+        """
+        Inserts rows not yet indexed and returns the hashes that were new. A
+        checkpoint given here is written in the same transaction, so the
+        saved cursor never runs ahead of or behind the indexed rows.
+        """
+        address = address.lower()
+        new_hashes: Set[str] = set()
+        with self._lock:
+            for start in range(0, len(rows), SQL_IN_CHUNK):
+                chunk = rows[start:start + SQL_IN_CHUNK]
+                hashes = [row[0] for row in chunk]
+                placeholders = ','.join('?' * len(hashes))
+                known = {row[0] for row in self._conn.execute(
+                    f'SELECT tx_hash FROM txs WHERE address = ? AND tx_hash IN ({placeholders})'
+                    , [address] + hashes)}
+                fresh = []
+                for row in chunk:
+                    if row[0] not in known and row[0] not in new_hashes:
+                        new_hashes.add(row[0])
+                        fresh.append((address,) + tuple(row))
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO txs (address, tx_hash, sent_to, mined_at_ms, operation_type) VALUES (?, ?, ?, ?, ?)'
+                    , fresh)
+            if checkpoint is not None:
+                self._write_checkpoint(address, checkpoint)
+            self._conn.commit()
+        return new_hashes
+
+    def complete_scan(self, address: str, counterparties: Optional[bytes]=
+        None, analytics: Optional[bytes]=None, unique_count: Optional[int]=None
+        ) ->Dict[str, Any]:
+        """
+        Recomputes totals, advances the high-water mark, drops the scan's
+        checkpoint and returns the wallet row. unique_count is the scan's
+        own counterparty count; without it the index is counted instead.
+        """
+        address = address.lower()
+        with self._lock:
+            total, high_water = self._conn.execute(
+                'SELECT COUNT(*), MAX(mined_at_ms) FROM txs WHERE address = ?',
+                (address,)).fetchone()
+            unique = unique_count
+            if unique is None:
+                unique = self._conn.execute(
+                    'SELECT COUNT(DISTINCT sent_to) FROM txs WHERE address = ?'
+                    , (address,)).fetchone()[0]
+            self._conn.execute(
+                'INSERT INTO wallets (address, high_water_ms, last_scan_at, total_txns, unique_count, counterparties, analytics) VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(address) DO UPDATE SET high_water_ms = excluded.high_water_ms, last_scan_at = excluded.last_scan_at, total_txns = excluded.total_txns, unique_count = excluded.unique_count, counterparties = COALESCE(excluded.counterparties, wallets.counterparties), analytics = COALESCE(excluded.analytics, wallets.analytics)'
+                , (address, high_water, time.time(), total, unique,
+                counterparties, analytics))
+            self._conn.execute('DELETE FROM scan_checkpoints WHERE address = ?'
+                , (address,))
+            self._conn.commit()
+        return {'high_water_ms': high_water, 'last_scan_at': time.time(),
+            'total_txns': total, 'unique_count': unique}
+
+    def close(self) ->None:
+        with self._lock:
+            self._conn.close()
+
+
+_index: Optional[TxIndex] = None
+
+
+def get_tx_index() ->TxIndex:
+    global _index
+    if _index is None:
+        _index = TxIndex(TX_INDEX_PATH)
+    return _index
+
+
+async def run_in_index(func, *args):
+    """Runs a blocking TxIndex call in the default executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, func, *args)
+
+
+def close_tx_index() ->None:
+    global _index
+    if _index is not None:
+        _index.close()
+        _index = None
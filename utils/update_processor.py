@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from contextlib import nullcontext
+from typing import Any, Awaitable, Dict, List, Optional
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+logger = logging.getLogger(__name__)
+QUEUE_DEPTH_WARN_THRESHOLD = 100
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Runs updates from different users in parallel while keeping each user's
+    updates in arrival order. At most max_in_flight handlers run at once and
+    at most max_pending updates are admitted into per-user ordering (PTB's
+    own semaphore). This is not backpressure: PTB creates a task for every
+    update it takes off its queue, so the queue stays near empty and the
+    excess waits as tasks on that semaphore. waiting therefore counts every
+    update handed to process_update that has not started running.
+    """
+
+    def __init__(self, max_in_flight: int, max_pending: int):
+        super().__init__(max(max_pending, max_in_flight))
+        self.max_in_flight = max_in_flight
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._user_locks: Dict[Any, List[Any]] = {}
+        self.running = 0
+        self.waiting = 0
+        self.max_waiting_seen = 0
+        self.processed = 0
+
+    @staticmethod
+    def _ordering_key(update: object) ->Optional[Any]:
+        if not isinstance(update, Update):
+            return None
+        if update.effective_user is not None:
+            return 'user', update.effective_user.id
+        if update.effective_chat is not None:
+            return 'chat', update.effective_chat.id
+        return None
+
+    def _lock_for(self, key: Any) ->asyncio.Lock:
+        entry = self._user_locks.get(key)
+        if entry is None:
+            entry = [asyncio.Lock(), 0]
+            self._user_locks[key] = entry
+        entry[1] += 1
+        return entry[0]
+
+    def _release_key(self, key: Any) ->None:
+        entry = self._user_locks.get(key)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self._user_locks[key]
+
+    async def process_update(self, update: object, coroutine: Awaitable[Any]
+        ) ->None:
+        self.waiting += 1
+        if self.waiting > self.max_waiting_seen:
+            self.max_waiting_seen = self.waiting
+            if self.waiting >= QUEUE_DEPTH_WARN_THRESHOLD:
+                logger.warning(
+                    f'Update processor backlog at {self.waiting} waiting updates'
+                    )
+        started = [False]
+        runner = self._run(coroutine, started)
+        try:
+            await super().process_update(update, runner)
+        finally:
+            if not started[0]:
+                self.waiting -= 1
+                runner.close()
+
+    async def _run(self, coroutine: Awaitable[Any], started: List[bool]
+        ) ->None:
+        self.waiting -= 1
+        started[0] = True
+        self.running += 1
+        try:
+            await coroutine
+        finally:
+            self.running -= 1
+            self.processed += 1
+
+    async def do_process_update(self, update: object, coroutine: Awaitable
+        [Any]) ->None:
+        key = self._ordering_key(update)
+        lock = self._lock_for(key) if key is not None else nullcontext()
+        try:
+            async with lock:
+                async with self._in_flight:
+                    await coroutine
+        finally:
+            if key is not None:
+                self._release_key(key)
+
+    def stats(self) ->Dict[str, int]:
+        """Queue depth (waiting), running handlers and totals, for /healthz and logs."""
+        return {'waiting': self.waiting, 'running': self.running,
+            'max_waiting_seen': self.max_waiting_seen, 'processed': self.
+            processed, 'users_with_pending': len(self._user_locks)}
+
+    async def initialize(self) ->None:
+        pass
+
+    async def shutdown(self) ->None:
+        pass
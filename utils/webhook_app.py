@@ -0,0 +1,158 @@
+import json
+import logging
+import secrets
+from typing import Any, Awaitable, Callable, Dict, Optional
+from telegram import Update
+from telegram.ext import Application
+from api_clients.concurrency import concurrency_stats
+from api_clients.single_flight import single_flight_stats
+from api_clients.response_cache import response_cache_stats
+from api_clients.positions_store import positions_store_stats
+from api_clients.nft_detail import nft_detail_store
+from api_clients.wallet_inventory import inventory_store
+logger = logging.getLogger(__name__)
+HEALTH_PATH = '/healthz'
+MAX_UPDATE_BODY_BYTES = 1024 * 1024
+SECRET_HEADER = b'x-telegram-bot-api-secret-token'
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class TelegramWebhookApp:
+    """
+    Minimal ASGI app for webhook mode. POSTs to webhook_path are verified
+    against the secret token, decoded and put on the Application's update
+    queue; GET /healthz reports readiness. The ASGI lifespan drives the
+    Application (initialize, post_init, start, set_webhook and the reverse on
+    shutdown), so any ASGI server can host it.
+    """
+
+    def __init__(self, application: Application, webhook_path: str,
+        webhook_url: Optional[str], secret_token: Optional[str]=None,
+        allowed_updates: Optional[list]=None):
+        self.application = application
+        self.webhook_path = webhook_path
+        self.webhook_url = webhook_url
+        self.secret_token = secret_token
+        self.allowed_updates = allowed_updates
+        self.updates_received = 0
+        self.updates_rejected = 0
+
+    async def __call__(self, scope: Dict[str, Any], receive: Receive, send:
+        Send) ->None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        path = scope.get('path', '')
+        method = scope.get('method', 'GET')
+        if path == HEALTH_PATH and method in ('GET', 'HEAD'):
+            await self._health(send)
+        elif path == self.webhook_path and method == 'POST':
+            await self._receive_update(scope, receive, send)
+        elif path == self.webhook_path:
+            await _respond(send, 405, {'error': 'method not allowed'})
+        else:
+            await _respond(send, 404, {'error': 'not found'})
+
+    async def _lifespan(self, receive: Receive, send: Send) ->None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await self._startup()
+                except Exception as e:
+                    logger.exception('Webhook app startup failed')
+                    await send({'type': 'lifespan.startup.failed',
+                        'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                try:
+                    await self._shutdown()
+                except Exception:
+                    logger.exception('Webhook app shutdown failed')
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _startup(self) ->None:
+        app = self.application
+        await app.initialize()
+        if app.post_init:
+            await app.post_init(app)
+        await app.start()
+        if self.webhook_url:
+            await app.bot.set_webhook(url=self.webhook_url, secret_token=
+                self.secret_token, allowed_updates=self.allowed_updates)
+            logger.info(f'Webhook registered at {self.webhook_url}')
+        else:
+            logger.warning(
+                'WEBHOOK_URL not set; assuming the webhook is registered externally.'
+                )
+
+    async def _shutdown(self) ->None:
+        app = self.application
+        if app.running:
+            await app.stop()
+            if app.post_stop:
+                await app.post_stop(app)
+        await app.shutdown()
+        if app.post_shutdown:
+            await app.post_shutdown(app)
+
+    async def _health(self, send: Send) ->None:
+        running = self.application.running
+        payload = {'status': 'ok' if running else 'starting',
+            'update_queue': self.application.update_queue.qsize(),
+            'updates_received': self.updates_received, 'updates_rejected':
+            self.updates_rejected}
+        processor = self.application.update_processor
+        if hasattr(processor, 'stats'):
+            payload['update_processor'] = processor.stats()
+        payload['upstreams'] = concurrency_stats()
+        payload['single_flight'] = single_flight_stats()
+        payload['response_cache'] = response_cache_stats()
+        payload['positions'] = positions_store_stats()
+        payload['nft_details'] = nft_detail_store.stats()
+        payload['inventories'] = inventory_store.stats()
+        await _respond(send, 200 if running else 503, payload)
+
+    async def _receive_update(self, scope: Dict[str, Any], receive:
+        Receive, send: Send) ->None:
+        if self.secret_token:
+            headers = dict(scope.get('headers') or [])
+            supplied = headers.get(SECRET_HEADER, b'').decode('latin-1')
+            if not secrets.compare_digest(supplied, self.secret_token):
+                self.updates_rejected += 1
+                await _respond(send, 403, {'error': 'forbidden'})
+                return
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+            if len(body) > MAX_UPDATE_BODY_BYTES:
+                self.updates_rejected += 1
+                await _respond(send, 413, {'error': 'payload too large'})
+                return
+        try:
+            update = Update.de_json(json.loads(body), self.application.bot)
+        except Exception as e:
+            logger.warning(f'Rejected malformed webhook update: {e}')
+            self.updates_rejected += 1
+            await _respond(send, 400, {'error': 'malformed update'})
+            return
+        if update is not None:
+            await self.application.update_queue.put(update)
+            self.updates_received += 1
+        await _respond(send, 200, {'ok': True})
+
+
+async def _respond(send: Send, status: int, payload: Dict[str, Any]) ->None:
+    body = json.dumps(payload).encode()
+    await send({'type': 'http.response.start', 'status': status, 'headers':
+        [(b'content-type', b'application/json'), (b'content-length', str(
+        len(body)).encode())]})
+    await send({'type': 'http.response.body', 'body': body})